@@ -0,0 +1,107 @@
+"""Benchmarks how responsive the event loop stays while pages are processed.
+
+A web-search server processing fetched pages (crawl4ai's scraping and markdown generation)
+is probed every millisecond by a ticker standing in for the other requests of the server.
+The pages are processed on the event loop (as before the scheduler), in the thread pool and
+in the process pool of ``mcp_servers.scheduler``.
+
+Usage:
+    uv run benchmarks/bench_event_loop.py [--pages 16] [--paragraphs 2000]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src" / "mcp_servers" / "web-search"))
+
+from crawl4ai.async_configs import CrawlerRunConfig  # noqa: E402
+from http_fetch import process_html, processor  # noqa: E402
+
+from mcp_servers.scheduler import Scheduler  # noqa: E402
+
+URL = "https://example.com/article"
+
+
+def page(paragraphs: int) -> str:
+    body = "".join(
+        f"<p>Paragraph {i} with a <a href='/link/{i}'>link</a> and some more text.</p>"
+        for i in range(paragraphs)
+    )
+
+    return f"<html><head><title>Article</title></head><body><article>{body}</article></body></html>"
+
+
+async def process_on_loop(html: str, config: CrawlerRunConfig) -> None:
+    await processor().aprocess_html(
+        url=URL,
+        html=html,
+        extracted_content=None,
+        config=config,
+        screenshot_data=None,
+        pdf_data=None,
+        verbose=False,
+        redirected_url=URL,
+        status_code=200,
+    )
+
+
+async def measure(mode: str, pages: int, html: str) -> tuple[float, list[float]]:
+    """Returns the seconds to process all pages and the delays of the ticker."""
+    config = CrawlerRunConfig()
+    scheduler = Scheduler(processes=0 if mode == "threads" else 4)
+
+    async def process() -> None:
+        if mode == "loop":
+            await process_on_loop(html, config)
+        else:
+            await scheduler.run_in_process(process_html, URL, html, config, URL, 200)
+
+    # Starts the workers (and their imports) before measuring
+    if mode == "processes":
+        await asyncio.gather(*(process() for _ in range(scheduler.processes)))
+
+    delays = []
+    done = asyncio.Event()
+
+    async def tick() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delays.append(time.perf_counter() - started - 0.001)
+
+    ticker = asyncio.create_task(tick())
+    started = time.perf_counter()
+    await asyncio.gather(*(process() for _ in range(pages)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker
+    scheduler.shutdown()
+
+    return elapsed, delays
+
+
+def percentile(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=16)
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    args = parser.parse_args()
+
+    html = page(args.paragraphs)
+    print(f"{args.pages} pages of {len(html) / 1024:.0f} KiB\n")
+    print(f"{'mode':<12}{'total [s]':>10}{'lag p50 [ms]':>14}{'lag p99 [ms]':>14}{'lag max [ms]':>14}")
+
+    for mode in ("loop", "threads", "processes"):
+        elapsed, delays = asyncio.run(measure(mode, args.pages, html))
+        p50, p99 = (percentile(delays, q) * 1e3 for q in (0.5, 0.99))
+        print(f"{mode:<12}{elapsed:>10.2f}{p50:>14.1f}{p99:>14.1f}{max(delays) * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
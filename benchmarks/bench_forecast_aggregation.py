@@ -0,0 +1,100 @@
+"""Benchmarks the forecast aggregation against returning the raw BrightSky response.
+
+Usage:
+    uv run benchmarks/bench_forecast_aggregation.py
+
+A 7-day hourly BrightSky weather response (168 records with every field) is synthesized.
+"Tokens" are estimated as 4 bytes each.
+"""
+
+import json
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pydantic_core
+
+WEATHER_DIR = Path(__file__).parents[1] / "src" / "mcp_servers" / "weather"
+sys.path.insert(0, str(WEATHER_DIR))
+
+from forecasts import aggregate, forecast_frame, parse_forecast, to_columns  # noqa: E402
+
+CONDITIONS = ["dry", "rain", "fog", "snow"]
+ICONS = ["clear-day", "partly-cloudy-day", "cloudy", "rain"]
+
+
+def synthesize_forecast(hours: int = 7 * 24, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    start = datetime(2026, 10, 17, tzinfo=timezone(timedelta(hours=2)))
+
+    records = [
+        {
+            "timestamp": (start + timedelta(hours=hour)).isoformat(),
+            "source_id": 42,
+            "cloud_cover": rng.randint(0, 100),
+            "condition": rng.choice(CONDITIONS),
+            "dew_point": round(rng.uniform(-5, 15), 1),
+            "icon": rng.choice(ICONS),
+            "pressure_msl": round(rng.uniform(990, 1030), 1),
+            "relative_humidity": rng.randint(40, 100),
+            "temperature": round(rng.uniform(-5, 25), 1),
+            "visibility": rng.randint(1000, 50000),
+            "fallback_source_ids": {"visibility": 43},
+            "precipitation": round(rng.uniform(0, 2), 1),
+            "solar": round(rng.uniform(0, 0.5), 3),
+            "sunshine": rng.randint(0, 60),
+            "wind_direction": rng.randint(0, 359),
+            "wind_speed": round(rng.uniform(0, 40), 1),
+            "wind_gust_direction": rng.randint(0, 359),
+            "wind_gust_speed": round(rng.uniform(0, 70), 1),
+            "precipitation_probability": rng.randint(0, 100),
+            "precipitation_probability_6h": rng.randint(0, 100),
+        }
+        for hour in range(hours)
+    ]
+    sources = [{"id": 42, "station_name": "HAMBURG-FUHLSB.", "distance": 4200}]
+
+    return pydantic_core.to_json({"weather": records, "sources": sources})
+
+
+def bench(statement, number: int) -> float:
+    """Returns the best time per call in milliseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e3
+
+
+def main():
+    response = synthesize_forecast()
+
+    def raw() -> str:
+        # What the tool used to hand to the MCP layer, which serializes it again
+        return json.dumps(json.loads(response))
+
+    def summarized(every: str | None, period: str | None = None, fields=None):
+        def run() -> str:
+            source, records = parse_forecast(response)
+            hourly = forecast_frame(records, "Europe/Berlin", source["source_id"])
+
+            return json.dumps(to_columns(aggregate(hourly, every, period, fields)))
+
+        return run
+
+    modes = {
+        "raw BrightSky JSON": raw,
+        "hourly, 3 fields": summarized(None, fields=["temperature", "precipitation", "wind_speed"]),
+        "6-hourly, all fields": summarized("6h"),
+        "daily, all fields": summarized("1d"),
+        "daily, 3 fields": summarized("1d", fields=["temperature", "precipitation", "wind_speed"]),
+        "24h windows every 6h, 2 fields": summarized("6h", "24h", ["temperature", "precipitation"]),
+    }
+
+    print(f"{'':<32}{'bytes':>10}{'~tokens':>10}{'time [ms]':>12}")
+
+    for name, run in modes.items():
+        size = len(run().encode())
+        print(f"{name:<32}{size:>10}{size // 4:>10}{bench(run, 50):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmarks decoding and validating a BrightSky forecast response.
+
+Usage:
+    uv run benchmarks/bench_forecast_decoding.py
+
+Uses the synthesized 7-day forecast (168 records) of ``bench_forecast_aggregation``.
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+import polars as pl
+from pydantic import TypeAdapter
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_forecast_aggregation import WEATHER_DIR, synthesize_forecast  # noqa: E402
+
+sys.path.insert(0, str(WEATHER_DIR))
+
+from datamodels import WeatherForecastResponse  # noqa: E402
+from decoding import decode, decode_weather_columns  # noqa: E402
+from forecasts import HOURLY_SCHEMA  # noqa: E402
+
+
+def bench(statement, number: int) -> float:
+    """Returns the best time per call in milliseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e3
+
+
+def main():
+    response = synthesize_forecast()
+    schema = {**HOURLY_SCHEMA, "source_id": pl.Int64}
+
+    modes = {
+        # What the tool did before: json.loads, then FastMCP validated the dict on return
+        "json.loads": lambda: json.loads(response),
+        "json.loads + model_validate": lambda: WeatherForecastResponse.model_validate(
+            json.loads(response)
+        ),
+        "new TypeAdapter per call": lambda: TypeAdapter(WeatherForecastResponse).validate_json(
+            response
+        ),
+        "decode, lenient": lambda: decode(WeatherForecastResponse, response, strict=False),
+        "decode, strict": lambda: decode(WeatherForecastResponse, response, strict=True),
+        "json.loads + DataFrame (rows)": lambda: pl.DataFrame(
+            json.loads(response)["weather"], schema=schema, orient="row"
+        ),
+        "decode_weather_columns": lambda: decode_weather_columns(response, schema),
+    }
+
+    print(f"{len(response)} bytes, 168 hourly records\n")
+    print(f"{'':<32}{'time [ms]':>12}")
+
+    for name, run in modes.items():
+        print(f"{name:<32}{bench(run, 50):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
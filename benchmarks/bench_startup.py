@@ -0,0 +1,119 @@
+"""Benchmarks the cold start of every server over stdio, as the IDE starts them.
+
+Usage:
+    uv run benchmarks/bench_startup.py [--uv] [--repeat 3]
+
+For every server and the gateway serving all of them (see ``mcp_servers.gateway``), a
+fresh process is spawned and timed until it answered ``initialize``,
+``tools/list`` and the first call of one of its tools. Every server is started once with an
+empty cache directory (cold) and then ``--repeat`` times with only the tool schemas the
+first start saved (warm), so that no tool result is answered from a cache. Servers are
+started with the current interpreter, or with ``uv run`` like ``mcp.json.template`` if
+``--uv`` is given.
+
+The first tool calls of ping, wikipedia-search and web-search need the network (web-search
+also a headless browser), without it they measure how fast the server reports the failure.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+
+SRC_DIR = Path(__file__).parents[1] / "src"
+SERVERS_DIR = SRC_DIR / "mcp_servers"
+
+# Working directory, arguments of the interpreter, and the tool called first with its arguments
+SERVERS = {
+    "ping": (SERVERS_DIR / "ping", ["ping.py"], "check_internet_connection", {}),
+    "weather": (SERVERS_DIR / "weather", ["weather.py"], "Fetch time information", {}),
+    "wikipedia-search": (
+        SERVERS_DIR / "wikipedia-search",
+        ["search.py"],
+        "search_wikipedia",
+        {"subject": "Python (programming language)", "mode": "title"},
+    ),
+    "web-search": (
+        SERVERS_DIR / "web-search",
+        ["web_search.py"],
+        "Deep Search",
+        {"link": "https://example.com"},
+    ),
+    # All of the above in one process
+    "gateway": (SRC_DIR, ["-m", "mcp_servers.gateway"], "Fetch time information", {}),
+}
+
+
+async def start_server(name: str, cache_dir: Path, use_uv: bool) -> dict[str, float]:
+    """Starts a server and returns the seconds until each of its first answers."""
+    directory, server_args, tool, arguments = SERVERS[name]
+    env = {
+        **os.environ,
+        "MCP_SERVERS_CACHE_DIR": str(cache_dir),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")])),
+    }
+    command, args = ("uv", ["run", *server_args]) if use_uv else (sys.executable, server_args)
+    parameters = StdioServerParameters(command=command, args=args, cwd=directory, env=env)
+
+    started = time.perf_counter()
+    timings = {}
+
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(parameters, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                timings["initialize"] = time.perf_counter() - started
+
+                await session.list_tools()
+                timings["tools/list"] = time.perf_counter() - started
+
+                await session.call_tool(tool, arguments)
+                timings["first tool result"] = time.perf_counter() - started
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uv", action="store_true", help="Start the servers with uv run.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of warm starts.")
+    parser.add_argument("servers", nargs="*", default=list(SERVERS), help="Servers to start.")
+    args = parser.parse_args()
+
+    columns = ["initialize", "tools/list", "first tool result"]
+    print(f"{'':<24}{'':<6}" + "".join(f"{column + ' [s]':>22}" for column in columns))
+
+    for name in args.servers:
+        with tempfile.TemporaryDirectory() as cold_dir:
+            cold = asyncio.run(start_server(name, Path(cold_dir), args.uv))
+            warm = []
+
+            for _ in range(args.repeat):
+                with tempfile.TemporaryDirectory() as warm_dir:
+                    # Missing if MCP_SERVERS_TOOL_SCHEMA_CACHE is off
+                    if (Path(cold_dir) / "tool-schemas").exists():
+                        shutil.copytree(
+                            Path(cold_dir) / "tool-schemas", Path(warm_dir) / "tool-schemas"
+                        )
+
+                    warm.append(asyncio.run(start_server(name, Path(warm_dir), args.uv)))
+
+        print(f"{name:<24}{'cold':<6}" + "".join(f"{cold[column]:>22.3f}" for column in columns))
+        print(
+            f"{'':<24}{'warm':<6}"
+            + "".join(
+                f"{statistics.median(run[column] for run in warm):>22.3f}" for column in columns
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
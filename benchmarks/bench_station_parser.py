@@ -0,0 +1,99 @@
+"""Benchmarks the streaming fixed-width station list parser against the former regex parser.
+
+Usage:
+    uv run benchmarks/bench_station_parser.py [path/to/statlex_rich.txt]
+
+Without a path, a list the size of the full DWD file (one line per station and observation
+type, ~60000 lines) is synthesized from the test fixture.
+"""
+
+import re
+import sys
+import timeit
+from pathlib import Path
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_station_search import WEATHER_DIR, load_station_list  # noqa: E402
+
+sys.path.insert(0, str(WEATHER_DIR))
+
+from station_parser import StationListParser, parse_station_list  # noqa: E402
+
+CHUNK_SIZE = 256 * 1024
+
+
+def legacy_parse(text: str) -> pl.DataFrame:
+    """The station list parser as it was before: regex split per line into Python lists."""
+    lines = text.splitlines()
+    headers = [element for element in lines[1].split() if element != "HFG_NFG"]
+    station_dict = {header: [] for header in headers}
+
+    for line in lines[2:]:
+        reconstructed_station = []
+
+        for i, element in enumerate(re.split("  +", line.strip())):
+            if i == 0:
+                reconstructed_station.append(element)
+            else:
+                reconstructed_station.extend(element.split())
+
+        if len(reconstructed_station) == len(headers) + 1:
+            del reconstructed_station[7]
+
+        if len(reconstructed_station) != len(headers):
+            continue
+
+        for key, element in zip(headers, reconstructed_station):
+            station_dict[key].append(element)
+
+    return (
+        pl.DataFrame(station_dict, schema={header: pl.String for header in headers})
+        .select(
+            pl.col("STAT_NAME").str.strip_chars().alias("station_name"),
+            pl.col("STAT").str.strip_chars().alias("wmo_station_id"),
+            pl.col("BR_HIGH").cast(pl.Float64, strict=False).alias("latitude_in_degrees"),
+            pl.col("LA_HIGH").cast(pl.Float64, strict=False).alias("longitude_in_degrees"),
+            pl.col("BL").str.strip_chars().alias("state_location_abbreviation"),
+            pl.col("ENDE")
+            .str.to_date(format="%d.%m.%Y", strict=False)
+            .alias("last_weather_recording_date"),
+        )
+        .drop_nulls(
+            ["latitude_in_degrees", "longitude_in_degrees", "last_weather_recording_date"]
+        )
+    )
+
+
+def streamed_parse(content: bytes) -> pl.DataFrame:
+    parser = StationListParser()
+
+    for start in range(0, len(content), CHUNK_SIZE):
+        parser.feed(content[start:start + CHUNK_SIZE])
+
+    return parser.close()
+
+
+def bench(statement, number: int) -> float:
+    """Returns the best time per call in milliseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e3
+
+
+def main():
+    text = load_station_list(sys.argv[1] if len(sys.argv) > 1 else None, size=60_000)
+    content = text.encode("latin-1")
+
+    legacy = legacy_parse(text)
+    assert streamed_parse(content).equals(legacy)
+
+    print(f"{len(content) / 2**20:.1f} MB, {legacy.height} stations\n")
+    print(f"{'parser':<32}{'time [ms]':>12}")
+    print(f"{'regex split (legacy)':<32}{bench(lambda: legacy_parse(text), 3):>12.1f}")
+    print(f"{'fixed-width, whole file':<32}{bench(lambda: parse_station_list(content), 3):>12.1f}")
+    print(f"{'fixed-width, 256 KiB chunks':<32}{bench(lambda: streamed_parse(content), 3):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
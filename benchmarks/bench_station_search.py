@@ -0,0 +1,95 @@
+"""Benchmarks the station name search against the former raw-text scan.
+
+Usage:
+    uv run benchmarks/bench_station_search.py [path/to/statlex_rich.txt]
+
+Without a path, a list of the size of the real DWD list (~6000 stations) is synthesized from
+the test fixture.
+"""
+
+import random
+import re
+import sys
+import timeit
+from pathlib import Path
+
+WEATHER_DIR = Path(__file__).parents[1] / "src" / "mcp_servers" / "weather"
+sys.path.insert(0, str(WEATHER_DIR))
+
+from station_search import StationSearchIndex  # noqa: E402
+from station_parser import parse_station_list  # noqa: E402
+
+SYLLABLES = ["al", "bach", "berg", "burg", "dorf", "el", "feld", "ha", "hau", "heim", "ken",
+             "lin", "ma", "mün", "ner", "ro", "sen", "stein", "ter", "wald", "we", "zell"]
+QUERIES = ["Hamburg", "hamburg", "muenchen", "Zugspitz", "Dusseldorf", "frankfurt main"]
+
+
+def load_station_list(path: str | None, size: int = 6000) -> str:
+    if path is not None:
+        return Path(path).read_text(encoding="latin-1")
+
+    lines = (WEATHER_DIR / "tests" / "fixtures" / "statlex_rich.txt").read_text(
+        encoding="latin-1"
+    ).splitlines()
+    header, rows = lines[:3], lines[3:]
+
+    rng = random.Random(0)
+    synthesized = []
+
+    for i in range(size):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+        if rng.random() < 0.3:
+            name += "-" + "".join(rng.choice(SYLLABLES) for _ in range(2)).capitalize()
+
+        synthesized.append(name.ljust(40) + rows[i % len(rows)][40:])
+
+    return "\n".join(header + rows + synthesized)
+
+
+def legacy_scan(text: str, location_name: str) -> list[list[str]]:
+    """The lookup as it was done before: substring test and regex split per raw line."""
+    reconstructed_stations = []
+
+    for relevant_station in [
+        station for station in text.splitlines() if location_name in station
+    ]:
+        reconstructed_station = []
+
+        for i, element in enumerate(re.split("  +", relevant_station)):
+            if i == 0:
+                reconstructed_station.append(element)
+            else:
+                reconstructed_station.extend(element.split())
+
+        reconstructed_stations.append(reconstructed_station)
+
+    return reconstructed_stations
+
+
+def bench(statement, number: int) -> float:
+    """Returns the best time per call in microseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    text = load_station_list(sys.argv[1] if len(sys.argv) > 1 else None)
+    names = parse_station_list(text)["station_name"].to_list()
+
+    build_ms = bench(lambda: StationSearchIndex(names), number=1) / 1e3
+    index = StationSearchIndex(names)
+
+    print(f"{len(names)} stations, index built in {build_ms:.1f} ms\n")
+    print(f"{'query':<16}{'scan [us]':>12}{'index [us]':>12}{'scan hits':>11}{'index hits':>12}")
+
+    for query in QUERIES:
+        scan_us = bench(lambda: legacy_scan(text, query), number=20)
+        index_us = bench(lambda: index.search(query), number=200)
+        print(
+            f"{query:<16}{scan_us:>12.1f}{index_us:>12.1f}"
+            f"{len(legacy_scan(text, query)):>11}{len(index.search(query, limit=None)):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
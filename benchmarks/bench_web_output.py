@@ -0,0 +1,103 @@
+"""Benchmarks the web-search tool output against the former ``str(crawl_dict)``.
+
+Usage:
+    uv run benchmarks/bench_web_output.py
+
+A crawl result the size of a long article (~200 KB of markdown, 600 links, 150 images) is
+synthesized in crawl4ai's format.
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+WEB_SEARCH_DIR = Path(__file__).parents[1] / "src" / "mcp_servers" / "web-search"
+sys.path.insert(0, str(WEB_SEARCH_DIR))
+
+from result_format import compact_links, compact_media, format_page, to_json  # noqa: E402
+
+WORDS = ["server", "model", "context", "protocol", "weather", "station", "search", "the",
+         "a", "of", "and", "with", "data", "tool", "result", "page", "browser", "cache"]
+
+
+def synthesize_crawl(seed: int = 0) -> tuple[str, dict, dict]:
+    rng = random.Random(seed)
+
+    paragraphs = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))).capitalize() + "."
+        for _ in range(400)
+    ]
+    markdown = "\n\n".join(paragraphs)
+
+    def link(href: str) -> dict:
+        return {
+            "href": href,
+            "text": " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8))),
+            "title": "",
+            "base_domain": href.split("/")[2],
+            "head_data": None,
+            "head_extraction_status": None,
+            "head_extraction_error": None,
+            "intrinsic_score": 0.0,
+            "contextual_score": None,
+            "total_score": None,
+        }
+
+    links = {
+        "internal": [link(f"https://example.com/page/{rng.randint(0, 200)}") for _ in range(400)],
+        "external": [link(f"https://other{rng.randint(0, 50)}.org/a?utm_source=x") for _ in range(200)],
+    }
+    media = {
+        "images": [
+            {
+                "src": f"/img/{rng.choice(['photo', 'icon', 'logo', 'chart'])}-{i}.jpg",
+                "alt": rng.choice(["", "A chart of the results", "Photo"]),
+                "desc": " ".join(rng.choice(WORDS) for _ in range(60)),
+                "score": rng.randint(0, 6),
+                "type": "image",
+                "group_id": i,
+                "format": "jpg",
+                "width": None,
+            }
+            for i in range(150)
+        ],
+        "videos": [],
+        "audios": [],
+    }
+
+    return markdown, links, media
+
+
+def bench(statement, number: int) -> float:
+    """Returns the best time per call in milliseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=5)) / number * 1e3
+
+
+def main():
+    url = "https://example.com/article"
+    markdown, links, media = synthesize_crawl()
+
+    def legacy() -> str:
+        return str({"markdown": markdown, "links": links, "media": media})
+
+    def compact() -> dict:
+        return {
+            "markdown": markdown,
+            "links": compact_links(links),
+            "media": compact_media(media, url),
+        }
+
+    page = compact()
+
+    def output() -> str:
+        return to_json(format_page(page, url, max_tokens=4000))
+
+    print(f"{'':<28}{'bytes':>10}{'time [ms]':>12}")
+    print(f"{'str(crawl_dict)':<28}{len(legacy().encode()):>10}{bench(legacy, 20):>12.2f}")
+    print(f"{'compaction (once per crawl)':<28}{'':>10}{bench(compact, 20):>12.2f}")
+    print(f"{'format_page + to_json':<28}{len(output().encode()):>10}{bench(output, 200):>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
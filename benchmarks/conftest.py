@@ -0,0 +1,44 @@
+import pytest
+
+from harness import BlockingClient
+from upstreams import Upstreams
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--transport",
+        choices=["stdio", "streamable-http"],
+        default="stdio",
+        help="Transport the benchmarked servers are started with.",
+    )
+    parser.addoption(
+        "--upstream-delay", type=float, default=0.0, help="Seconds per upstream response."
+    )
+
+
+@pytest.fixture(scope="session")
+def upstreams(request):
+    with Upstreams(delay=request.config.getoption("--upstream-delay")) as upstreams:
+        yield upstreams
+
+
+@pytest.fixture(scope="session")
+def client(request, upstreams, tmp_path_factory):
+    """Returns the client of a server, started once per session."""
+    clients = {}
+
+    def get(name: str) -> BlockingClient:
+        if name not in clients:
+            clients[name] = BlockingClient(
+                name,
+                upstreams,
+                tmp_path_factory.mktemp(name),
+                transport=request.config.getoption("--transport"),
+            )
+
+        return clients[name]
+
+    yield get
+
+    for started in clients.values():
+        started.close()
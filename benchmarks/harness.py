@@ -0,0 +1,328 @@
+"""Starts a server against the local upstreams and drives its tools over real MCP sessions.
+
+Shared by ``load.py`` and the pytest-benchmark suite in ``test_tools.py``. Servers are
+spawned as in ``bench_startup.py``, over stdio or streamable HTTP, with their own cache
+directory and the environment of ``upstreams.Upstreams`` pointing them at the stubs.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+
+import psutil
+from mcp import ClientSession
+from mcp.client.stdio import StdioServerParameters, stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+from bench_startup import SERVERS, SRC_DIR
+from upstreams import Upstreams
+
+# Arguments of a tool call for the i-th call of a workload
+Call = tuple[str, dict]
+Workload = Callable[[int, Upstreams], Call]
+
+LOCATIONS = ["Hamburg", "muenchen", "Berlin", "Zugspitz", "Koeln", "frankfurt main"]
+
+
+def point(i: int) -> tuple[float, float]:
+    """A location in Germany, spread so that most calls miss the response caches."""
+    return round(47.5 + (i * 0.37) % 7, 4), round(6.0 + (i * 0.53) % 9, 4)
+
+
+def weather_call(i: int, upstreams: Upstreams) -> Call:
+    lat, lon = point(i)
+    today = date.today().isoformat()
+
+    match i % 5:
+        case 0:
+            return "Get weather station information", {"location_name": LOCATIONS[i % len(LOCATIONS)]}
+        case 1:
+            return "Get nearest weather stations", {"lat": lat, "lon": lon}
+        case 2:
+            return "Fetch current weather", {"weather_query": {"lat": lat, "lon": lon}}
+        case 3:
+            return "Get weather forecast", {
+                "weather_query": {"date": today, "lat": lat, "lon": lon},
+                "resolution": "daily",
+            }
+        case _:
+            return "Get weather forecast for many locations", {
+                "locations": [dict(zip(("lat", "lon"), point(i + k))) for k in range(8)],
+                "date": today,
+            }
+
+
+def wikipedia_call(i: int, upstreams: Upstreams) -> Call:
+    match i % 3:
+        case 0:
+            return "search_wikipedia", {"subject": f"Topic {i % 100}", "mode": "search"}
+        case 1:
+            return "search_wikipedia", {"subject": f"Article {i % 100}"}
+        case _:
+            return "search_wikipedia_many", {"subjects": [f"Entity {i + k}" for k in range(10)]}
+
+
+def web_search_call(i: int, upstreams: Upstreams) -> Call:
+    # Every call crawls pages not in the crawl cache yet
+    if i % 2 == 0:
+        return "Deep Search", {"link": upstreams.site_url(i * 4)}
+
+    return "Deep Search Many", {
+        "links": [upstreams.site_url(i * 4 + k) for k in range(4)],
+        # All pages are served by the same host
+        "per_host_delay": 0.0,
+    }
+
+
+def gateway_call(i: int, upstreams: Upstreams) -> Call:
+    workload = (weather_call, wikipedia_call, web_search_call)[i % 3]
+
+    return workload(i // 3, upstreams)
+
+
+# ping is left out, it pings google.com no matter the upstreams
+WORKLOADS: dict[str, Workload] = {
+    "weather": weather_call,
+    "wikipedia-search": wikipedia_call,
+    "web-search": web_search_call,
+    "gateway": gateway_call,
+}
+
+
+def is_error(result) -> bool:
+    """Tool errors, and the error messages the tools return instead of JSON."""
+    if result.isError:
+        return True
+
+    try:
+        json.loads(result.content[0].text)
+
+    except (IndexError, AttributeError, ValueError):
+        return True
+
+    return False
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss(pid: int) -> int:
+    """Resident memory in bytes of a process and all its children (workers, browsers)."""
+    try:
+        process = psutil.Process(pid)
+        processes = [process, *process.children(recursive=True)]
+
+    except psutil.NoSuchProcess:
+        return 0
+
+    total = 0
+
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+
+        except psutil.NoSuchProcess:
+            pass
+
+    return total
+
+
+class PeakRss:
+    """Samples the RSS of a process tree in a thread, as a context manager."""
+
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self) -> None:
+        while True:
+            self.peak = max(self.peak, rss(self.pid))
+
+            if self._stop.wait(self.interval):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+@dataclass
+class Server:
+    """A started server: its process and how to open sessions with it."""
+
+    pid: int
+    session: Callable[[], AbstractAsyncContextManager[ClientSession]]
+
+
+def server_env(upstreams: Upstreams, cache_dir: Path) -> dict[str, str]:
+    return {
+        **os.environ,
+        **upstreams.env(),
+        "MCP_SERVERS_CACHE_DIR": str(cache_dir),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")])),
+    }
+
+
+@asynccontextmanager
+async def http_session(url: str) -> AsyncIterator[ClientSession]:
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+
+async def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with {process.returncode} before listening")
+
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+
+        except OSError:
+            await asyncio.sleep(0.1)
+
+    raise TimeoutError(f"Server did not listen on port {port} within {timeout}s")
+
+
+@asynccontextmanager
+async def start_server(
+    name: str,
+    upstreams: Upstreams,
+    cache_dir: Path,
+    transport: str = "stdio",
+    workers: int = 1,
+) -> AsyncIterator[Server]:
+    """Spawns a server (see ``bench_startup.SERVERS``) talking to the local upstreams.
+
+    Over stdio, all sessions share the one session of the process. Over streamable HTTP,
+    every session is a new connection, as with several clients.
+    """
+    directory, server_args, _, _ = SERVERS[name]
+    env = server_env(upstreams, cache_dir)
+
+    if transport == "stdio":
+        parameters = StdioServerParameters(
+            command=sys.executable, args=server_args, cwd=directory, env=env
+        )
+        before = {child.pid for child in psutil.Process().children()}
+
+        with open(os.devnull, "w") as devnull:
+            async with stdio_client(parameters, errlog=devnull) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    (pid,) = {child.pid for child in psutil.Process().children()} - before
+
+                    yield Server(pid, lambda: nullcontext(session))
+
+        return
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, *server_args, "--transport", transport, "--port", str(port),
+         "--workers", str(workers)],
+        cwd=directory,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        await wait_for_port(port, process)
+        yield Server(process.pid, lambda: http_session(f"http://127.0.0.1:{port}/mcp"))
+
+    finally:
+        process.terminate()
+
+        try:
+            process.wait(timeout=15)
+
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class BlockingClient:
+    """Synchronous calls into a started server, for pytest-benchmark.
+
+    The server and its session live in an event loop running in a thread; ``call`` blocks
+    until the tool answered.
+    """
+
+    def __init__(self, name: str, upstreams: Upstreams, cache_dir: Path, transport: str = "stdio"):
+        self.upstreams = upstreams
+        self.workload = WORKLOADS[name]
+        self.counter = itertools.count()
+        self.pid: int | None = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._session: ClientSession | None = None
+        self._started = threading.Event()
+        self._stop = asyncio.Event()
+        self._task = asyncio.run_coroutine_threadsafe(
+            self._serve(name, cache_dir, transport), self._loop
+        )
+        self._started.wait()
+
+        if self._task.done():
+            # Raises the error the server failed to start with
+            self._task.result()
+
+    async def _serve(self, name: str, cache_dir: Path, transport: str) -> None:
+        # The session is entered and left by this one task, as anyio requires
+        try:
+            async with start_server(name, self.upstreams, cache_dir, transport) as server:
+                async with server.session() as session:
+                    self.pid, self._session = server.pid, session
+                    self._started.set()
+                    await self._stop.wait()
+
+        finally:
+            self._started.set()
+
+    def call(self, tool: str | None = None, arguments: dict | None = None):
+        """Calls a tool, or the next call of the workload of the server if tool is None."""
+        if tool is None:
+            tool, arguments = self.workload(next(self.counter), self.upstreams)
+
+        result = asyncio.run_coroutine_threadsafe(
+            self._session.call_tool(tool, arguments or {}), self._loop
+        ).result()
+
+        if is_error(result):
+            raise RuntimeError(f"{tool} failed: {result.content[0].text[:200]}")
+
+        return result
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._task.result(timeout=30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
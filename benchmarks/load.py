@@ -0,0 +1,216 @@
+"""Load generator driving the tools of a server at rising concurrency.
+
+The server is spawned against local stand-ins of BrightSky, the DWD station list, MediaWiki
+and a static website (see ``upstreams.py``), and its tools are called over real MCP
+sessions, by ``--concurrency`` clients at a time for ``--duration`` seconds per level. Every
+level reports the throughput, the latency percentiles, the calls that failed and the peak
+RSS of the server including its worker processes and browsers.
+
+Usage:
+    uv run benchmarks/load.py weather [--transport streamable-http] [--concurrency 1,4,16,64]
+    uv run benchmarks/load.py gateway --save benchmarks/baselines/gateway.json
+    uv run benchmarks/load.py gateway --compare benchmarks/baselines/gateway.json
+
+Over stdio, all clients share the single session of the server process, over streamable
+HTTP every client opens a session of its own. ``--upstream-delay`` adds latency to every
+upstream response. ``--save`` stores the results as a baseline, ``--compare`` exits with 1
+if the throughput fell, or the p99 latency or RSS rose, by more than ``--tolerance``
+compared to a baseline.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from harness import WORKLOADS, PeakRss, is_error, start_server
+from upstreams import Upstreams
+
+
+def percentile(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def run_level(server, workload, upstreams, counter, concurrency: int, duration: float) -> dict:
+    """Calls the tools with concurrency clients for duration seconds."""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client() -> None:
+        nonlocal errors
+
+        async with server.session() as session:
+            while time.perf_counter() < deadline:
+                tool, arguments = workload(next(counter), upstreams)
+                started = time.perf_counter()
+
+                try:
+                    failed = is_error(await session.call_tool(tool, arguments))
+
+                except Exception:
+                    failed = True
+
+                latencies.append(time.perf_counter() - started)
+                errors += failed
+
+    with PeakRss(server.pid) as peak_rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "calls": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        **{
+            f"p{round(q * 100)}_ms": percentile(latencies, q) * 1e3
+            for q in (0.5, 0.95, 0.99)
+        },
+        "errors": errors,
+        "rss_mb": peak_rss.peak / 2**20,
+    }
+
+
+async def run(args: argparse.Namespace, upstreams: Upstreams, cache_dir: Path) -> list[dict]:
+    workload = WORKLOADS[args.server]
+    counter = itertools.count()
+
+    async with start_server(
+        args.server, upstreams, cache_dir, args.transport, args.workers
+    ) as server:
+        # Downloads the station list, imports polars and crawl4ai, ...
+        await run_level(server, workload, upstreams, counter, 1, args.warmup)
+        results = []
+
+        for concurrency in args.concurrency:
+            result = await run_level(
+                server, workload, upstreams, counter, concurrency, args.duration
+            )
+            print_row(result)
+            results.append(result)
+
+    return results
+
+
+COLUMNS = [
+    ("concurrency", "clients", "{:>8}"),
+    ("calls", "calls", "{:>8}"),
+    ("throughput", "calls/s", "{:>10.1f}"),
+    ("p50_ms", "p50 [ms]", "{:>10.1f}"),
+    ("p95_ms", "p95 [ms]", "{:>10.1f}"),
+    ("p99_ms", "p99 [ms]", "{:>10.1f}"),
+    ("errors", "errors", "{:>8}"),
+    ("rss_mb", "RSS [MB]", "{:>10.0f}"),
+]
+
+
+def print_header() -> None:
+    print("".join(f"{title:>{len(fmt.format(0))}}" for _, title, fmt in COLUMNS))
+
+
+def print_row(result: dict) -> None:
+    print("".join(fmt.format(result[key]) for key, _, fmt in COLUMNS), flush=True)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """Describes every level that got worse than the baseline by more than tolerance."""
+    found = []
+    levels = {level["concurrency"]: level for level in baseline["levels"]}
+
+    for result in results:
+        if (base := levels.get(result["concurrency"])) is None:
+            continue
+
+        checks = [
+            ("throughput", result["throughput"] < base["throughput"] * (1 - tolerance)),
+            ("p99_ms", result["p99_ms"] > base["p99_ms"] * (1 + tolerance)),
+            ("rss_mb", result["rss_mb"] > base["rss_mb"] * (1 + tolerance)),
+            ("errors", result["errors"] > base["errors"]),
+        ]
+
+        for key, worse in checks:
+            if worse:
+                found.append(
+                    f"{result['concurrency']} clients: {key} {base[key]:.1f} -> {result[key]:.1f}"
+                )
+
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("server", choices=list(WORKLOADS), help="Server to drive.")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    parser.add_argument("--workers", type=int, default=1, help="Workers of the HTTP server.")
+    parser.add_argument(
+        "--concurrency",
+        type=lambda value: [int(level) for level in value.split(",")],
+        default=[1, 4, 16, 64],
+        help="Comma separated numbers of concurrent clients.",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level.")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds of warm-up calls.")
+    parser.add_argument("--upstream-delay", type=float, default=0.0, help="Seconds per response.")
+    parser.add_argument("--save", type=Path, help="Save the results as a baseline.")
+    parser.add_argument("--compare", type=Path, help="Compare the results to a baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression.")
+    args = parser.parse_args()
+
+    print(f"{args.server} over {args.transport}, {args.duration:.0f}s per level\n")
+    print_header()
+
+    with Upstreams(delay=args.upstream_delay) as upstreams, tempfile.TemporaryDirectory() as cache_dir:
+        results = asyncio.run(run(args, upstreams, Path(cache_dir)))
+
+    report = {
+        "server": args.server,
+        "transport": args.transport,
+        "workers": args.workers,
+        "duration": args.duration,
+        "upstream_delay": args.upstream_delay,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "levels": results,
+    }
+
+    if args.save is not None:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2))
+        print(f"\nSaved baseline to {args.save}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text())
+        found = regressions(results, baseline, args.tolerance)
+        print(f"\nCompared to {args.compare} (commit {baseline.get('commit')}):")
+
+        for regression in found:
+            print(f"  regression at {regression}")
+
+        if found:
+            sys.exit(1)
+
+        print("  no regressions")
+
+
+if __name__ == "__main__":
+    main()
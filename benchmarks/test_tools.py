@@ -0,0 +1,56 @@
+"""Latency of every tool, called over a real MCP session against the local upstreams.
+
+Usage:
+    uv run pytest benchmarks [--transport streamable-http] [--upstream-delay 0.05]
+    uv run pytest benchmarks --benchmark-autosave
+    uv run pytest benchmarks --benchmark-compare --benchmark-compare-fail=median:20%
+
+Every tool is called with changing arguments (see ``harness.WORKLOADS``), so that the
+response caches of the servers don't answer every round. The RSS of the server after the
+rounds is reported in the ``extra_info`` of each benchmark.
+"""
+
+import itertools
+
+import pytest
+
+from harness import WORKLOADS, rss
+
+pytest.importorskip("pytest_benchmark")
+
+# The tools in the order the workload of their server cycles through them
+TOOLS = {
+    "weather": [
+        "Get weather station information",
+        "Get nearest weather stations",
+        "Fetch current weather",
+        "Get weather forecast",
+        "Get weather forecast for many locations",
+    ],
+    "wikipedia-search": ["search_wikipedia", "search_wikipedia", "search_wikipedia_many"],
+    "web-search": ["Deep Search", "Deep Search Many"],
+}
+
+CASES = [
+    pytest.param(server, offset, id=f"{server}-{offset}-{tool}")
+    for server, tools in TOOLS.items()
+    for offset, tool in enumerate(tools)
+]
+
+
+@pytest.mark.parametrize("server, offset", CASES)
+def test_tool(benchmark, client, upstreams, server, offset):
+    started = client(server)
+    period = len(TOOLS[server])
+    counter = itertools.count()
+
+    def call():
+        tool, arguments = WORKLOADS[server](offset + period * next(counter), upstreams)
+        assert tool == TOOLS[server][offset]
+
+        return started.call(tool, arguments)
+
+    # Downloads the station list, imports polars or crawl4ai, ...
+    call()
+    benchmark(call)
+    benchmark.extra_info["rss_mb"] = round(rss(started.pid) / 2**20, 1)
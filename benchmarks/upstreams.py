@@ -0,0 +1,271 @@
+"""Local stand-ins for the upstreams of the servers, for the load and tool benchmarks.
+
+``Upstreams`` serves, on one local port:
+
+- ``/brightsky/current_weather`` and ``/brightsky/weather``: deterministic BrightSky
+  responses for any location and period,
+- ``/dwd/statlex_rich.txt``: a DWD station list of the real size (see
+  ``bench_station_search.load_station_list``) whose stations are all active,
+- ``/w/api.php``: the MediaWiki queries of the wikipedia-search server,
+- ``/site/<n>``: static HTML articles linking to each other, to be crawled without a browser.
+
+The servers are pointed at it with the environment of ``Upstreams.env()``. Every response
+can be delayed by ``delay`` seconds, to stand in for the latency of the real upstreams.
+"""
+
+import json
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from bench_station_search import load_station_list
+
+# Longest period of a single weather request, BrightSky answers at most about a month too
+MAX_WEATHER_HOURS = 24 * 32
+
+
+def source(lat: float, lon: float, observation_type: str = "forecast") -> dict:
+    """A BrightSky source near (lat, lon), one per tenth of a degree."""
+    source_id = round(abs(lat) * 10) * 10_000 + round(abs(lon) * 10)
+
+    return {
+        "id": source_id,
+        "dwd_station_id": f"{source_id % 100_000:05}",
+        "wmo_station_id": f"{source_id % 100_000:05}",
+        "station_name": f"STATION {source_id}",
+        "observation_type": observation_type,
+        "first_record": "2010-01-01T00:00:00+00:00",
+        "last_record": "2030-01-01T00:00:00+00:00",
+        "lat": round(lat, 1),
+        "lon": round(lon, 1),
+        "height": 42.0,
+        "distance": 1500,
+    }
+
+
+def current_weather(params: dict) -> dict:
+    lat, lon = float(params.get("lat", 53.55)), float(params.get("lon", 10.0))
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    weather = {
+        "timestamp": now.isoformat(),
+        "cloud_cover": 75.0,
+        "condition": "dry",
+        "icon": "partly-cloudy-day",
+        "relative_humidity": 80,
+        "temperature": 12.5,
+        "visibility": 20000,
+    }
+
+    for field, value in [
+        ("precipitation", 0.0),
+        ("solar", 0.1),
+        ("sunshine", 10),
+        ("wind_direction", 250),
+        ("wind_speed", 14.0),
+        ("wind_gust_direction", 260),
+        ("wind_gust_speed", 28.0),
+    ]:
+        for minutes in (10, 30, 60):
+            if field != "sunshine" or minutes != 10:
+                weather[f"{field}_{minutes}"] = value
+
+    return {"weather": weather, "sources": [source(lat, lon, "synop")]}
+
+
+def weather(params: dict) -> dict:
+    """Hourly records from ``date`` up to ``last_date`` (defaults to a day later)."""
+    lat, lon = float(params.get("lat", 53.55)), float(params.get("lon", 10.0))
+    first = datetime.fromisoformat(params.get("date", date.today().isoformat()))
+    first = first if first.tzinfo else first.replace(tzinfo=timezone.utc)
+    last = datetime.fromisoformat(params["last_date"]) if "last_date" in params else None
+    last = (last if last.tzinfo else last.replace(tzinfo=timezone.utc)) if last else None
+    hours = int(((last - first) / timedelta(hours=1)) if last else 24)
+    station = source(lat, lon)
+    records = []
+
+    for hour in range(min(max(hours, 1), MAX_WEATHER_HOURS)):
+        timestamp = first + timedelta(hours=hour)
+        daytime = math.sin((timestamp.hour - 9) / 24 * 2 * math.pi)
+        records.append(
+            {
+                "timestamp": timestamp.isoformat(),
+                "source_id": station["id"],
+                "cloud_cover": 50 + round(40 * daytime),
+                "condition": "rain" if hour % 7 == 0 else "dry",
+                "dew_point": 4.0,
+                "icon": "cloudy",
+                "pressure_msl": 1013.2,
+                "relative_humidity": 70 - round(20 * daytime),
+                "temperature": round(8 + 6 * daytime + lat / 100, 1),
+                "visibility": 20000,
+                "precipitation": 0.4 if hour % 7 == 0 else 0.0,
+                "precipitation_probability": (hour * 13) % 100,
+                "solar": max(0.0, round(0.5 * daytime, 3)),
+                "sunshine": max(0, round(60 * daytime)),
+                "wind_direction": 240,
+                "wind_speed": 12.0,
+                "wind_gust_direction": 250,
+                "wind_gust_speed": 24.0,
+            }
+        )
+
+    return {"weather": records, "sources": [station]}
+
+
+def mediawiki(params: dict) -> dict:
+    """Answers the title lookups and searches of the wikipedia-search server."""
+    extract = "{title} is an article of the benchmark upstream. " * 20
+
+    if params.get("generator") == "search":
+        limit = int(params.get("gsrlimit", 3))
+        max_chars = int(params.get("exchars", 1200))
+        query = params.get("gsrsearch", "")
+
+        return {
+            "batchcomplete": True,
+            "query": {
+                "pages": [
+                    {
+                        "pageid": 1000 + index,
+                        "ns": 0,
+                        "title": f"{query} {index}",
+                        "index": index + 1,
+                        "extract": extract.format(title=f"{query} {index}")[:max_chars],
+                    }
+                    for index in range(limit)
+                ]
+            },
+        }
+
+    titles = params.get("titles", "").split("|")
+
+    if params.get("formatversion") == "2":
+        return {
+            "batchcomplete": True,
+            "query": {
+                "pages": [
+                    {"pageid": 1000 + index, "ns": 0, "title": title, "extract": extract.format(title=title)}
+                    for index, title in enumerate(titles)
+                ]
+            },
+        }
+
+    return {
+        "batchcomplete": "",
+        "query": {
+            "pages": {
+                str(1000 + index): {
+                    "pageid": 1000 + index,
+                    "ns": 0,
+                    "title": title,
+                    "extract": extract.format(title=title),
+                }
+                for index, title in enumerate(titles)
+            }
+        },
+    }
+
+
+def site_page(number: int, paragraphs: int = 30) -> str:
+    body = "".join(
+        f"<p>Paragraph {i} of article {number} with a <a href='/site/{number + i + 1}'>link</a>"
+        " and enough text to be kept as the content of the page.</p>"
+        for i in range(paragraphs)
+    )
+
+    return (
+        f"<html><head><title>Article {number}</title></head>"
+        f"<body><article><h1>Article {number}</h1>{body}</article></body></html>"
+    )
+
+
+class Upstreams:
+    """Threaded HTTP server answering for all upstreams, used as a context manager."""
+
+    def __init__(self, delay: float = 0.0, stations: int = 6000):
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+        # Dated today, so that all stations count as active
+        self.station_list = (
+            load_station_list(None, stations)
+            .replace("17.10.2026", date.today().strftime("%d.%m.%Y"))
+            .encode("latin-1")
+        )
+
+        upstreams = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, which stalls keep-alive connections
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                # Empty values are kept, so that parameters sent without a value fail loudly
+                params = dict(parse_qsl(url.query, keep_blank_values=True))
+
+                with upstreams._lock:
+                    upstreams.requests += 1
+
+                time.sleep(upstreams.delay)
+                status, body, content_type = upstreams.respond(url.path, params)
+
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                except ConnectionError:
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def respond(self, path: str, params: dict) -> tuple[int, bytes, str]:
+        """Returns the status, body and content type of a request."""
+        if path == "/brightsky/current_weather":
+            return 200, json.dumps(current_weather(params)).encode(), "application/json"
+
+        if path == "/brightsky/weather":
+            return 200, json.dumps(weather(params)).encode(), "application/json"
+
+        if path == "/dwd/statlex_rich.txt":
+            return 200, self.station_list, "text/plain"
+
+        if path == "/w/api.php":
+            return 200, json.dumps(mediawiki(params)).encode(), "application/json"
+
+        if path.startswith("/site/") and path[6:].isdigit():
+            return 200, site_page(int(path[6:])).encode(), "text/html; charset=utf-8"
+
+        return 404, b"Not Found", "text/plain"
+
+    def site_url(self, number: int) -> str:
+        return f"{self.url}/site/{number}"
+
+    def env(self) -> dict[str, str]:
+        """The environment pointing the servers at these upstreams."""
+        return {
+            "MCP_SERVERS_BRIGHTSKY_URL": f"{self.url}/brightsky",
+            "MCP_SERVERS_STATION_LIST_URL": f"{self.url}/dwd/statlex_rich.txt",
+            "MCP_SERVERS_WIKIPEDIA_API_URL": f"{self.url}/w/api.php",
+        }
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
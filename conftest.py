@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pytest
+
+
+class StubServer:
+    """Local HTTP server standing in for an upstream API.
+
+    Answers GET requests from routes registered with ``route`` and records every request.
+    """
+
+    def __init__(self):
+        self.routes: dict[str, tuple[int, bytes, dict, float]] = {}
+        self.requests: list[dict] = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+
+                with stub._lock:
+                    stub.requests.append(
+                        {
+                            "path": url.path,
+                            "params": dict(parse_qsl(url.query)),
+                            "headers": dict(self.headers),
+                        }
+                    )
+
+                status, body, headers, delay = stub.routes.get(
+                    url.path, (404, b"Not Found", {}, 0.0)
+                )
+                time.sleep(delay)
+
+                try:
+                    self.send_response(status)
+                    for key, value in headers.items():
+                        self.send_header(key, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                except ConnectionError:
+                    # The client gave up waiting, e.g. after a timeout
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def route(
+        self,
+        path: str,
+        body: bytes | str | dict | list,
+        status: int = 200,
+        headers: dict | None = None,
+        delay: float = 0.0,
+    ) -> str:
+        """Registers the response for path and returns its full URL."""
+        headers = dict(headers or {})
+
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+            headers.setdefault("Content-Type", "application/json")
+
+        if isinstance(body, str):
+            body = body.encode()
+
+        self.routes[path] = (status, body, headers, delay)
+
+        return self.url + path
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    with StubServer() as server:
+        yield server
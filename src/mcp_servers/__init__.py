@@ -0,0 +1,6 @@
+def main() -> None:
+    """Entry point of the ``mcp-servers`` script, see ``mcp_servers.gateway``."""
+    # Imported here, so that the servers importing e.g. mcp_servers.cache don't load it
+    from mcp_servers.gateway import main
+
+    main()
@@ -0,0 +1,250 @@
+"""Size-bounded TTL cache for upstream responses, with an optional on-disk tier."""
+
+import hashlib
+import logging
+import os
+import struct
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from mcp_servers.files import write_atomic
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping overhead (key, tuple, dict slot), counted towards max_bytes
+_ENTRY_OVERHEAD = 128
+_EXPIRY = struct.Struct("!d")
+
+# Seconds after which the size of the disk tier is taken from the directory again, as other
+# processes (e.g. the workers of an HTTP server) may write to it as well
+DISK_RESCAN_INTERVAL = 60
+
+
+class TTLCache:
+    """LRU cache of byte strings whose entries expire after a per-entry TTL.
+
+    The in-memory tier is bounded by the total size of its entries. If a directory is given,
+    entries are also written to disk (one file per entry, prefixed with its expiry time), so
+    they survive restarts and memory evictions; the disk tier is bounded separately and
+    evicts the least recently used files first. Several processes can share the directory.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 2**20,
+        directory: Path | None = None,
+        max_disk_bytes: int = 256 * 2**20,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            max_bytes (int): Upper bound of the in-memory tier in bytes.
+            directory (Path | None): Directory of the disk tier, None to disable it.
+            max_disk_bytes (int): Upper bound of the disk tier in bytes.
+            clock (Callable[[], float]): Returns the current time in seconds.
+        """
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.clock = clock
+
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+        self._counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+        self._disk_bytes = 0
+        self._disk_scanned_at = time.monotonic()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def get(self, key: str) -> bytes | None:
+        """Returns the cached value, or None if there is no unexpired entry for key."""
+        now = self.clock()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            expires_at, value = entry
+
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                self._count_hit("memory_hits")
+
+                return value
+
+            self._counters["expired"] += 1
+            self._remove(key)
+
+        if self.directory is not None:
+            entry = self._read_disk(key, now)
+
+            if entry is not None:
+                expires_at, value = entry
+                self._set_memory(key, value, expires_at)
+                self._count_hit("disk_hits")
+
+                return value
+
+        self._counters["misses"] += 1
+
+        return None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Caches value under key for ttl seconds."""
+        expires_at = self.clock() + ttl
+        self._set_memory(key, value, expires_at)
+
+        if self.directory is not None:
+            self._write_disk(key, value, expires_at)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+        for path in self._disk_files():
+            path.unlink(missing_ok=True)
+
+        self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self._counters["hits"] + self._counters["misses"]
+
+        return {
+            **self._counters,
+            "hit_ratio": self._counters["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def _count_hit(self, tier: str) -> None:
+        self._counters["hits"] += 1
+        self._counters[tier] += 1
+
+    def _set_memory(self, key: str, value: bytes, expires_at: float) -> None:
+        size = len(key) + len(value) + _ENTRY_OVERHEAD
+
+        if size > self.max_bytes:
+            return
+
+        self._remove(key)
+        self._entries[key] = (expires_at, value)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._counters["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self._bytes -= len(key) + len(entry[1]) + _ENTRY_OVERHEAD
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    def _disk_files(self) -> list[Path]:
+        if self.directory is None:
+            return []
+
+        return [path for path in self.directory.iterdir() if path.suffix != ".tmp"]
+
+    def _read_disk(self, key: str, now: float) -> tuple[float, bytes] | None:
+        path = self._path(key)
+
+        try:
+            data = path.read_bytes()
+            (expires_at,) = _EXPIRY.unpack_from(data)
+
+        except FileNotFoundError:
+            return None
+
+        except struct.error:
+            logger.warning(f"Removing truncated cache entry {path}")
+            self._unlink(path)
+
+            return None
+
+        if expires_at <= now:
+            self._counters["expired"] += 1
+            self._unlink(path)
+
+            return None
+
+        try:
+            # Keeps recently used files away from eviction
+            os.utime(path)
+
+        except FileNotFoundError:
+            # Evicted by another process meanwhile
+            pass
+
+        return expires_at, data[_EXPIRY.size :]
+
+    def _write_disk(self, key: str, value: bytes, expires_at: float) -> None:
+        path = self._path(key)
+        data = _EXPIRY.pack(expires_at) + value
+
+        try:
+            self._unlink(path)
+            write_atomic(path, data)
+            self._disk_bytes += len(data)
+
+        except OSError as e:
+            logger.warning(f"Could not write cache entry to disk: {e}")
+
+            return
+
+        if (
+            self._disk_bytes > self.max_disk_bytes
+            or time.monotonic() - self._disk_scanned_at > DISK_RESCAN_INTERVAL
+        ):
+            self._prune_disk()
+
+    def _scan_disk(self) -> list[Path]:
+        """Takes the size of the disk tier from the directory, returns its files oldest first."""
+        files = []
+
+        for path in self._disk_files():
+            try:
+                files.append((path.stat(), path))
+
+            except FileNotFoundError:
+                pass
+
+        files.sort(key=lambda file: file[0].st_mtime)
+        self._disk_bytes = sum(stat.st_size for stat, _ in files)
+        self._disk_scanned_at = time.monotonic()
+
+        return [path for _, path in files]
+
+    def _prune_disk(self) -> None:
+        files = self._scan_disk()
+
+        if self._disk_bytes <= self.max_disk_bytes:
+            return
+
+        # Prune to 90% so that not every write triggers a directory scan
+        while files and self._disk_bytes > 0.9 * self.max_disk_bytes:
+            self._unlink(files.pop(0))
+
+    def _unlink(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            self._disk_bytes -= size
+
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,27 @@
+"""Atomic file writes, safe when several processes share the cache directory."""
+
+import os
+import threading
+from pathlib import Path
+
+
+def temporary_path(path: Path) -> Path:
+    """Returns a path next to path to write to before ``os.replace``-ing path with it.
+
+    The name is unique to the process and thread, so that concurrent writers of the same
+    file (e.g. the workers of an HTTP server) never write into each other's file.
+    """
+    return path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Writes data to path, readers see either the previous or the complete new content."""
+    tmp_path = temporary_path(path)
+
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
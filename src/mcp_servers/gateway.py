@@ -0,0 +1,189 @@
+"""Gateway serving the tools of all MCP servers from a single process.
+
+Every server stays a standalone script (see ``mcp.json.template``), the gateway imports
+their ``FastMCP`` apps and mounts them into one app instead. They then share the event loop,
+the pooled HTTP client (see ``mcp_servers.http_client``) and the in-memory caches of the
+process, and a single warm process replaces four cold ones::
+
+    uv run mcp-servers                                  # all servers over stdio
+    uv run mcp-servers --no-web-search                  # without the web-search server
+    uv run mcp-servers --transport streamable-http --port 8000 --workers 4
+
+See ``mcp_servers.serve`` for the transports.
+"""
+
+import argparse
+import importlib
+import logging
+import sys
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.server.fastmcp.tools import Tool, ToolManager
+
+from mcp_servers.serve import add_arguments, serve
+from mcp_servers.settings import env_flag
+
+logger = logging.getLogger(__name__)
+
+SERVERS_DIR = Path(__file__).parent
+
+# Directory and module of every server, each module defines its app as ``mcp``
+SERVERS = {
+    "ping": ("ping", "ping"),
+    "weather": ("weather", "weather"),
+    "wikipedia": ("wikipedia-search", "search"),
+    "web-search": ("web-search", "web_search"),
+}
+
+
+class MountedTools(ToolManager):
+    """Tool manager answering with the tools of several servers, as if they were one.
+
+    The tools stay with the tool managers of their servers (e.g. a ``ToolRegistry``, which
+    builds them on first use), tools added to the gateway itself come first. If two servers
+    define a tool of the same name, the one mounted first wins.
+    """
+
+    def __init__(self, managers: dict[str, ToolManager], warn_on_duplicate_tools: bool = True):
+        """
+        Args:
+            managers (dict[str, ToolManager]): The tool manager of every mounted server.
+            warn_on_duplicate_tools (bool): Log a warning if a tool name is taken twice.
+        """
+        super().__init__(warn_on_duplicate_tools)
+        self.managers = managers
+
+    def get_tool(self, name: str) -> Tool | None:
+        if (tool := self._tools.get(name)) is not None:
+            return tool
+
+        for manager in self.managers.values():
+            if (tool := manager.get_tool(name)) is not None:
+                return tool
+
+        return None
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+        context: Context | None = None,
+        convert_result: bool = False,
+    ) -> Any:
+        """Calls a tool through the manager owning it, e.g. within the limits of its scheduler."""
+        if name in self._tools:
+            return await super().call_tool(name, arguments, context, convert_result)
+
+        for manager in self.managers.values():
+            if manager.get_tool(name) is not None:
+                return await manager.call_tool(name, arguments, context, convert_result)
+
+        raise ToolError(f"Unknown tool: {name}")
+
+    def list_tools(self) -> list[Any]:
+        tools = {tool.name: tool for tool in super().list_tools()}
+
+        for server, manager in self.managers.items():
+            for tool in manager.list_tools():
+                if tool.name in tools:
+                    if self.warn_on_duplicate_tools:
+                        logger.warning(f"Tool {tool.name} of {server} is hidden by another tool")
+
+                    continue
+
+                tools[tool.name] = tool
+
+        return list(tools.values())
+
+    def remove_tool(self, name: str) -> None:
+        if name in self._tools:
+            del self._tools[name]
+            return
+
+        for manager in self.managers.values():
+            if manager.get_tool(name) is not None:
+                manager.remove_tool(name)
+                return
+
+        raise ToolError(f"Unknown tool: {name}")
+
+
+def load_server(name: str) -> FastMCP:
+    """Imports the app of a server, with its directory on ``sys.path`` for its sibling imports."""
+    directory, module = SERVERS[name]
+    path = str(SERVERS_DIR / directory)
+
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+    return importlib.import_module(module).mcp
+
+
+def mount(apps: dict[str, FastMCP], name: str = "mcp-servers", **settings) -> FastMCP:
+    """Creates one app serving the tools of all apps.
+
+    Its lifespan runs the lifespans of all apps (e.g. starting the browser pool of
+    web-search), which are left in reverse order on shutdown.
+
+    Args:
+        apps (dict[str, FastMCP]): The apps to mount, by server name.
+        name (str): Name of the gateway app.
+        **settings: Passed on to ``FastMCP`` (host, port, ...).
+
+    Returns:
+        FastMCP: The gateway app.
+    """
+
+    @asynccontextmanager
+    async def lifespan(gateway: FastMCP) -> AsyncIterator[None]:
+        async with AsyncExitStack() as stack:
+            for app in apps.values():
+                if app.settings.lifespan is not None:
+                    await stack.enter_async_context(app.settings.lifespan(app))
+
+            yield
+
+    gateway = FastMCP(name, lifespan=lifespan, **settings)
+    gateway._tool_manager = MountedTools(
+        {server: app._tool_manager for server, app in apps.items()},
+        warn_on_duplicate_tools=gateway.settings.warn_on_duplicate_tools,
+    )
+
+    return gateway
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point of the ``mcp-servers`` script.
+
+    Servers are enabled by default, ``MCP_SERVERS_ENABLE_<SERVER>`` (e.g.
+    ``MCP_SERVERS_ENABLE_WEB_SEARCH=0``) or ``--no-<server>`` disable them.
+    """
+    parser = argparse.ArgumentParser(description="Serves the tools of all MCP servers.")
+    add_arguments(parser)
+
+    for server in SERVERS:
+        parser.add_argument(
+            f"--{server}",
+            action=argparse.BooleanOptionalAction,
+            default=env_flag(f"MCP_SERVERS_ENABLE_{server.upper().replace('-', '_')}", True),
+            help=f"Serve the tools of the {server} server.",
+        )
+
+    args = parser.parse_args(argv)
+    enabled = [server for server in SERVERS if getattr(args, server.replace("-", "_"))]
+
+    if not enabled:
+        parser.error("All servers are disabled")
+
+    gateway = mount({server: load_server(server) for server in enabled})
+    logger.info(f"Serving {', '.join(enabled)} over {args.transport}")
+    serve(gateway, enabled, args, parser)
+
+
+if __name__ == "__main__":
+    main()
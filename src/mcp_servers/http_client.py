@@ -0,0 +1,240 @@
+"""Shared, pooled async HTTP client for the MCP servers.
+
+Every server process uses a single ``httpx.AsyncClient`` (see ``get_http_client``), so TCP
+and TLS connections are kept alive and reused across tool calls instead of being set up
+again for every request. Every request is recorded in the metrics of the process (see
+``mcp_servers.metrics``).
+"""
+
+import asyncio
+import importlib.util
+import logging
+import random
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from mcp_servers.metrics import measure_upstream
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "MCPPythonBot-personal-use"
+
+DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0
+)
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class HttpClient:
+    """Pooled ``httpx.AsyncClient`` with per-host connection limits and retries.
+
+    Idempotent requests that fail with a transport error or one of ``RETRY_STATUS_CODES``
+    are retried with exponential backoff and jitter, honouring ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        max_connections_per_host: int = 10,
+        retries: int = 2,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        http2: bool = True,
+        headers: dict[str, str] | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """
+        Args:
+            timeout (httpx.Timeout): Default timeouts of every request.
+            limits (httpx.Limits): Limits of the connection pool.
+            max_connections_per_host (int): Maximum number of concurrent requests per host.
+            retries (int): Number of retries after the first attempt.
+            backoff (float): Base delay in seconds, doubled with every retry.
+            max_backoff (float): Upper bound of a single delay in seconds.
+            http2 (bool): Negotiate HTTP/2 if the ``h2`` package is installed.
+            headers (dict[str, str] | None): Default headers of every request.
+            transport (httpx.AsyncBaseTransport | None): Custom transport, e.g. for tests.
+        """
+        self.timeout = timeout
+        self.limits = limits
+        self.max_connections_per_host = max_connections_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.transport = transport
+
+        self._client: httpx.AsyncClient | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.max_connections_per_host)
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+                headers=self.headers,
+                transport=self.transport,
+                follow_redirects=True,
+            )
+
+        return self._client
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def request(
+        self, method: str, url: str, *, retries: int | None = None, **kwargs
+    ) -> httpx.Response:
+        """Sends a request, retrying idempotent ones on transient failures.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            retries (int | None): Overrides the number of retries of this client.
+            **kwargs: Passed on to ``httpx.AsyncClient.request`` (params, headers, timeout, ...).
+
+        Returns:
+            httpx.Response: The last response. Raises the last transport error if all
+                            attempts failed without a response.
+        """
+        retries = self.retries if retries is None else retries
+
+        if method.upper() not in IDEMPOTENT_METHODS:
+            retries = 0
+
+        host = httpx.URL(url).host
+
+        for attempt in range(retries + 1):
+            try:
+                async with self._host_slots[host]:
+                    with measure_upstream(host) as measured:
+                        response = await self.client.request(method, url, **kwargs)
+                        measured.done(response.status_code, response.num_bytes_downloaded)
+
+            except httpx.TransportError as e:
+                if attempt == retries:
+                    raise
+
+                delay = self._backoff_delay(attempt)
+                logger.debug(f"{method} {url} failed with {e!r}, retrying in {delay:.2f}s")
+
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                    return response
+
+                delay = self._retry_after(response) or self._backoff_delay(attempt)
+                await response.aclose()
+                logger.debug(
+                    f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s"
+                )
+
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs) -> AsyncIterator[httpx.Response]:
+        """Sends a request whose body is read incrementally, e.g. with ``aiter_bytes``.
+
+        Streamed requests are not retried, as part of the body may already be consumed.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to request.
+            **kwargs: Passed on to ``httpx.AsyncClient.stream`` (params, headers, timeout, ...).
+
+        Yields:
+            httpx.Response: The response, with its body not yet read.
+        """
+        host = httpx.URL(url).host
+
+        async with self._host_slots[host]:
+            with measure_upstream(host) as measured:
+                async with self.client.stream(method, url, **kwargs) as response:
+                    try:
+                        yield response
+
+                    finally:
+                        measured.done(response.status_code, response.num_bytes_downloaded)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _backoff_delay(self, attempt: int) -> float:
+        delay = min(self.max_backoff, self.backoff * 2**attempt)
+
+        # Full jitter, so that concurrent retries don't hit the upstream at the same time
+        return random.uniform(0, delay)
+
+    def _retry_after(self, response: httpx.Response) -> float | None:
+        retry_after = response.headers.get("Retry-After")
+
+        if retry_after is None:
+            return None
+
+        try:
+            delay = float(retry_after)
+
+        except ValueError:
+            try:
+                delay = (
+                    parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)
+                ).total_seconds()
+
+            except (TypeError, ValueError):
+                return None
+
+        return min(self.max_backoff, max(0.0, delay))
+
+
+_http_client: HttpClient | None = None
+_http_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_http_client() -> HttpClient:
+    """Returns the HTTP client shared by all tools of this process.
+
+    Connection pools are bound to the event loop they were created in, so a new client is
+    created if this is called from a different loop (e.g. consecutive ``asyncio.run``).
+    """
+    global _http_client, _http_client_loop
+
+    loop = asyncio.get_running_loop()
+
+    if _http_client is None or _http_client_loop is not loop:
+        _http_client = HttpClient()
+        _http_client_loop = loop
+
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+@asynccontextmanager
+async def http_lifespan(server) -> AsyncIterator[None]:
+    """FastMCP lifespan that closes the shared HTTP client on shutdown."""
+    try:
+        yield
+
+    finally:
+        await close_http_client()
@@ -0,0 +1,592 @@
+"""Per-tool and upstream metrics of a server process, and sampled payload logging.
+
+Every tool call (see ``ToolRegistry.call_tool``) and every request of the pooled HTTP client
+(see ``mcp_servers.http_client``) is recorded:
+
+* tools: calls, errors (raised exceptions), latency histogram, time spent waiting for
+  upstream requests and locally, bytes of the arguments and results,
+* upstream hosts: requests by status, errors, latency histogram and bytes received,
+* registered stats (see ``register_stats``), e.g. the hit ratios of the caches, and the
+  queues of the scheduler.
+
+They are served as Prometheus text or OpenMetrics (see ``render``) on ``/metrics`` of the HTTP
+transports or on a port of their own over stdio (``--metrics``, see ``mcp_servers.serve``),
+and summarized by the ``server_stats`` tool.
+
+Payloads (tool arguments and results, upstream responses) are only logged for a sample of
+the calls, ``MCP_SERVERS_LOG_PAYLOADS`` sets the sampled share (0 to 1, off by default).
+"""
+
+import bisect
+import contextvars
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pydantic_core
+from mcp.server.fastmcp import FastMCP
+
+from mcp_servers.scheduler import get_scheduler
+from mcp_servers.settings import env_float
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets in seconds, from 1 ms to ~65 s in steps of sqrt(2)
+LATENCY_BUCKETS = tuple(0.001 * 2 ** (i / 2) for i in range(33))
+
+# Characters of a sampled payload that are logged
+MAX_PAYLOAD_CHARS = 4096
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+class Histogram:
+    """Counts of observations per bucket, with quantiles estimated like Prometheus does."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Returns the q-quantile, interpolated linearly within its bucket.
+
+        Values beyond the last bucket are reported as its upper bound.
+        """
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+
+                lower = self.buckets[i - 1] if i else 0.0
+
+                return lower + (self.buckets[i] - lower) * (rank - seen) / count
+
+            seen += count
+
+        return self.buckets[-1]
+
+    def summary(self) -> dict:
+        """Returns the p50, p95, p99 and mean in milliseconds."""
+        return {
+            **{f"p{round(q * 100)}": round(self.quantile(q) * 1e3, 1) for q in (0.5, 0.95, 0.99)},
+            "mean": round(self.sum / self.count * 1e3, 1) if self.count else 0.0,
+        }
+
+
+class ToolMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.queued_seconds = 0.0
+        self.upstream_seconds = 0.0
+        self.local_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class UpstreamMetrics:
+    def __init__(self):
+        self.requests: dict[str, int] = defaultdict(int)
+        self.latency = Histogram()
+        self.response_bytes = 0
+
+    @property
+    def errors(self) -> int:
+        return sum(
+            count
+            for status, count in list(self.requests.items())
+            if status == "error" or int(status) >= 400
+        )
+
+
+class ToolCall:
+    """A running tool call, collecting the time its upstream requests take.
+
+    Upstream time is the time at least one upstream request of the call was in flight, so
+    concurrent requests (e.g. the months of a historical weather query) are not added up.
+    """
+
+    def __init__(self, tool: str, sampled: bool):
+        self.tool = tool
+        self.sampled = sampled
+        self.created = time.perf_counter()
+        self.started: float | None = None
+        self.upstream_seconds = 0.0
+        self.result: Any = None
+
+        self._upstream_in_flight = 0
+        self._upstream_since = 0.0
+
+    def start(self) -> None:
+        """Marks the end of the wait for a slot of the tool (see ``Scheduler.slot``)."""
+        self.started = time.perf_counter()
+
+    def upstream_started(self) -> None:
+        if self._upstream_in_flight == 0:
+            self._upstream_since = time.perf_counter()
+
+        self._upstream_in_flight += 1
+
+    def upstream_finished(self) -> None:
+        self._upstream_in_flight -= 1
+
+        if self._upstream_in_flight == 0:
+            self.upstream_seconds += time.perf_counter() - self._upstream_since
+
+
+class UpstreamRequest:
+    """Outcome of an upstream request, filled in by the caller of ``measure_upstream``."""
+
+    def __init__(self):
+        self.status = "error"
+        self.response_bytes = 0
+
+    def done(self, status_code: int, response_bytes: int) -> None:
+        self.status = str(status_code)
+        self.response_bytes = response_bytes
+
+
+class Metrics:
+    """The metrics of a process, see the module docstring."""
+
+    def __init__(self, payload_sample_rate: float = 0.0):
+        """
+        Args:
+            payload_sample_rate (float): Share of the calls whose payloads are logged.
+        """
+        self.payload_sample_rate = payload_sample_rate
+        self.started = time.time()
+        self.tools: dict[str, ToolMetrics] = defaultdict(ToolMetrics)
+        self.upstreams: dict[str, UpstreamMetrics] = defaultdict(UpstreamMetrics)
+        self.sources: dict[tuple[str, str], Callable[[], dict]] = {}
+
+    def register_stats(self, kind: str, name: str, stats: Callable[[], dict]) -> None:
+        """Exports the numbers returned by stats as ``mcp_<kind>_<key>{name="<name>"}``.
+
+        Args:
+            kind (str): What is measured, e.g. "cache" or "single_flight".
+            name (str): Which one, e.g. "brightsky".
+            stats (Callable[[], dict]): Returns the current numbers, e.g. ``TTLCache.stats``.
+        """
+        self.sources[(kind, name)] = stats
+
+    def sample(self) -> bool:
+        return self.payload_sample_rate > 0 and random.random() < self.payload_sample_rate
+
+    def record_tool(self, call: ToolCall, arguments: Any, result: Any, failed: bool) -> None:
+        tool = self.tools[call.tool]
+        finished = time.perf_counter()
+        started = call.started or finished
+
+        tool.calls += 1
+        tool.errors += failed
+        tool.latency.observe(finished - call.created)
+        tool.queued_seconds += started - call.created
+        tool.upstream_seconds += call.upstream_seconds
+        tool.local_seconds += max(0.0, finished - started - call.upstream_seconds)
+        tool.request_bytes += payload_size(arguments)
+        tool.response_bytes += payload_size(result)
+
+    def record_upstream(self, host: str, request: UpstreamRequest, seconds: float) -> None:
+        upstream = self.upstreams[host]
+        upstream.requests[request.status] += 1
+        upstream.latency.observe(seconds)
+        upstream.response_bytes += request.response_bytes
+
+    def summary(self) -> dict:
+        """Returns the metrics as JSON serializable dict, latencies in milliseconds."""
+        uptime = max(time.time() - self.started, 1e-9)
+
+        def rate(errors: int, total: int) -> float:
+            return round(errors / total, 4) if total else 0.0
+
+        stats: dict[str, dict] = defaultdict(dict)
+
+        for (kind, name), source in list(self.sources.items()):
+            stats[kind][name] = source()
+
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "tools": {
+                name: {
+                    "calls": tool.calls,
+                    "calls_per_minute": round(tool.calls / uptime * 60, 2),
+                    "errors": tool.errors,
+                    "error_rate": rate(tool.errors, tool.calls),
+                    "latency_ms": tool.latency.summary(),
+                    "queued_seconds": round(tool.queued_seconds, 3),
+                    "upstream_seconds": round(tool.upstream_seconds, 3),
+                    "local_seconds": round(tool.local_seconds, 3),
+                    "request_bytes": tool.request_bytes,
+                    "response_bytes": tool.response_bytes,
+                }
+                for name, tool in list(self.tools.items())
+            },
+            "upstreams": {
+                host: {
+                    "requests": dict(upstream.requests),
+                    "error_rate": rate(upstream.errors, upstream.latency.count),
+                    "latency_ms": upstream.latency.summary(),
+                    "response_bytes": upstream.response_bytes,
+                }
+                for host, upstream in list(self.upstreams.items())
+            },
+            "scheduler": get_scheduler().stats(),
+            **stats,
+        }
+
+    def render(self, openmetrics: bool = False) -> str:
+        """Returns the metrics in the Prometheus text format, or as OpenMetrics."""
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help: str, samples: list[tuple[str, dict, float]]):
+            # OpenMetrics names counter families without the _total of their samples
+            family_name = name if kind != "counter" or not openmetrics else name[: -len("_total")]
+            lines.append(f"# HELP {family_name} {help}")
+            lines.append(f"# TYPE {family_name} {kind}")
+
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{format_labels(labels)} {format_value(value)}")
+
+        tools = list(self.tools.items())
+        upstreams = list(self.upstreams.items())
+
+        family(
+            "mcp_tool_calls_total",
+            "counter",
+            "Tool calls by outcome.",
+            [
+                ("", {"tool": name, "outcome": outcome}, count)
+                for name, tool in tools
+                for outcome, count in (("ok", tool.calls - tool.errors), ("error", tool.errors))
+            ],
+        )
+        family(
+            "mcp_tool_duration_seconds",
+            "histogram",
+            "Latency of tool calls, including the wait for a slot of the tool.",
+            [
+                sample
+                for name, tool in tools
+                for sample in histogram_samples(tool.latency, {"tool": name})
+            ],
+        )
+
+        for attribute, help in (
+            ("queued_seconds", "Time tool calls waited for a slot of their tool."),
+            ("upstream_seconds", "Time tool calls waited for upstream requests."),
+            ("local_seconds", "Time tool calls spent without upstream requests in flight."),
+            ("request_bytes", "Bytes of the arguments of tool calls."),
+            ("response_bytes", "Bytes of the results of tool calls."),
+        ):
+            family(
+                f"mcp_tool_{attribute}_total",
+                "counter",
+                help,
+                [("", {"tool": name}, getattr(tool, attribute)) for name, tool in tools],
+            )
+
+        family(
+            "mcp_upstream_requests_total",
+            "counter",
+            "Upstream requests by status code (error if no response was received).",
+            [
+                ("", {"host": host, "status": status}, count)
+                for host, upstream in upstreams
+                for status, count in list(upstream.requests.items())
+            ],
+        )
+        family(
+            "mcp_upstream_duration_seconds",
+            "histogram",
+            "Latency of upstream requests.",
+            [
+                sample
+                for host, upstream in upstreams
+                for sample in histogram_samples(upstream.latency, {"host": host})
+            ],
+        )
+        family(
+            "mcp_upstream_response_bytes_total",
+            "counter",
+            "Bytes received from upstream hosts.",
+            [("", {"host": host}, upstream.response_bytes) for host, upstream in upstreams],
+        )
+
+        scheduler = get_scheduler().stats()
+
+        for key in ("running", "queued", "max_queued"):
+            family(
+                f"mcp_tool_{key}",
+                "gauge",
+                f"Tool calls {key.replace('_', ' ')} (see mcp_servers.scheduler).",
+                [("", {"tool": tool}, stats[key]) for tool, stats in scheduler["tools"].items()],
+            )
+
+        for key in ("pending", "max_pending", "size"):
+            family(
+                f"mcp_pool_{key}",
+                "gauge",
+                f"{key.replace('_', ' ').capitalize()} of the thread and process pools.",
+                [("", {"pool": pool}, scheduler[pool][key]) for pool in ("threads", "processes")],
+            )
+
+        by_metric: dict[str, list[tuple[str, dict, float]]] = defaultdict(list)
+
+        for (kind, name), source in list(self.sources.items()):
+            for key, value in source().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    by_metric[f"mcp_{kind}_{key}"].append(("", {"name": name}, value))
+
+        for metric, samples in sorted(by_metric.items()):
+            family(metric, "gauge", f"{metric[len('mcp_'):].replace('_', ' ')}.", samples)
+
+        if openmetrics:
+            lines.append("# EOF")
+
+        return "\n".join(lines) + "\n"
+
+
+def histogram_samples(histogram: Histogram, labels: dict) -> list[tuple[str, dict, float]]:
+    samples = []
+    cumulative = 0
+
+    for bound, count in zip((*histogram.buckets, math.inf), histogram.counts):
+        cumulative += count
+        samples.append(("_bucket", {**labels, "le": format_value(bound)}, cumulative))
+
+    return [*samples, ("_count", labels, histogram.count), ("_sum", labels, histogram.sum)]
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+
+    def escape(value: Any) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{key}="{escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def payload_size(payload: Any) -> int:
+    """Returns the bytes of a payload: strings, content blocks and JSON-like structures."""
+    if payload is None:
+        return 0
+
+    if isinstance(payload, bytes):
+        return len(payload)
+
+    if isinstance(payload, str):
+        return len(payload.encode())
+
+    if isinstance(payload, (list, tuple)):
+        return sum(payload_size(item) for item in payload)
+
+    if isinstance(text := getattr(payload, "text", None), str):
+        return len(text.encode())
+
+    try:
+        return len(pydantic_core.to_json(payload))
+
+    except Exception:
+        return 0
+
+
+_current_call: contextvars.ContextVar[ToolCall | None] = contextvars.ContextVar(
+    "current_call", default=None
+)
+
+_metrics: Metrics | None = None
+
+
+def get_metrics() -> Metrics:
+    """Returns the metrics of this process."""
+    global _metrics
+
+    if _metrics is None:
+        _metrics = Metrics(
+            payload_sample_rate=min(1.0, max(0.0, env_float("MCP_SERVERS_LOG_PAYLOADS", 0.0)))
+        )
+
+    return _metrics
+
+
+def register_stats(kind: str, name: str, stats: Callable[[], dict]) -> None:
+    """Exports stats with the metrics of this process, see ``Metrics.register_stats``."""
+    get_metrics().register_stats(kind, name, stats)
+
+
+@contextmanager
+def measure_tool(tool: str, arguments: dict) -> Iterator[ToolCall]:
+    """Records a tool call, the caller sets its ``result``.
+
+    Args:
+        tool (str): Name of the tool.
+        arguments (dict): The arguments of the call.
+
+    Yields:
+        ToolCall: The call, upstream requests made within it are attributed to it.
+    """
+    metrics = get_metrics()
+    call = ToolCall(tool, sampled=metrics.sample())
+    token = _current_call.set(call)
+    failed = True
+    result = None
+
+    if call.sampled:
+        log_payload(logger, f"Arguments of {tool}", lambda: pydantic_core.to_json(arguments))
+
+    try:
+        yield call
+        failed = False
+        result = call.result
+
+    finally:
+        _current_call.reset(token)
+        metrics.record_tool(call, arguments, result, failed)
+
+        if call.sampled and not failed:
+            log_payload(logger, f"Result of {tool}", lambda: result)
+
+
+@contextmanager
+def measure_upstream(host: str) -> Iterator[UpstreamRequest]:
+    """Records an upstream request, whose outcome the caller reports with ``done``."""
+    call = _current_call.get()
+    request = UpstreamRequest()
+    started = time.perf_counter()
+
+    if call is not None:
+        call.upstream_started()
+
+    try:
+        yield request
+
+    finally:
+        if call is not None:
+            call.upstream_finished()
+
+        get_metrics().record_upstream(host, request, time.perf_counter() - started)
+
+
+def log_payload(log: logging.Logger, label: str, payload: Callable[[], Any] | Any) -> None:
+    """Logs a payload if the current tool call is sampled (see ``MCP_SERVERS_LOG_PAYLOADS``).
+
+    Args:
+        log (logging.Logger): The logger of the caller.
+        label (str): What the payload is, e.g. "BrightSky response".
+        payload (Callable[[], Any] | Any): The payload, or a function returning it, so that
+            it is only serialized when logged.
+    """
+    call = _current_call.get()
+
+    if not (call.sampled if call is not None else get_metrics().sample()):
+        return
+
+    if callable(payload):
+        payload = payload()
+
+    if isinstance(payload, bytes):
+        payload = payload.decode(errors="replace")
+
+    elif not isinstance(payload, str):
+        payload = repr(payload)
+
+    if len(payload) > MAX_PAYLOAD_CHARS:
+        payload = f"{payload[:MAX_PAYLOAD_CHARS]}... ({len(payload) - MAX_PAYLOAD_CHARS} more)"
+
+    log.info(f"{label}: {payload}")
+
+
+def wants_openmetrics(accept: str) -> bool:
+    return "application/openmetrics-text" in accept
+
+
+def add_stats_tool(mcp: FastMCP) -> None:
+    """Adds the ``server_stats`` tool, summarizing the metrics of the process."""
+
+    def server_stats() -> str:
+        """
+        Tool to retrieve the statistics of this MCP server process: per tool the number of calls,
+        error rate, latency percentiles (in milliseconds), time spent waiting for upstream APIs
+        vs. locally and the bytes in/out, the latency and errors of the upstream APIs, the hit
+        ratios of the caches and the queues of the scheduler.
+
+        Returns:
+            str: The statistics as JSON.
+        """
+        return json.dumps(get_metrics().summary())
+
+    if mcp._tool_manager.get_tool("server_stats") is None:
+        mcp.add_tool(server_stats)
+
+
+def serve_metrics(host: str, port: int) -> ThreadingHTTPServer | None:
+    """Serves the metrics on ``http://host:port/metrics`` from a background thread.
+
+    Used over stdio, where there is no HTTP app to add ``/metrics`` to. If the port is taken,
+    e.g. by another server started with the same ``--metrics-port``, the server runs on
+    without metrics and None is returned.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+
+            openmetrics = wants_openmetrics(self.headers.get("Accept", ""))
+            body = get_metrics().render(openmetrics).encode()
+
+            self.send_response(200)
+            self.send_header(
+                "Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE
+            )
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+
+    except OSError as e:
+        logger.warning(f"Not serving metrics, {host}:{port} is unavailable: {e}")
+        return None
+
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+
+    return server
@@ -1,18 +1,22 @@
 from mcp.server.fastmcp import FastMCP
-import requests
 import logging
+from mcp_servers.http_client import get_http_client, http_lifespan
+from mcp_servers.metrics import log_payload
+from mcp_servers.serve import run_server
+from mcp_servers.tool_registry import install_tool_registry
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level = logging.INFO)
 
 
-mcp = FastMCP('check_internet_connection')
+mcp = FastMCP('check_internet_connection', lifespan=http_lifespan)
+install_tool_registry(mcp)
 
 @mcp.tool(
     name="check_internet_connection",
     description="Tool to check if there is an internet connection available by pinging google.com."
 )
-def check_internet_connection() -> str:
+async def check_internet_connection() -> str:
     """
     Tool to check if we have an internet connection by pinging google.com.
     
@@ -24,8 +28,8 @@ def check_internet_connection() -> str:
     """
     
     try:
-        response = requests.get('https://www.google.com', timeout=5)
-        logger.info(f"Response:\n\n{response}")
+        response = await get_http_client().get('https://www.google.com', timeout=5, retries=0)
+        log_payload(logger, "Response", response)
         return f"We have an internet connection! (Status Code: {response.status_code})"
 
     except Exception as e:
@@ -33,4 +37,4 @@ def check_internet_connection() -> str:
 
 
 if __name__ ==  "__main__":
-    mcp.run(transport='stdio')
\ No newline at end of file
+    run_server(mcp, 'ping')
@@ -0,0 +1,243 @@
+"""Runs blocking and CPU-heavy work off the event loop, within per-tool concurrency limits.
+
+All tools of a server share one event loop, so a tool blocking it (e.g. a synchronous tool,
+a sqlite query or parsing a page) stalls every other request of the process. The scheduler
+of a process (see ``get_scheduler``) runs
+
+* blocking calls, e.g. synchronous tools, sqlite and Polars (which releases the GIL), in a
+  bounded thread pool,
+* CPU-heavy parsing holding the GIL, e.g. crawl4ai's HTML processing, in a process pool,
+
+and limits how many calls of a tool run at once. Calls beyond the limit of their tool wait
+in its queue, ``Scheduler.stats`` reports the queue depths.
+
+Configured with the environment variables ``MCP_SERVERS_THREADS``,
+``MCP_SERVERS_PROCESSES`` (0 runs the process work in the thread pool instead) and
+``MCP_SERVERS_TOOL_LIMITS`` (e.g. ``"Deep Search Many=2,Get historical weather=4"``).
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import multiprocessing
+import os
+from collections import defaultdict
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+from mcp_servers.settings import env_int
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_THREADS = min(32, (os.cpu_count() or 1) + 4)
+DEFAULT_PROCESSES = min(4, os.cpu_count() or 1)
+
+
+class Scheduler:
+    """Thread pool, process pool and per-tool concurrency limits of a process.
+
+    The pools are created on first use. Worker processes are spawned rather than forked,
+    since forking a process running threads (the thread pool, Polars, the browsers) is
+    unsafe; they import the module of the function they run once and are then reused.
+    """
+
+    def __init__(
+        self,
+        threads: int = DEFAULT_THREADS,
+        processes: int = DEFAULT_PROCESSES,
+        limits: dict[str, int] | None = None,
+    ):
+        """
+        Args:
+            threads (int): Size of the thread pool.
+            processes (int): Size of the process pool, 0 runs its work in the thread pool.
+            limits (dict[str, int] | None): Maximum number of concurrent calls by tool name,
+                taking precedence over the defaults set with ``limit``.
+        """
+        self.threads = max(1, threads)
+        self.processes = max(0, processes)
+        self.limits = dict(limits or {})
+
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+
+        # Semaphores are bound to the event loop they are used in
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+        self._tools: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "running": 0, "queued": 0, "max_queued": 0}
+        )
+        self._pools = {
+            pool: {"calls": 0, "pending": 0, "max_pending": 0} for pool in ("threads", "processes")
+        }
+
+    def limit(self, tool: str, max_concurrency: int) -> None:
+        """Sets the default limit of concurrent calls of a tool.
+
+        Limits given to the scheduler (``MCP_SERVERS_TOOL_LIMITS``) take precedence.
+        """
+        if tool not in self.limits:
+            self.limits[tool] = max(1, max_concurrency)
+            self._semaphores.pop(tool, None)
+
+    @asynccontextmanager
+    async def slot(self, tool: str) -> AsyncIterator[None]:
+        """Waits until the tool is below its limit and holds one of its slots meanwhile."""
+        stats = self._tools[tool]
+        stats["calls"] += 1
+        semaphore = self._semaphore(tool)
+
+        if semaphore is not None:
+            if semaphore.locked():
+                stats["queued"] += 1
+                stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+
+                try:
+                    await semaphore.acquire()
+
+                finally:
+                    stats["queued"] -= 1
+
+            else:
+                await semaphore.acquire()
+
+        stats["running"] += 1
+
+        try:
+            yield
+
+        finally:
+            stats["running"] -= 1
+
+            if semaphore is not None:
+                semaphore.release()
+
+    async def run_in_thread(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Runs ``fn(*args, **kwargs)`` in the thread pool, in the current context."""
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, fn, *args, **kwargs)
+
+        return await self._run("threads", self._get_thread_pool(), call)
+
+    async def run_in_process(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Runs ``fn(*args, **kwargs)`` in the process pool.
+
+        fn has to be a module level function and its arguments and result picklable. Without
+        a process pool (``processes=0``) it is run in the thread pool instead.
+        """
+        if self.processes == 0:
+            return await self.run_in_thread(fn, *args, **kwargs)
+
+        try:
+            return await self._run(
+                "processes", self._get_process_pool(), functools.partial(fn, *args, **kwargs)
+            )
+
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for its memory), the next call starts a new pool
+            logger.warning("Process pool broke, it is restarted on the next call")
+            self._process_pool = None
+            raise
+
+    def stats(self) -> dict:
+        """Returns the calls, running and queued calls of every tool and both pools.
+
+        ``pending`` of a pool counts the calls waiting for or running in it.
+        """
+        return {
+            "tools": {tool: dict(stats) for tool, stats in self._tools.items()},
+            "threads": {**self._pools["threads"], "size": self.threads},
+            "processes": {**self._pools["processes"], "size": self.processes},
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shuts both pools down, they are recreated if used again."""
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+
+        self._thread_pool = self._process_pool = None
+
+    async def _run(self, pool: str, executor: Executor, call: Callable[[], T]) -> T:
+        stats = self._pools[pool]
+        stats["calls"] += 1
+        stats["pending"] += 1
+        stats["max_pending"] = max(stats["max_pending"], stats["pending"])
+
+        try:
+            return await asyncio.wrap_future(executor.submit(call))
+
+        finally:
+            stats["pending"] -= 1
+
+    def _semaphore(self, tool: str) -> asyncio.Semaphore | None:
+        loop = asyncio.get_running_loop()
+
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphores = {}
+
+        if tool not in self.limits:
+            return None
+
+        if tool not in self._semaphores:
+            self._semaphores[tool] = asyncio.Semaphore(self.limits[tool])
+
+        return self._semaphores[tool]
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(self.threads, thread_name_prefix="mcp-servers")
+
+        return self._thread_pool
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+
+        return self._process_pool
+
+
+def parse_limits(value: str) -> dict[str, int]:
+    """Parses tool limits like ``"Deep Search Many=2,Get historical weather=4"``."""
+    limits = {}
+
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+
+        tool, _, limit = entry.rpartition("=")
+
+        try:
+            limits[tool.strip()] = int(limit)
+
+        except ValueError:
+            logger.warning(f"Ignoring invalid tool limit {entry.strip()!r}")
+
+    return {tool: limit for tool, limit in limits.items() if tool and limit > 0}
+
+
+_scheduler: Scheduler | None = None
+
+
+def get_scheduler() -> Scheduler:
+    """Returns the scheduler shared by all tools of this process."""
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = Scheduler(
+            threads=env_int("MCP_SERVERS_THREADS", DEFAULT_THREADS),
+            processes=env_int("MCP_SERVERS_PROCESSES", DEFAULT_PROCESSES),
+            limits=parse_limits(os.environ.get("MCP_SERVERS_TOOL_LIMITS", "")),
+        )
+
+    return _scheduler
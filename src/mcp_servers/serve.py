@@ -0,0 +1,263 @@
+"""Runs a server (or the gateway) over stdio, SSE or streamable HTTP, with several workers.
+
+Every server script and the ``mcp-servers`` gateway accept the same arguments::
+
+    uv run weather.py                                       # stdio, as in mcp.json.template
+    uv run weather.py --transport streamable-http --port 8001
+    uv run mcp-servers --transport streamable-http --workers 4
+
+The network transports are served by uvicorn. With several workers, uvicorn starts that many
+processes accepting connections on the same port, each building its own app (see
+``create_app``). Requests of one MCP session may then reach different workers, so the
+streamable HTTP transport is stateless with more than one worker, and SSE (whose sessions
+live in a single process) is limited to one worker.
+
+On SIGINT/SIGTERM, uvicorn stops accepting connections, waits up to the shutdown timeout for
+open requests and then leaves the lifespan of the app, closing its browsers and connections.
+
+With ``--metrics``, the metrics of the process (see ``mcp_servers.metrics``) are served on
+``/metrics`` of the HTTP transports, or on ``--metrics-port`` over stdio. Every worker answers
+with its own metrics.
+"""
+
+import argparse
+import json
+import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from mcp_servers.metrics import (
+    OPENMETRICS_CONTENT_TYPE,
+    PROMETHEUS_CONTENT_TYPE,
+    add_stats_tool,
+    get_metrics,
+    serve_metrics,
+    wants_openmetrics,
+)
+from mcp_servers.settings import env_flag, env_int
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+# Hosts FastMCP enables its DNS rebinding protection for
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+# What the workers build their app from, set by the process starting them
+APP_ENV = "MCP_SERVERS_APP"
+
+
+def add_arguments(parser: argparse.ArgumentParser, port: int = 8000) -> None:
+    """Adds the transport arguments (``--transport``, ``--port``, ``--workers``, ...)."""
+    parser.add_argument("--transport", choices=TRANSPORTS, default="stdio", help="Transport.")
+    parser.add_argument("--host", default="127.0.0.1", help="Host of the HTTP transports.")
+    parser.add_argument(
+        "--port", type=int, default=env_int("MCP_SERVERS_PORT", port), help="Port."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=env_int("MCP_SERVERS_WORKERS", 1),
+        help="Number of processes serving the streamable HTTP transport.",
+    )
+    parser.add_argument(
+        "--shutdown-timeout",
+        type=int,
+        default=env_int("MCP_SERVERS_SHUTDOWN_TIMEOUT", 10),
+        help="Seconds open requests get to finish on shutdown.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action=argparse.BooleanOptionalAction,
+        default=env_flag("MCP_SERVERS_METRICS"),
+        help="Serve Prometheus/OpenMetrics metrics on /metrics.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=env_int("MCP_SERVERS_METRICS_PORT", 9464),
+        help="Port of the metrics over stdio.",
+    )
+
+
+def run_server(mcp: FastMCP, server: str, argv: list[str] | None = None) -> None:
+    """Runs a single server, the entry point of the server scripts.
+
+    Args:
+        mcp (FastMCP): The app of the server.
+        server (str): Name of the server in ``gateway.SERVERS``, to build the app of workers.
+        argv (list[str] | None): The command line arguments, defaults to ``sys.argv``.
+    """
+    parser = argparse.ArgumentParser(description=f"Serves the tools of the {server} server.")
+    add_arguments(parser)
+
+    serve(mcp, [server], parser.parse_args(argv), parser)
+
+
+def serve(
+    mcp: FastMCP,
+    servers: list[str],
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser | None = None,
+) -> None:
+    """Runs mcp over the transport given in args (see ``add_arguments``).
+
+    Args:
+        mcp (FastMCP): The app, served as it is by a single process.
+        servers (list[str]): The servers mcp consists of, workers build their app from them.
+        args (argparse.Namespace): The parsed transport arguments.
+        parser (argparse.ArgumentParser | None): Reports invalid arguments.
+    """
+    import uvicorn
+
+    def error(message: str) -> None:
+        if parser is None:
+            raise ValueError(message)
+
+        parser.error(message)
+
+    if args.workers < 1:
+        error("--workers must be at least 1")
+
+    add_stats_tool(mcp)
+
+    if args.transport == "stdio":
+        if args.metrics:
+            serve_metrics(args.host, args.metrics_port)
+
+        mcp.run(transport="stdio")
+        return
+
+    if args.workers > 1 and args.transport == "sse":
+        error("SSE sessions live in a single process, use streamable-http for several workers")
+
+    options = {
+        "host": args.host,
+        "port": args.port,
+        "timeout_graceful_shutdown": args.shutdown_timeout,
+        "log_level": mcp.settings.log_level.lower(),
+    }
+
+    if args.workers == 1:
+        uvicorn.run(
+            http_app(mcp, args.transport, host=args.host, metrics=args.metrics), **options
+        )
+        return
+
+    # The workers are separate processes, they build their app from this
+    os.environ[APP_ENV] = json.dumps(
+        {
+            "servers": servers,
+            "transport": args.transport,
+            "host": args.host,
+            "metrics": args.metrics,
+        }
+    )
+    logger.info(f"Starting {args.workers} workers, sessions are stateless")
+    uvicorn.run(
+        "mcp_servers.serve:create_app", factory=True, workers=args.workers, **options
+    )
+
+
+def create_app() -> Starlette:
+    """Builds the app of a worker process from ``MCP_SERVERS_APP``."""
+    from mcp_servers.gateway import load_server, mount
+
+    spec = json.loads(os.environ[APP_ENV])
+    servers = spec["servers"]
+
+    if len(servers) == 1:
+        mcp = load_server(servers[0])
+    else:
+        mcp = mount({server: load_server(server) for server in servers})
+
+    add_stats_tool(mcp)
+
+    return http_app(
+        mcp,
+        spec["transport"],
+        host=spec["host"],
+        stateless=True,
+        metrics=spec.get("metrics", False),
+    )
+
+
+def http_app(
+    mcp: FastMCP,
+    transport: str,
+    host: str = "127.0.0.1",
+    stateless: bool = False,
+    metrics: bool = False,
+) -> Starlette:
+    """Returns the ASGI app serving mcp over SSE or streamable HTTP.
+
+    FastMCP enters the lifespan of a server once per session, which is right for stdio
+    (one session per process). Over HTTP, the sessions of a process have to share what the
+    lifespan starts (e.g. the browser pool and the HTTP client), so it is entered once with
+    the app instead and its context is handed to every session.
+
+    Args:
+        mcp (FastMCP): The app.
+        transport (str): "sse" or "streamable-http".
+        host (str): The host the app is served on.
+        stateless (bool): Serve every streamable HTTP request on its own, without sessions.
+        metrics (bool): Serve the metrics of the process on ``/metrics``.
+
+    Returns:
+        Starlette: The ASGI app, with mcp as ``state.mcp``.
+    """
+    if host not in LOCAL_HOSTS:
+        # FastMCP only allows requests for localhost, as it was created for it by default
+        mcp.settings.transport_security = None
+
+    if stateless:
+        mcp.settings.stateless_http = True
+
+    app = mcp.sse_app() if transport == "sse" else mcp.streamable_http_app()
+    app.state.mcp = mcp
+    lifespan = mcp.settings.lifespan
+
+    if metrics:
+        app.router.routes.append(Route("/metrics", metrics_endpoint, methods=["GET"]))
+
+    if lifespan is None:
+        return app
+
+    shared: dict[str, Any] = {}
+    app_lifespan = app.router.lifespan_context
+
+    @asynccontextmanager
+    async def session_lifespan(server) -> AsyncIterator[Any]:
+        yield shared["context"]
+
+    @asynccontextmanager
+    async def process_lifespan(starlette: Starlette) -> AsyncIterator[None]:
+        async with lifespan(mcp) as context:
+            shared["context"] = context
+
+            # Sessions end (within the app's lifespan) before the shared resources are closed
+            async with app_lifespan(starlette):
+                yield
+
+    mcp._mcp_server.lifespan = session_lifespan
+    app.router.lifespan_context = process_lifespan
+
+    return app
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    """Answers with the metrics as OpenMetrics if accepted, as Prometheus text otherwise."""
+    openmetrics = wants_openmetrics(request.headers.get("accept", ""))
+
+    return Response(
+        get_metrics().render(openmetrics),
+        media_type=OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE,
+    )
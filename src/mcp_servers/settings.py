@@ -0,0 +1,56 @@
+"""Environment driven settings shared by all MCP servers in this repository."""
+
+import os
+from pathlib import Path
+
+
+def cache_dir(*parts: str) -> Path:
+    """Returns the on-disk cache directory for a server, creating it if necessary.
+
+    Defaults to ``$XDG_CACHE_HOME/mcp-servers`` (``~/.cache/mcp-servers`` if unset) and can be
+    overridden with the ``MCP_SERVERS_CACHE_DIR`` environment variable.
+
+    Args:
+        *parts (str): Sub-directories below the cache root, e.g. ``"weather"``.
+
+    Returns:
+        Path: The (existing) cache directory.
+    """
+    root = os.environ.get("MCP_SERVERS_CACHE_DIR")
+
+    if root is None:
+        xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        root = Path(xdg_cache_home) / "mcp-servers"
+
+    path = Path(root).joinpath(*parts)
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Reads a boolean environment variable ("1", "true", "yes" and "on" count as true)."""
+    value = os.environ.get(name)
+
+    if value is None:
+        return default
+
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def env_int(name: str, default: int) -> int:
+    """Reads an integer environment variable, falling back to default if unset or invalid."""
+    try:
+        return int(os.environ[name])
+
+    except (KeyError, ValueError):
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """Reads a float environment variable, falling back to default if unset or invalid."""
+    try:
+        return float(os.environ[name])
+
+    except (KeyError, ValueError):
+        return default
@@ -0,0 +1,56 @@
+"""Coalescing of identical, concurrent upstream calls ("single flight")."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time and shares its result with all callers.
+
+    Callers arriving while a call for the same key is in flight wait for that call instead of
+    starting their own. The call is shielded from cancellation, so a caller giving up (e.g. a
+    client disconnecting) does not fail the call for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self._counters = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Returns the result of ``fn()``, or of the in-flight call for the same key.
+
+        Args:
+            key (Hashable): Identifies identical calls, e.g. the normalized request.
+            fn (Callable[[], Awaitable[T]]): Starts the call if none is in flight.
+
+        Returns:
+            T: The result of the (shared) call. Exceptions are raised to every caller.
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            self._counters["calls"] += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self._counters["shared"] += 1
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        return {**self._counters, "in_flight": self.in_flight()}
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # Marks the exception as retrieved in case every caller was cancelled meanwhile
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,104 @@
+from mcp_servers import cache as cache_module
+from mcp_servers.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+    cache = TTLCache(clock=clock)
+
+    cache.set("current", b"{}", ttl=600)
+    clock.now += 599
+    assert cache.get("current") == b"{}"
+
+    clock.now += 1
+    assert cache.get("current") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    # Room for two entries of this size
+    cache = TTLCache(max_bytes=2 * (1 + 100 + 128))
+
+    cache.set("a", b"a" * 100, ttl=60)
+    cache.set("b", b"b" * 100, ttl=60)
+    cache.get("a")
+    cache.set("c", b"c" * 100, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_restart(tmp_path):
+    clock = FakeClock()
+    TTLCache(directory=tmp_path, clock=clock).set("forecast", b"[1, 2]", ttl=3600)
+
+    restarted = TTLCache(directory=tmp_path, clock=clock)
+
+    assert restarted.get("forecast") == b"[1, 2]"
+    assert restarted.stats()["disk_hits"] == 1
+    # Promoted to the memory tier
+    assert restarted.get("forecast") == b"[1, 2]"
+    assert restarted.stats()["memory_hits"] == 1
+
+    clock.now += 3600
+    assert TTLCache(directory=tmp_path, clock=clock).get("forecast") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disk_tier_is_size_bounded(tmp_path):
+    cache = TTLCache(max_bytes=0, directory=tmp_path, max_disk_bytes=3 * 108)
+
+    for key in "abcd":
+        cache.set(key, b"x" * 100, ttl=60)
+
+    assert cache.stats()["disk_bytes"] <= 3 * 108
+    assert cache.get("d") is not None
+
+
+def test_processes_sharing_the_disk_tier_keep_it_bounded(tmp_path, monkeypatch):
+    # Two caches on the same directory, as in two workers of one server
+    first = TTLCache(max_bytes=0, directory=tmp_path, max_disk_bytes=3 * 108)
+    second = TTLCache(max_bytes=0, directory=tmp_path, max_disk_bytes=3 * 108)
+
+    for key in "abc":
+        first.set(key, b"x" * 100, ttl=60)
+
+    monkeypatch.setattr(cache_module, "DISK_RESCAN_INTERVAL", 0)
+    second.set("d", b"x" * 100, ttl=60)
+
+    assert sum(path.stat().st_size for path in tmp_path.iterdir()) <= 3 * 108
+    assert second.stats()["disk_bytes"] <= 3 * 108
+    assert first.get("d") == b"x" * 100
+
+
+def test_truncated_disk_entries_are_misses(tmp_path):
+    cache = TTLCache(max_bytes=0, directory=tmp_path)
+    cache.set("a", b"1", ttl=60)
+    (path,) = tmp_path.iterdir()
+    path.write_bytes(b"\x00")
+
+    assert cache.get("a") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_stats_count_hits_and_misses():
+    cache = TTLCache()
+    cache.set("a", b"1", ttl=60)
+
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == 2 / 3
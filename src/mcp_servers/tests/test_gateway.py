@@ -0,0 +1,85 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from mcp_servers import gateway
+from mcp_servers.gateway import load_server, mount
+from mcp_servers.tool_registry import ToolRegistry
+
+
+def app(name: str, events: list[str], *tools: str) -> FastMCP:
+    @asynccontextmanager
+    async def lifespan(server):
+        events.append(f"start {name}")
+        yield
+        events.append(f"stop {name}")
+
+    mcp = FastMCP(name, lifespan=lifespan)
+
+    for tool in tools:
+
+        def reply(text: str, tool: str = tool) -> str:
+            return f"{tool}: {text}"
+
+        mcp.add_tool(reply, name=tool)
+
+    return mcp
+
+
+def test_tools_of_all_apps_are_served():
+    events = []
+    mcp = mount({"a": app("a", events, "echo", "shout"), "b": app("b", events, "whisper")})
+
+    tools = asyncio.run(mcp.list_tools())
+    _, result = asyncio.run(mcp.call_tool("whisper", {"text": "hi"}))
+
+    assert [tool.name for tool in tools] == ["echo", "shout", "whisper"]
+    assert result == {"result": "whisper: hi"}
+
+
+def test_first_mounted_tool_wins_name_clashes():
+    events = []
+    first, second = app("first", events, "echo"), app("second", events, "echo")
+    mcp = mount({"first": first, "second": second})
+
+    _, result = asyncio.run(mcp.call_tool("echo", {"text": "hi"}))
+
+    assert [tool.name for tool in asyncio.run(mcp.list_tools())] == ["echo"]
+    assert result == {"result": "echo: hi"}
+    assert second._tool_manager.get_tool("echo") is not None
+
+
+def test_lifespans_of_all_apps_run_with_the_gateway():
+    events = []
+    mcp = mount({"a": app("a", events), "b": app("b", events)})
+
+    async def run():
+        async with mcp.settings.lifespan(mcp):
+            events.append("serving")
+
+    asyncio.run(run())
+
+    assert events == ["start a", "start b", "serving", "stop b", "stop a"]
+
+
+def test_real_servers_are_mounted_with_their_registries():
+    apps = {server: load_server(server) for server in gateway.SERVERS}
+    mcp = mount(apps)
+
+    names = [tool.name for tool in asyncio.run(mcp.list_tools())]
+    _, result = asyncio.run(mcp.call_tool("Fetch time information", {}))
+
+    assert len(names) == len(set(names)) == sum(
+        len(asyncio.run(app.list_tools())) for app in apps.values()
+    )
+    assert {"check_internet_connection", "Get weather forecast", "Deep Search"} <= set(names)
+    assert "current_weekday" in json.loads(result["result"])
+    assert isinstance(apps["weather"]._tool_manager, ToolRegistry)
+
+
+def test_main_rejects_disabling_all_servers():
+    with pytest.raises(SystemExit):
+        gateway.main(["--no-ping", "--no-weather", "--no-wikipedia", "--no-web-search"])
@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+import pytest
+
+from mcp_servers.http_client import HttpClient, get_http_client
+
+
+def make_client(handler, **kwargs) -> HttpClient:
+    return HttpClient(transport=httpx.MockTransport(handler), backoff=0.0, **kwargs)
+
+
+def test_retries_transient_status_codes():
+    statuses = [503, 502, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0))
+
+    response = asyncio.run(make_client(handler).get("https://example.org"))
+
+    assert response.status_code == 200
+    assert statuses == []
+
+
+def test_returns_last_response_once_retries_are_exhausted():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        return httpx.Response(503, headers={"Retry-After": "0"})
+
+    response = asyncio.run(make_client(handler, retries=1).get("https://example.org"))
+
+    assert response.status_code == 503
+    assert len(attempts) == 2
+
+
+def test_retries_transport_errors_but_not_post_requests():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.method)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    client = make_client(handler, retries=2)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(client.get("https://example.org"))
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(client.request("POST", "https://example.org"))
+
+    assert attempts == ["GET", "GET", "GET", "POST"]
+
+
+def test_limits_concurrent_requests_per_host():
+    in_flight = {"example.org": 0, "example.com": 0}
+    peak = dict(in_flight)
+
+    class SlowTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request):
+            host = request.url.host
+            in_flight[host] += 1
+            peak[host] = max(peak[host], in_flight[host])
+            await asyncio.sleep(0.01)
+            in_flight[host] -= 1
+
+            return httpx.Response(200)
+
+    client = HttpClient(transport=SlowTransport(), max_connections_per_host=2)
+
+    async def burst():
+        await asyncio.gather(
+            *(client.get(f"https://example.org/{i}") for i in range(6)),
+            *(client.get(f"https://example.com/{i}") for i in range(6)),
+        )
+
+    asyncio.run(burst())
+
+    assert peak == {"example.org": 2, "example.com": 2}
+
+
+def test_shared_client_is_reused_within_an_event_loop():
+    async def clients():
+        return get_http_client(), get_http_client()
+
+    first, second = asyncio.run(clients())
+    third, _ = asyncio.run(clients())
+
+    assert first is second
+    assert first is not third
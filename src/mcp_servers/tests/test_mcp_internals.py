@@ -0,0 +1,94 @@
+"""The private attributes of ``FastMCP`` the servers rely on.
+
+``install_tool_registry`` and the gateway replace ``FastMCP._tool_manager``, ``serve`` sets
+``FastMCP._mcp_server.lifespan``. The MCP SDK has no public API for either, so these tests
+fail when an update of ``mcp`` (pinned in pyproject.toml) changes them.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.fastmcp.tools import ToolManager
+from mcp.shared.memory import create_connected_server_and_client_session
+
+
+class RecordingTools(ToolManager):
+    """Tool manager recording which of its methods FastMCP calls."""
+
+    def __init__(self, warn_on_duplicate_tools: bool = True):
+        super().__init__(warn_on_duplicate_tools)
+        self.calls = []
+
+    def add_tool(self, *args, **kwargs):
+        self.calls.append("add_tool")
+        return super().add_tool(*args, **kwargs)
+
+    def get_tool(self, name):
+        self.calls.append("get_tool")
+        return super().get_tool(name)
+
+    def list_tools(self):
+        self.calls.append("list_tools")
+        return super().list_tools()
+
+    async def call_tool(self, *args, **kwargs):
+        self.calls.append("call_tool")
+        return await super().call_tool(*args, **kwargs)
+
+    def remove_tool(self, name):
+        self.calls.append("remove_tool")
+        return super().remove_tool(name)
+
+
+def test_tool_manager_is_replaceable():
+    mcp = FastMCP("test")
+
+    assert isinstance(mcp._tool_manager, ToolManager)
+    assert isinstance(mcp._tool_manager._tools, dict)
+    assert mcp._tool_manager.warn_on_duplicate_tools == mcp.settings.warn_on_duplicate_tools
+
+    tools = mcp._tool_manager = RecordingTools()
+
+    @mcp.tool()
+    def echo(text: str) -> str:
+        """Echoes text."""
+        return text
+
+    async def session():
+        async with create_connected_server_and_client_session(mcp._mcp_server) as client:
+            listed = await client.list_tools()
+            result = await client.call_tool("echo", {"text": "hi"})
+
+        return listed, result
+
+    listed, result = asyncio.run(session())
+    mcp.remove_tool("echo")
+
+    assert [tool.name for tool in listed.tools] == ["echo"]
+    assert result.content[0].text == "hi"
+    assert tools.calls[0] == "add_tool"
+    assert {"list_tools", "call_tool", "remove_tool"} <= set(tools.calls)
+    assert tools._tools == {}
+
+
+def test_sessions_enter_the_replaced_lifespan():
+    mcp = FastMCP("test")
+
+    @asynccontextmanager
+    async def lifespan(server):
+        yield "shared"
+
+    @mcp.tool()
+    def context(ctx: Context) -> str:
+        """Returns the lifespan context."""
+        return ctx.request_context.lifespan_context
+
+    assert callable(mcp._mcp_server.lifespan)
+    mcp._mcp_server.lifespan = lifespan
+
+    async def session():
+        async with create_connected_server_and_client_session(mcp._mcp_server) as client:
+            return await client.call_tool("context", {})
+
+    assert asyncio.run(session()).content[0].text == "shared"
@@ -0,0 +1,157 @@
+import asyncio
+import json
+import logging
+
+import httpx
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from mcp_servers import metrics as metrics_module
+from mcp_servers.http_client import HttpClient
+from mcp_servers.metrics import (
+    Histogram,
+    Metrics,
+    add_stats_tool,
+    get_metrics,
+    log_payload,
+    serve_metrics,
+)
+from mcp_servers.serve import http_app
+from mcp_servers.tool_registry import ToolRegistry
+
+
+@pytest.fixture
+def metrics(monkeypatch) -> Metrics:
+    monkeypatch.setattr(metrics_module, "_metrics", Metrics())
+
+    return get_metrics()
+
+
+def app(client: HttpClient, url: str) -> FastMCP:
+    mcp = FastMCP("test")
+    mcp._tool_manager = ToolRegistry(None)
+
+    @mcp.tool()
+    async def fetch(times: int) -> str:
+        # Concurrent requests count once towards the upstream time
+        responses = await asyncio.gather(*(client.get(url) for _ in range(times)))
+        await asyncio.sleep(0.1)
+
+        return "".join(response.text for response in responses)
+
+    @mcp.tool()
+    def fail() -> str:
+        raise ValueError("broken")
+
+    return mcp
+
+
+def test_histogram_quantiles_are_interpolated_within_buckets():
+    histogram = Histogram()
+
+    for i in range(1, 1001):
+        histogram.observe(i / 1000)
+
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.1)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.1)
+    assert histogram.summary()["mean"] == pytest.approx(500.5)
+
+
+def test_tool_calls_are_split_into_upstream_and_local_time(metrics, stub_server):
+    url = stub_server.route("/slow", "x" * 100, delay=0.2)
+    mcp = app(HttpClient(), url)
+
+    async def run():
+        await mcp.call_tool("fetch", {"times": 3})
+
+        with pytest.raises(Exception, match="broken"):
+            await mcp.call_tool("fail", {})
+
+    asyncio.run(run())
+    tools = metrics.summary()["tools"]
+    upstream = metrics.summary()["upstreams"]["127.0.0.1"]
+
+    assert tools["fetch"]["calls"] == 1
+    assert 0.2 <= tools["fetch"]["upstream_seconds"] < 0.35
+    assert 0.1 <= tools["fetch"]["local_seconds"] < 0.2
+    assert tools["fetch"]["response_bytes"] > 300
+    assert tools["fail"]["error_rate"] == 1.0
+    assert upstream["requests"] == {"200": 3}
+    assert upstream["response_bytes"] == 300
+    assert upstream["latency_ms"]["p50"] >= 200
+
+
+def test_metrics_are_rendered_as_prometheus_text_and_openmetrics(metrics):
+    def handler(request):
+        return httpx.Response(503)
+
+    mcp = app(HttpClient(transport=httpx.MockTransport(handler), retries=0), "https://example.org")
+    metrics.register_stats("cache", "responses", lambda: {"hits": 3, "hit_ratio": 0.75})
+
+    asyncio.run(mcp.call_tool("fetch", {"times": 1}))
+    prometheus = metrics.render()
+    openmetrics = metrics.render(openmetrics=True)
+
+    assert "# TYPE mcp_tool_calls_total counter" in prometheus
+    assert 'mcp_tool_calls_total{tool="fetch",outcome="ok"} 1' in prometheus
+    assert 'mcp_tool_duration_seconds_bucket{tool="fetch",le="+Inf"} 1' in prometheus
+    assert 'mcp_upstream_requests_total{host="example.org",status="503"} 1' in prometheus
+    assert 'mcp_cache_hit_ratio{name="responses"} 0.75' in prometheus
+    assert "# TYPE mcp_tool_calls counter" in openmetrics
+    assert openmetrics.endswith("# EOF\n")
+
+
+def test_payloads_are_only_logged_for_sampled_calls(metrics, caplog):
+    log = logging.getLogger("test")
+    serialized = []
+
+    def payload() -> str:
+        serialized.append(True)
+        return "body" * 2000
+
+    with caplog.at_level(logging.INFO, logger="test"):
+        log_payload(log, "Response", payload)
+        metrics.payload_sample_rate = 1.0
+        log_payload(log, "Response", payload)
+
+    assert len(serialized) == 1
+    assert [record.message[:14] for record in caplog.records] == ["Response: body"]
+    assert caplog.records[0].message.endswith("(3904 more)")
+
+
+def test_stats_are_served_as_tool_and_endpoint(metrics):
+    mcp = FastMCP("test")
+    add_stats_tool(mcp)
+
+    async def run():
+        _, result = await mcp.call_tool("server_stats", {})
+        transport = httpx.ASGITransport(http_app(mcp, "streamable-http", metrics=True))
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (
+                result,
+                await client.get("/metrics"),
+                await client.get("/metrics", headers={"Accept": "application/openmetrics-text"}),
+            )
+
+    result, prometheus, openmetrics = asyncio.run(run())
+
+    assert set(json.loads(result["result"])) >= {"tools", "upstreams", "scheduler"}
+    assert prometheus.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "mcp_pool_size" in prometheus.text
+    assert openmetrics.headers["content-type"].startswith("application/openmetrics-text")
+
+
+def test_metrics_port_in_use_is_skipped(caplog):
+    first = serve_metrics("127.0.0.1", 0)
+
+    try:
+        with caplog.at_level(logging.WARNING):
+            second = serve_metrics("127.0.0.1", first.server_address[1])
+
+    finally:
+        first.shutdown()
+        first.server_close()
+
+    assert second is None
+    assert "Not serving metrics" in caplog.text
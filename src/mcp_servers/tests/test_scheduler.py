@@ -0,0 +1,87 @@
+import asyncio
+import os
+import threading
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+from mcp_servers.gateway import mount
+from mcp_servers.scheduler import Scheduler, parse_limits
+from mcp_servers.tool_registry import ToolRegistry
+
+
+def test_calls_beyond_the_limit_of_a_tool_are_queued():
+    scheduler = Scheduler(limits={"slow": 2})
+    running = {"slow": [], "fast": []}
+
+    async def call(tool: str):
+        async with scheduler.slot(tool):
+            running[tool].append(scheduler.stats()["tools"][tool]["running"])
+            await asyncio.sleep(0.05)
+
+    async def run():
+        await asyncio.gather(*(call("slow") for _ in range(5)), *(call("fast") for _ in range(5)))
+
+    asyncio.run(run())
+    stats = scheduler.stats()["tools"]
+
+    assert max(running["slow"]) == 2
+    assert max(running["fast"]) == 5
+    assert stats["slow"] == {"calls": 5, "running": 0, "queued": 0, "max_queued": 3}
+    assert stats["fast"]["max_queued"] == 0
+
+
+def test_configured_limits_take_precedence():
+    scheduler = Scheduler(limits=parse_limits("Deep Search Many=4, broken, Get weather=x"))
+    scheduler.limit("Deep Search Many", 2)
+    scheduler.limit("Web Search", 3)
+
+    assert scheduler.limits == {"Deep Search Many": 4, "Web Search": 3}
+
+
+def test_sync_tools_run_off_the_event_loop():
+    mcp = FastMCP("test")
+    mcp._tool_manager = ToolRegistry(None, scheduler=Scheduler(threads=2))
+
+    @mcp.tool()
+    def block(seconds: float) -> str:
+        time.sleep(seconds)
+
+        return threading.current_thread().name
+
+    async def run():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        _, result = await mount({"test": mcp}).call_tool("block", {"seconds": 0.3})
+        ticker.cancel()
+
+        return result, ticks
+
+    result, ticks = asyncio.run(run())
+
+    assert result["result"].startswith("mcp-servers")
+    assert ticks > 10
+
+
+def test_process_work_runs_in_worker_processes():
+    scheduler = Scheduler(processes=1)
+
+    try:
+        pid = asyncio.run(scheduler.run_in_process(os.getpid))
+
+    finally:
+        scheduler.shutdown()
+
+    assert pid != os.getpid()
+    assert scheduler.stats()["processes"]["calls"] == 1
+
+    # Without worker processes the work goes to the thread pool
+    assert asyncio.run(Scheduler(processes=0).run_in_process(os.getpid)) == os.getpid()
@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from mcp_servers import serve
+from mcp_servers.gateway import MountedTools
+from mcp_servers.serve import add_arguments, create_app, http_app
+
+
+def recording_app(events: list[str]) -> FastMCP:
+    @asynccontextmanager
+    async def lifespan(server):
+        events.append("start")
+        yield {"client": object()}
+        events.append("stop")
+
+    return FastMCP("test", lifespan=lifespan)
+
+
+def test_sessions_share_the_lifespan_entered_with_the_app():
+    events = []
+    mcp = recording_app(events)
+    app = http_app(mcp, "streamable-http")
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            session_lifespan = mcp._mcp_server.lifespan
+
+            async with session_lifespan(mcp._mcp_server) as first:
+                async with session_lifespan(mcp._mcp_server) as second:
+                    events.append("sessions")
+
+                    return first, second
+
+    first, second = asyncio.run(run())
+
+    assert events == ["start", "sessions", "stop"]
+    assert first is second
+
+
+def test_workers_build_a_stateless_gateway(monkeypatch):
+    monkeypatch.setenv(
+        serve.APP_ENV,
+        json.dumps(
+            {"servers": ["ping", "weather"], "transport": "streamable-http", "host": "0.0.0.0"}
+        ),
+    )
+
+    mcp = create_app().state.mcp
+
+    assert isinstance(mcp._tool_manager, MountedTools)
+    assert list(mcp._tool_manager.managers) == ["ping", "weather"]
+    assert mcp.settings.stateless_http
+    # Reachable from other hosts
+    assert mcp.settings.transport_security is None
+
+
+def test_several_workers_need_streamable_http():
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    args = parser.parse_args(["--transport", "sse", "--workers", "2"])
+
+    with pytest.raises(ValueError, match="single process"):
+        serve.serve(FastMCP("test"), ["ping"], args)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from mcp_servers.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    executions = []
+
+    async def fetch(value):
+        executions.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def burst():
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            *(flight.do("a", lambda: fetch("a")) for _ in range(10)),
+            flight.do("b", lambda: fetch("b")),
+        )
+        return flight, results
+
+    flight, results = asyncio.run(burst())
+
+    assert results == ["a"] * 10 + ["b"]
+    assert executions == ["a", "b"]
+    assert flight.stats() == {"calls": 2, "shared": 9, "in_flight": 0}
+
+
+def test_sequential_calls_are_not_shared():
+    executions = []
+
+    async def fetch():
+        executions.append(1)
+
+    async def sequential():
+        flight = SingleFlight()
+        await flight.do("a", fetch)
+        await flight.do("a", fetch)
+
+    asyncio.run(sequential())
+
+    assert len(executions) == 2
+
+
+def test_exceptions_are_raised_to_every_caller():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def burst():
+        flight = SingleFlight()
+        return await asyncio.gather(
+            *(flight.do("a", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(burst())
+
+    assert [type(result) for result in results] == [ValueError] * 3
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def cancel_first():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("a", fetch))
+        second = asyncio.ensure_future(flight.do("a", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        return await second
+
+    assert asyncio.run(cancel_first()) == "done"
@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.tools import Tool
+from pydantic import BaseModel
+
+from mcp_servers.tool_registry import ToolRegistry
+
+
+class Location(BaseModel):
+    lat: float
+    lon: float
+
+
+def server(path=None, default: int = 5) -> FastMCP:
+    """A server with two tools, using a ``ToolRegistry`` if path is given."""
+    mcp = FastMCP("test")
+
+    if path is not None:
+        mcp._tool_manager = ToolRegistry(path)
+
+    @mcp.tool(name="Nearest")
+    async def nearest(location: Location, k: int = default) -> str:
+        """Finds the k nearest things."""
+        return f"{location.lat},{location.lon}:{k}"
+
+    @mcp.tool(title="Echo")
+    def echo(text: str) -> str:
+        """Echoes text."""
+        return text
+
+    return mcp
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    built = []
+    from_function = Tool.from_function
+
+    def counting(fn, **kwargs):
+        built.append(kwargs["name"])
+        return from_function(fn, **kwargs)
+
+    monkeypatch.setattr(Tool, "from_function", counting)
+
+    return built
+
+
+def test_listed_schemas_match_fastmcp(tmp_path):
+    path = tmp_path / "test.json"
+
+    built = asyncio.run(server(path).list_tools())
+    loaded = asyncio.run(server(path).list_tools())
+    expected = asyncio.run(server().list_tools())
+
+    assert built == expected
+    assert loaded == expected
+    assert json.loads(path.read_text())["tools"][0]["name"] == "Nearest"
+
+
+def test_tools_are_built_on_first_use_only(tmp_path, builds):
+    path = tmp_path / "test.json"
+    asyncio.run(server(path).list_tools())
+    builds.clear()
+
+    mcp = server(path)
+    asyncio.run(mcp.list_tools())
+
+    assert builds == []
+
+    _, result = asyncio.run(mcp.call_tool("Nearest", {"location": {"lat": 1, "lon": 2}}))
+
+    assert result == {"result": "1.0,2.0:5"}
+    assert builds == ["Nearest"]
+
+
+def test_stale_schemas_are_rebuilt(tmp_path, builds):
+    path = tmp_path / "test.json"
+    asyncio.run(server(path).list_tools())
+    builds.clear()
+
+    # e.g. a default read from an environment variable
+    tools = asyncio.run(server(path, default=3).list_tools())
+
+    assert builds == ["Nearest", "echo"]
+    assert tools[0].inputSchema["properties"]["k"]["default"] == 3
+
+
+def test_invalid_schema_file_is_rebuilt(tmp_path, builds):
+    path = tmp_path / "test.json"
+    path.write_text("{not json")
+
+    tools = asyncio.run(server(path).list_tools())
+
+    assert [tool.name for tool in tools] == ["Nearest", "echo"]
+    assert json.loads(path.read_text())["fingerprint"]
+
+
+def test_unknown_and_removed_tools(tmp_path):
+    mcp = server(tmp_path / "test.json")
+    mcp.remove_tool("echo")
+
+    assert [tool.name for tool in asyncio.run(mcp.list_tools())] == ["Nearest"]
+
+    with pytest.raises(Exception, match="Unknown tool"):
+        asyncio.run(mcp.call_tool("echo", {"text": "hi"}))
@@ -0,0 +1,268 @@
+"""Tool manager serving ``tools/list`` from precomputed schemas instead of building them.
+
+FastMCP builds a tool (its pydantic argument model and JSON schemas) as soon as it is
+registered, which makes up a good part of a server's startup. ``ToolRegistry`` only records
+the functions when they are registered. The schemas of ``tools/list`` are read from a JSON
+file written the first time they were built, and a tool is only built when it is called.
+
+Calls are run by the scheduler of the process (see ``mcp_servers.scheduler``): every call
+takes a slot of its tool and synchronous tools run in its thread pool, off the event loop.
+They are recorded in the metrics of the process (see ``mcp_servers.metrics``).
+"""
+
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import logging
+import sys
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.server.fastmcp.tools import Tool, ToolManager
+from mcp.types import Icon, ToolAnnotations
+
+from mcp_servers.files import write_atomic
+from mcp_servers.metrics import measure_tool
+from mcp_servers.scheduler import Scheduler, get_scheduler
+from mcp_servers.settings import cache_dir, env_flag
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ToolSchema:
+    """What ``FastMCP.list_tools`` reads of a tool, without building it."""
+
+    name: str
+    title: str | None
+    description: str
+    parameters: dict[str, Any]
+    output_schema: dict[str, Any] | None
+    annotations: ToolAnnotations | None = None
+    icons: list[Icon] | None = None
+    meta: dict[str, Any] | None = None
+
+    @classmethod
+    def from_tool(cls, tool: Tool) -> "ToolSchema":
+        return cls(
+            name=tool.name,
+            title=tool.title,
+            description=tool.description,
+            parameters=tool.parameters,
+            output_schema=tool.output_schema,
+            annotations=tool.annotations,
+            icons=tool.icons,
+            meta=tool.meta,
+        )
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ToolSchema":
+        schema = cls(**data)
+
+        if schema.annotations is not None:
+            schema.annotations = ToolAnnotations.model_validate(schema.annotations)
+
+        if schema.icons is not None:
+            schema.icons = [Icon.model_validate(icon) for icon in schema.icons]
+
+        return schema
+
+    def to_json(self) -> dict:
+        return {
+            **asdict(self),
+            "annotations": self.annotations and self.annotations.model_dump(mode="json"),
+            "icons": self.icons and [icon.model_dump(mode="json") for icon in self.icons],
+        }
+
+
+class ToolRegistry(ToolManager):
+    """``ToolManager`` that builds tools on first use and caches their schemas on disk.
+
+    The schema file is keyed by a fingerprint of everything the schemas are derived from:
+    the signature, docstring and registration arguments of every tool, the sources of the
+    modules defining them (e.g. the pydantic models of their arguments) and the versions
+    of ``mcp`` and ``pydantic``. A stale or unreadable file is rebuilt on the next
+    ``list_tools``.
+    """
+
+    def __init__(
+        self,
+        path: Path | None,
+        warn_on_duplicate_tools: bool = True,
+        scheduler: Scheduler | None = None,
+    ):
+        """
+        Args:
+            path (Path | None): The JSON file holding the schemas, None to always build them.
+            warn_on_duplicate_tools (bool): Log a warning if a tool is registered twice.
+            scheduler (Scheduler | None): Runs the calls, defaults to the process' scheduler.
+        """
+        super().__init__(warn_on_duplicate_tools)
+        self.path = path
+        self.scheduler = scheduler or get_scheduler()
+
+        self._pending: dict[str, tuple[Callable[..., Any], dict[str, Any]]] = {}
+        self._schemas: list[ToolSchema] | None = None
+
+    def add_tool(self, fn: Callable[..., Any], name: str | None = None, **kwargs) -> Tool | None:
+        """Registers fn as tool, it is built (see ``Tool.from_function``) on first use.
+
+        Args:
+            fn (Callable[..., Any]): The tool function.
+            name (str | None): Name of the tool, defaults to the function name.
+            **kwargs: Passed on to ``Tool.from_function`` (title, description, ...).
+
+        Returns:
+            Tool | None: The tool if it has already been built, e.g. when registered twice.
+        """
+        name = name or fn.__name__
+
+        if name in self._pending or name in self._tools:
+            if self.warn_on_duplicate_tools:
+                logger.warning(f"Tool already exists: {name}")
+
+            return self._tools.get(name)
+
+        self._pending[name] = (fn, kwargs)
+        self._schemas = None
+
+        return None
+
+    def get_tool(self, name: str) -> Tool | None:
+        if name not in self._tools and name in self._pending:
+            fn, kwargs = self._pending[name]
+            tool = Tool.from_function(fn, name=name, **kwargs)
+
+            if not tool.is_async:
+                tool.fn = self._in_thread(fn)
+                tool.is_async = True
+
+            self._tools[name] = tool
+
+        return self._tools.get(name)
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+        context: Context | None = None,
+        convert_result: bool = False,
+    ) -> Any:
+        """Calls a tool within the concurrency limit of the tool (see ``Scheduler.slot``)."""
+        tool = self.get_tool(name)
+
+        if not tool:
+            raise ToolError(f"Unknown tool: {name}")
+
+        with measure_tool(name, arguments) as call:
+            async with self.scheduler.slot(name):
+                call.start()
+                call.result = await tool.run(
+                    arguments, context=context, convert_result=convert_result
+                )
+
+        return call.result
+
+    def remove_tool(self, name: str) -> None:
+        if name not in self._pending and name not in self._tools:
+            raise ToolError(f"Unknown tool: {name}")
+
+        self._pending.pop(name, None)
+        self._tools.pop(name, None)
+        self._schemas = None
+
+    def list_tools(self) -> list[ToolSchema]:
+        """Returns the schemas of all tools, building and saving them if the file is stale."""
+        if self._schemas is None:
+            fingerprint = self.fingerprint()
+            self._schemas = self._load(fingerprint)
+
+            if self._schemas is None:
+                self._schemas = [ToolSchema.from_tool(self.get_tool(name)) for name in self._pending]
+                self._save(fingerprint)
+
+        return self._schemas
+
+    def fingerprint(self) -> str:
+        """Returns the hash of everything the schemas of the registered tools depend on."""
+        digest = hashlib.blake2b(digest_size=16)
+
+        for package in ("mcp", "pydantic"):
+            digest.update(f"{package}={importlib.metadata.version(package)}\n".encode())
+
+        directories = set()
+
+        for name, (fn, kwargs) in self._pending.items():
+            # The signature includes defaults, which may come from environment variables
+            digest.update(f"{name}\n{sorted(kwargs.items())!r}\n{fn.__doc__}\n".encode())
+            digest.update(f"{inspect.signature(fn)}\n".encode())
+
+            if (module := sys.modules.get(fn.__module__)) and getattr(module, "__file__", None):
+                directories.add(Path(module.__file__).parent)
+
+        for directory in sorted(directories):
+            for source in sorted(directory.glob("*.py")):
+                stat = source.stat()
+                digest.update(f"{source}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+
+        return digest.hexdigest()
+
+    def _in_thread(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        async def run(*args, **kwargs) -> Any:
+            return await self.scheduler.run_in_thread(fn, *args, **kwargs)
+
+        return run
+
+    def _load(self, fingerprint: str) -> list[ToolSchema] | None:
+        if self.path is None:
+            return None
+
+        try:
+            data = json.loads(self.path.read_bytes())
+
+            if data["fingerprint"] != fingerprint or [
+                tool["name"] for tool in data["tools"]
+            ] != list(self._pending):
+                return None
+
+            return [ToolSchema.from_json(tool) for tool in data["tools"]]
+
+        except FileNotFoundError:
+            return None
+
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring invalid tool schemas {self.path}: {e}")
+            return None
+
+    def _save(self, fingerprint: str) -> None:
+        if self.path is None:
+            return
+
+        data = {"fingerprint": fingerprint, "tools": [schema.to_json() for schema in self._schemas]}
+
+        try:
+            write_atomic(self.path, json.dumps(data).encode())
+
+        except OSError as e:
+            logger.warning(f"Could not save the tool schemas to {self.path}: {e}")
+
+
+def install_tool_registry(mcp: FastMCP) -> None:
+    """Replaces the tool manager of a server by a ``ToolRegistry``, before any tool is added.
+
+    Setting ``MCP_SERVERS_TOOL_SCHEMA_CACHE`` to false disables the schema file.
+    """
+    path = None
+
+    if env_flag("MCP_SERVERS_TOOL_SCHEMA_CACHE", default=True):
+        path = cache_dir("tool-schemas") / f"{mcp.name}.json"
+
+    mcp._tool_manager = ToolRegistry(
+        path,
+        warn_on_duplicate_tools=mcp.settings.warn_on_duplicate_tools,
+    )
@@ -0,0 +1,122 @@
+"""Cached access to the BrightSky API."""
+
+import logging
+import os
+from datetime import datetime
+from urllib.parse import urlencode
+
+from mcp_servers.cache import TTLCache
+from mcp_servers.http_client import get_http_client
+from mcp_servers.metrics import log_payload, register_stats
+from mcp_servers.settings import cache_dir, env_flag
+from mcp_servers.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Overridable to point the server at a mirror or a local stub (see benchmarks/upstreams.py)
+BRIGHTSKY_URL = os.environ.get("MCP_SERVERS_BRIGHTSKY_URL", "https://api.brightsky.dev")
+CURRENT_WEATHER_URL = f"{BRIGHTSKY_URL}/current_weather"
+WEATHER_URL = f"{BRIGHTSKY_URL}/weather"
+
+# DWD current observations are updated every 10 minutes, MOSMIX forecasts hourly
+CURRENT_WEATHER_TTL = 10 * 60
+FORECAST_TTL = 60 * 60
+
+DEFAULT_TIMEZONE = "Europe/Berlin"
+
+# ~5 km, well below the spacing of the DWD stations BrightSky picks its data from
+COORDINATE_GRID = 0.05
+
+response_cache = TTLCache(
+    max_bytes=32 * 2**20,
+    directory=(
+        cache_dir("weather", "responses")
+        if env_flag("MCP_SERVERS_DISK_CACHE")
+        else None
+    ),
+)
+in_flight = SingleFlight()
+
+register_stats("cache", "brightsky", response_cache.stats)
+register_stats("single_flight", "brightsky", in_flight.stats)
+
+
+def snap(coordinate: float, grid: float = COORDINATE_GRID) -> float:
+    """Snaps a coordinate to the nearest grid point, e.g. 53.5511 -> 53.55."""
+    return round(round(coordinate / grid) * grid, 6)
+
+
+def floor_to_hour(timestamp: str) -> str:
+    """Rounds an ISO 8601 timestamp down to the full hour, keeping its UTC offset.
+
+    Timestamps that can't be parsed are returned unchanged.
+    """
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+
+    except ValueError:
+        return timestamp
+
+    return parsed.replace(minute=0, second=0, microsecond=0).isoformat(timespec="minutes")
+
+
+def normalize_params(params: dict) -> dict:
+    """Normalizes BrightSky query parameters, so that similar queries share a cache entry.
+
+    Coordinates are snapped to ``COORDINATE_GRID`` and timestamps rounded down to the hour.
+    Parameters that are None are left out, httpx would send them as empty values.
+    """
+    normalized = {key: value for key, value in params.items() if value is not None}
+
+    for key in ("lat", "lon"):
+        if normalized.get(key) is not None:
+            normalized[key] = snap(normalized[key])
+
+    for key in ("date", "last_date"):
+        if normalized.get(key) is not None:
+            normalized[key] = floor_to_hour(normalized[key])
+
+    return normalized
+
+
+def cache_key(url: str, params: dict) -> str:
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+async def get_json(url: str, params: dict, ttl: float) -> bytes:
+    """Fetches a BrightSky endpoint, answering repeated queries from ``response_cache``.
+
+    Concurrent identical queries that miss the cache share a single upstream request.
+
+    Args:
+        url (str): The API endpoint.
+        params (dict): Query parameters, normalized before use (see ``normalize_params``).
+        ttl (float): Seconds a successful response is cached for.
+
+    Returns:
+        bytes: The JSON response body. Error responses are returned as well, but not cached.
+    """
+    params = normalize_params(params)
+    key = cache_key(url, params)
+
+    if (cached := response_cache.get(key)) is not None:
+        logger.debug(f"Serving {key} from cache")
+
+        return cached
+
+    return await in_flight.do(key, lambda: _fetch(url, params, key, ttl))
+
+
+async def _fetch(url: str, params: dict, key: str, ttl: float) -> bytes:
+    response = await get_http_client().get(
+        url=url,
+        params=params,
+        headers={"Accept": "application/json"},
+    )
+
+    log_payload(logger, f"BrightSky response ({response.status_code})", response.content)
+
+    if response.status_code == 200:
+        response_cache.set(key, response.content, ttl)
+
+    return response.content
@@ -0,0 +1,168 @@
+"""Validated decoding of BrightSky responses into the models of ``datamodels``."""
+
+import io
+import logging
+from functools import cache
+from typing import Any, TypeVar, get_args, get_origin
+
+import polars as pl
+import pydantic_core
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from datamodels import WeatherForecastResponse
+from mcp_servers.settings import env_flag
+
+logger = logging.getLogger(__name__)
+
+# Strict decoding rejects a whole response for a single invalid record
+STRICT = env_flag("MCP_SERVERS_STRICT_DECODING")
+
+SOURCE_SCHEMA = {
+    "id": pl.Int64,
+    "station_name": pl.String,
+    "observation_type": pl.String,
+    "distance": pl.Int64,
+}
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+@cache
+def adapter(type_: Any) -> TypeAdapter:
+    """Returns the (cached) TypeAdapter of a type, its validator is only built once."""
+    return TypeAdapter(type_)
+
+
+def decode(model: type[Model], data: bytes, strict: bool | None = None) -> Model:
+    """Validates a JSON response body straight into a model, without ``json.loads`` first.
+
+    In strict mode, values have to match their field types exactly and any invalid value
+    fails the whole response. In lenient mode, values are coerced where possible (e.g.
+    ``"12"`` to 12) and invalid items of list fields, e.g. single hourly records, are
+    dropped with a warning instead.
+
+    Args:
+        model (type[Model]): The model of the response, e.g. ``WeatherForecastResponse``.
+        data (bytes): The response body.
+        strict (bool | None): Strict or lenient mode, defaults to ``STRICT``.
+
+    Returns:
+        Model: The validated response.
+
+    Raises:
+        ValueError: If the body is an API error, or is invalid (``ValidationError``).
+    """
+    strict = STRICT if strict is None else strict
+
+    try:
+        return adapter(model).validate_json(data, strict=strict)
+
+    except ValidationError as e:
+        raw = _error_or_json(data, e)
+
+        if strict:
+            raise
+
+        return _decode_leniently(model, raw)
+
+
+def decode_weather_columns(
+    data: bytes, schema: dict[str, pl.DataType], strict: bool | None = None
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Decodes the hourly ``weather`` array of a response straight into Polars columns.
+
+    Only the fields in schema are decoded, without creating a Python object per record.
+    Bodies Polars can't decode to schema fall back to ``decode`` in lenient mode.
+
+    Args:
+        data (bytes): The response body of the BrightSky weather endpoint.
+        schema (dict[str, pl.DataType]): The record fields to decode and their types.
+        strict (bool | None): Strict or lenient mode, defaults to ``STRICT``.
+
+    Returns:
+        tuple[pl.DataFrame, pl.DataFrame]: The hourly records following schema, and the
+                                           sources following ``SOURCE_SCHEMA``.
+
+    Raises:
+        ValueError: If the body is an API error or has no records.
+    """
+    strict = STRICT if strict is None else strict
+
+    try:
+        frame = pl.read_json(
+            io.BytesIO(data),
+            schema={
+                "weather": pl.List(pl.Struct(schema)),
+                "sources": pl.List(pl.Struct(SOURCE_SCHEMA)),
+            },
+        )
+
+    except pl.exceptions.PolarsError as e:
+        if strict:
+            raise ValueError(f"Invalid forecast response: {e}") from e
+
+        response = decode(WeatherForecastResponse, data, strict=False)
+        records = [record.model_dump() for record in response.weather]
+        sources = [source.model_dump() for source in response.sources]
+
+        return (
+            pl.DataFrame(records, schema=schema, orient="row"),
+            pl.DataFrame(sources, schema=SOURCE_SCHEMA, orient="row"),
+        )
+
+    if frame["weather"][0] is None:
+        raise ValueError(_error_message(pydantic_core.from_json(data)) or "No records found")
+
+    return (
+        frame.select(pl.col("weather").explode()).unnest("weather").drop_nulls("timestamp"),
+        frame.select(pl.col("sources").explode()).unnest("sources").drop_nulls("id"),
+    )
+
+
+def _decode_leniently(model: type[Model], raw: Any) -> Model:
+    if isinstance(raw, dict):
+        raw = dict(raw)
+
+        for name, field in model.model_fields.items():
+            if get_origin(field.annotation) is list and isinstance(raw.get(name), list):
+                raw[name] = _valid_items(get_args(field.annotation)[0], raw[name], name)
+
+    return adapter(model).validate_python(raw)
+
+
+def _valid_items(item_type: Any, items: list, name: str) -> list:
+    valid = []
+
+    for position, item in enumerate(items):
+        try:
+            valid.append(adapter(item_type).validate_python(item))
+
+        except ValidationError as e:
+            logger.warning(f"Dropping invalid {name}[{position}]: {e.errors()[0]['msg']}")
+
+    return valid
+
+
+def _error_or_json(data: bytes, error: ValidationError) -> Any:
+    """Returns the decoded body, raising the API's error message instead if it is one."""
+    try:
+        raw = pydantic_core.from_json(data)
+
+    except ValueError:
+        raise error
+
+    if message := _error_message(raw):
+        raise ValueError(message) from error
+
+    return raw
+
+
+def _error_message(raw: Any) -> str | None:
+    # BrightSky errors look like {"title": "Not Found", "description": "...", ...}
+    if not isinstance(raw, dict) or "weather" in raw:
+        return None
+
+    if "title" in raw or "description" in raw:
+        return raw.get("description") or raw.get("title")
+
+    return None
@@ -0,0 +1,347 @@
+"""BrightSky forecasts as Polars tables: merged across locations, summarized over time."""
+
+import asyncio
+import logging
+
+import polars as pl
+
+from brightsky import DEFAULT_TIMEZONE, FORECAST_TTL, WEATHER_URL, get_json, snap
+from decoding import decode_weather_columns
+
+logger = logging.getLogger(__name__)
+
+# The fields of a ``WeatherForecastRecord`` and how each is summarized over a period of time
+AGGREGATIONS = {
+    "temperature": ("min", "max"),
+    "dew_point": ("mean",),
+    "relative_humidity": ("mean",),
+    "pressure_msl": ("mean",),
+    "cloud_cover": ("mean",),
+    "visibility": ("min",),
+    "condition": ("most_frequent",),
+    "icon": ("most_frequent",),
+    "precipitation": ("total",),
+    "precipitation_probability": ("max",),
+    "precipitation_probability_6h": ("max",),
+    "solar": ("total",),
+    "sunshine": ("total",),
+    "wind_speed": ("mean", "max"),
+    "wind_direction": ("mean_direction",),
+    "wind_gust_speed": ("max",),
+    "wind_gust_direction": ("mean_direction",),
+}
+
+HOURLY_SCHEMA = {
+    "timestamp": pl.String,
+    "temperature": pl.Float64,
+    "dew_point": pl.Float64,
+    "relative_humidity": pl.Int64,
+    "pressure_msl": pl.Float64,
+    "cloud_cover": pl.Float64,
+    "visibility": pl.Int64,
+    "condition": pl.String,
+    "icon": pl.String,
+    "precipitation": pl.Float64,
+    "precipitation_probability": pl.Int64,
+    "precipitation_probability_6h": pl.Int64,
+    "solar": pl.Float64,
+    "sunshine": pl.Float64,
+    "wind_speed": pl.Float64,
+    "wind_direction": pl.Int64,
+    "wind_gust_speed": pl.Float64,
+    "wind_gust_direction": pl.Int64,
+}
+
+# Steps of the supported resolutions, as Polars durations
+RESOLUTIONS = {"hourly": "1h", "6h": "6h", "daily": "1d", "weekly": "1w", "monthly": "1mo"}
+
+LOCATION_SCHEMA = {
+    "location": pl.Int64,
+    "lat": pl.Float64,
+    "lon": pl.Float64,
+    "source_id": pl.Int64,
+    "station_name": pl.String,
+    "distance_in_km": pl.Float64,
+    "error": pl.String,
+}
+
+
+async def fetch_forecasts(
+    points: list[tuple[float, float]],
+    date: str,
+    last_date: str | None = None,
+    tz: str = DEFAULT_TIMEZONE,
+    url: str = WEATHER_URL,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Fetches the hourly forecasts of many locations concurrently.
+
+    Points in the same cell of the coordinate grid share one request (see
+    ``brightsky.normalize_params``). BrightSky answers every request with the forecast of the
+    nearest MOSMIX station, so locations resolving to the same station share their forecast,
+    which is kept only once.
+
+    Args:
+        points (list[tuple[float, float]]): Latitude/longitude pairs in decimal degrees.
+        date (str): Timestamp of the first forecast record, in ISO 8601 format.
+        last_date (str | None): Timestamp of the last forecast record, defaults to date + 1 day.
+        tz (str): Time zone of the returned timestamps.
+        url (str): The BrightSky weather endpoint.
+
+    Returns:
+        tuple[pl.DataFrame, pl.DataFrame]: The locations (following ``LOCATION_SCHEMA``, with
+            the ``source_id`` of their forecast or an ``error``), and the hourly forecasts
+            keyed by ``source_id`` and ``timestamp``.
+    """
+    cells = list(dict.fromkeys((snap(lat), snap(lon)) for lat, lon in points))
+    params = {"date": date, "last_date": last_date, "tz": tz}
+
+    responses = await asyncio.gather(
+        *(
+            get_json(url, {**params, "lat": lat, "lon": lon}, ttl=FORECAST_TTL)
+            for lat, lon in cells
+        ),
+        return_exceptions=True,
+    )
+
+    sources = {}
+    hourly = {}
+
+    for cell, response in zip(cells, responses):
+        try:
+            source, forecast = parse_forecast(response, tz)
+
+        except Exception as e:
+            logger.warning(f"Forecast for {cell} failed: {e}")
+            sources[cell] = {"error": str(e)}
+
+            continue
+
+        sources[cell] = source
+
+        if source["source_id"] not in hourly:
+            hourly[source["source_id"]] = forecast
+
+    locations = pl.DataFrame(
+        [
+            {"location": position, "lat": lat, "lon": lon, **sources[(snap(lat), snap(lon))]}
+            for position, (lat, lon) in enumerate(points)
+        ],
+        schema=LOCATION_SCHEMA,
+        orient="row",
+    )
+
+    if not hourly:
+        return locations, forecast_frame([], tz, None)
+
+    return locations, pl.concat(hourly.values())
+
+
+def forecast_frame(
+    records: pl.DataFrame | list[dict], tz: str, source_id: int | None
+) -> pl.DataFrame:
+    """Returns BrightSky's hourly forecast records as a table, following ``HOURLY_SCHEMA``.
+
+    Args:
+        records (pl.DataFrame | list[dict]): The ``weather`` records of a BrightSky response,
+                                             as dicts or decoded by ``decode_weather_columns``.
+        tz (str): Time zone the timestamps are converted to.
+        source_id (int | None): The source of the records, added as ``source_id`` column.
+
+    Returns:
+        pl.DataFrame: The records, with ``source_id`` and a time zone aware ``timestamp``.
+    """
+    if not isinstance(records, pl.DataFrame):
+        records = pl.DataFrame(records, schema=HOURLY_SCHEMA, orient="row")
+
+    return records.select(
+        pl.lit(source_id, pl.Int64).alias("source_id"),
+        pl.col("timestamp").str.to_datetime(time_zone=tz),
+        *(field for field in HOURLY_SCHEMA if field != "timestamp"),
+    )
+
+
+def parse_forecast(
+    response: bytes | BaseException, tz: str = DEFAULT_TIMEZONE
+) -> tuple[dict, pl.DataFrame]:
+    """Returns the MOSMIX source and the hourly forecast of a BrightSky weather response.
+
+    Returns:
+        tuple[dict, pl.DataFrame]: The ``source_id``, ``station_name`` and ``distance_in_km``
+                                   of the source, and its forecast (see ``forecast_frame``).
+
+    Raises:
+        Exception: The exception the request failed with, or ValueError for error responses.
+    """
+    if isinstance(response, BaseException):
+        raise response
+
+    records, sources = decode_weather_columns(response, {**HOURLY_SCHEMA, "source_id": pl.Int64})
+
+    if records.is_empty():
+        raise ValueError("No forecast found")
+
+    # Records can fall back to other sources for single fields, the bulk comes from one
+    source_id = records["source_id"].drop_nulls().mode().sort().first()
+    source = sources.filter(pl.col("id") == source_id).to_dicts()
+    distance = source[0]["distance"] if source else None
+
+    return {
+        "source_id": source_id,
+        "station_name": source[0]["station_name"] if source else None,
+        "distance_in_km": round(distance / 1000, 2) if distance is not None else None,
+    }, forecast_frame(records, tz, source_id)
+
+
+def aggregate(
+    hourly: pl.DataFrame,
+    every: str | None = "1d",
+    period: str | None = None,
+    fields: list[str] | None = None,
+    by: str | None = None,
+) -> pl.DataFrame:
+    """Summarizes hourly forecasts over periods of time, see ``AGGREGATIONS``.
+
+    A period longer than the step gives rolling windows, e.g. every="1h" and period="6h"
+    summarizes the 6 hours starting at every hour. Windows running past the end of the
+    forecast are dropped then.
+
+    Args:
+        hourly (pl.DataFrame): Hourly forecasts as returned by ``forecast_frame``.
+        every (str | None): Step between the windows as Polars duration (e.g. "6h", "1d").
+                            None returns the hourly values of fields as they are.
+        period (str | None): Length of the windows, defaults to every.
+        fields (list[str] | None): Fields to keep, defaults to all of ``AGGREGATIONS``.
+        by (str | None): Column whose groups are summarized separately, e.g. "source_id".
+
+    Returns:
+        pl.DataFrame: One row per window (labeled by its start ``timestamp``), with a
+                      ``<field>_<aggregation>`` column per aggregation of every field.
+
+    Raises:
+        ValueError: If fields contains unknown fields.
+    """
+    fields = fields or list(AGGREGATIONS)
+    keys = [by] if by is not None else []
+
+    if unknown := [field for field in fields if field not in AGGREGATIONS]:
+        raise ValueError(
+            f"Unknown fields {', '.join(unknown)}, choose from {', '.join(AGGREGATIONS)}"
+        )
+
+    if every is None:
+        return hourly.select(*keys, "timestamp", *fields)
+
+    frame = (
+        hourly.sort(*keys, "timestamp")
+        .group_by_dynamic(
+            "timestamp", every=every, period=period, group_by=by, label="left", closed="left"
+        )
+        .agg(
+            *(
+                summarize_field(field, aggregation)
+                for field in fields
+                for aggregation in AGGREGATIONS[field]
+            )
+        )
+    )
+
+    if period is not None and period != every:
+        end = hourly["timestamp"].max() + pl.duration(hours=1)
+        frame = frame.filter(pl.col("timestamp").dt.offset_by(period) <= end)
+
+    return frame
+
+
+def summarize_field(field: str, aggregation: str) -> pl.Expr:
+    """Returns the expression aggregating field into a ``<field>_<aggregation>`` column."""
+    column = pl.col(field)
+
+    match aggregation:
+        case "total":
+            # Null instead of 0 if there are no values at all
+            expression = pl.when(column.count() > 0).then(column.sum()).round(1)
+        case "mean":
+            expression = column.mean().round(1)
+        case "mean_direction":
+            radians = column.radians()
+            expression = (
+                pl.arctan2(radians.sin().mean(), radians.cos().mean()).degrees().round() % 360
+            )
+        case "most_frequent":
+            expression = column.drop_nulls().mode().sort().first()
+        case _:
+            expression = getattr(column, aggregation)()
+
+    return expression.alias(f"{field}_{aggregation}")
+
+
+def daily_summary(hourly: pl.DataFrame) -> pl.DataFrame:
+    """Aggregates hourly forecasts to daily minimum/maximum temperature and precipitation.
+
+    Days are the calendar days of the time zone the timestamps are in.
+
+    Args:
+        hourly (pl.DataFrame): Hourly forecasts as returned by ``fetch_forecasts``.
+
+    Returns:
+        pl.DataFrame: One row per ``source_id`` and ``date``.
+    """
+    return (
+        aggregate(
+            hourly,
+            every=RESOLUTIONS["daily"],
+            fields=["temperature", "precipitation", "precipitation_probability"],
+            by="source_id",
+        )
+        .rename({"timestamp": "date"})
+        .with_columns(pl.col("date").dt.date())
+    )
+
+
+def to_columns(frame: pl.DataFrame) -> dict[str, list]:
+    """Returns a table as JSON serializable columns, naming every field once instead of per row.
+
+    Timestamps are formatted as ISO 8601 with UTC offset, dates as ISO 8601 dates.
+    """
+    return frame.with_columns(
+        pl.col(pl.Datetime).dt.strftime("%Y-%m-%dT%H:%M%:z"), pl.col(pl.Date).cast(pl.String)
+    ).to_dict(as_series=False)
+
+
+def summarize(locations: pl.DataFrame, daily: pl.DataFrame) -> dict:
+    """Returns the daily forecasts once per MOSMIX station, with the locations they cover.
+
+    Returns:
+        dict: JSON serializable ``forecasts`` (one per station, listing the positions of its
+              ``locations``) and ``errors`` (the locations without forecast).
+    """
+    found = locations.filter(pl.col("error").is_null())
+    daily = daily.with_columns(pl.col("date").cast(pl.String)).partition_by(
+        "source_id", as_dict=True, include_key=False
+    )
+
+    stations = found.group_by("source_id", maintain_order=True).agg(
+        pl.col("station_name").first(), pl.col("location"), pl.col("distance_in_km")
+    )
+
+    forecasts = [
+        {
+            "source_id": station["source_id"],
+            "station_name": station["station_name"],
+            "locations": station["location"],
+            "distance_in_km": station["distance_in_km"],
+            "daily": (
+                daily[(station["source_id"],)].to_dicts()
+                if (station["source_id"],) in daily
+                else []
+            ),
+        }
+        for station in stations.to_dicts()
+    ]
+
+    return {
+        "forecasts": forecasts,
+        "errors": locations.filter(pl.col("error").is_not_null())
+        .select("location", "lat", "lon", "error")
+        .to_dicts(),
+    }
@@ -0,0 +1,161 @@
+"""Historical weather over long date ranges, fetched in monthly chunks."""
+
+import asyncio
+import io
+import logging
+import math
+from datetime import date, timedelta
+
+import polars as pl
+
+from brightsky import WEATHER_URL, cache_key, get_json, normalize_params
+from decoding import decode_weather_columns
+from forecasts import DEFAULT_TIMEZONE, HOURLY_SCHEMA
+from mcp_servers.cache import TTLCache
+from mcp_servers.metrics import register_stats
+from mcp_servers.settings import cache_dir, env_int
+
+logger = logging.getLogger(__name__)
+
+# Recent observations are still being corrected, months ending before that never change
+FINAL_AFTER = timedelta(days=7)
+
+# Months that are not final yet are fetched again after an hour
+RECENT_TTL = 60 * 60
+
+MAX_DAYS = 10 * 366
+MAX_CONCURRENCY = 4
+
+RECORD_SCHEMA = {**HOURLY_SCHEMA, "source_id": pl.Int64}
+
+# Final months are kept until evicted, as Parquet
+history_cache = TTLCache(
+    max_bytes=16 * 2**20,
+    directory=cache_dir("weather", "history"),
+    max_disk_bytes=env_int("MCP_SERVERS_HISTORY_CACHE_MB", 256) * 2**20,
+)
+register_stats("cache", "weather_history", history_cache.stats)
+
+
+def month_chunks(first: date, last: date) -> list[tuple[date, date]]:
+    """Splits the days first to last into calendar months.
+
+    Chunks are aligned to months rather than to the queried range, so that overlapping
+    queries share their cached chunks.
+
+    Returns:
+        list[tuple[date, date]]: The first day of every month and the first day of the next.
+    """
+    chunks = []
+    start = first.replace(day=1)
+
+    while start <= last:
+        end = (start + timedelta(days=32)).replace(day=1)
+        chunks.append((start, end))
+        start = end
+
+    return chunks
+
+
+async def fetch_chunk(
+    lat: float,
+    lon: float,
+    start: date,
+    end: date,
+    tz: str = DEFAULT_TIMEZONE,
+    url: str = WEATHER_URL,
+    today: date | None = None,
+) -> pl.DataFrame:
+    """Fetches the hourly records from start until (excluding) end.
+
+    Chunks that ended more than ``FINAL_AFTER`` ago are cached in ``history_cache`` without
+    expiry, all others for ``RECENT_TTL`` in the response cache.
+
+    Returns:
+        pl.DataFrame: The records following ``RECORD_SCHEMA``, timestamps as strings.
+    """
+    params = normalize_params(
+        {
+            "lat": lat,
+            "lon": lon,
+            "date": start.isoformat(),
+            "last_date": end.isoformat(),
+            "tz": tz,
+        }
+    )
+    key = cache_key(url, params)
+    final = end <= (today or date.today()) - FINAL_AFTER
+
+    if final and (cached := history_cache.get(key)) is not None:
+        return pl.read_parquet(io.BytesIO(cached))
+
+    response = await get_json(url, params, ttl=RECENT_TTL)
+    records, _ = decode_weather_columns(response, RECORD_SCHEMA)
+
+    if final:
+        buffer = io.BytesIO()
+        records.write_parquet(buffer)
+        history_cache.set(key, buffer.getvalue(), math.inf)
+
+    return records
+
+
+async def fetch_history(
+    lat: float,
+    lon: float,
+    first: date,
+    last: date,
+    tz: str = DEFAULT_TIMEZONE,
+    url: str = WEATHER_URL,
+    max_concurrency: int = MAX_CONCURRENCY,
+    today: date | None = None,
+) -> tuple[pl.DataFrame, list[dict]]:
+    """Fetches the hourly weather records of the days first to last (inclusive).
+
+    The range is split into months (see ``month_chunks``), of which at most max_concurrency
+    are fetched at the same time. Every month is decoded into Polars as soon as it arrives.
+
+    Args:
+        lat (float): Latitude of the location in decimal degrees.
+        lon (float): Longitude of the location in decimal degrees.
+        first (date): The first day.
+        last (date): The last day.
+        tz (str): Time zone of the days and the returned timestamps.
+        url (str): The BrightSky weather endpoint.
+        max_concurrency (int): Maximum number of months fetched at the same time.
+        today (date | None): Reference date for caching, defaults to today.
+
+    Returns:
+        tuple[pl.DataFrame, list[dict]]: The records, sorted by their time zone aware
+            ``timestamp``, and the ``start`` and ``error`` of every month that failed.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(start: date, end: date) -> pl.DataFrame:
+        async with slots:
+            return await fetch_chunk(lat, lon, start, end, tz, url, today)
+
+    chunks = month_chunks(first, last)
+    results = await asyncio.gather(
+        *(fetch(start, end) for start, end in chunks), return_exceptions=True
+    )
+
+    frames = []
+    failed = []
+
+    for (start, _), result in zip(chunks, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"Fetching the weather of {start:%Y-%m} failed: {result}")
+            failed.append({"start": start.isoformat(), "error": str(result)})
+        else:
+            frames.append(result)
+
+    frame = pl.concat(frames) if frames else pl.DataFrame(schema=RECORD_SCHEMA)
+
+    return (
+        frame.with_columns(pl.col("timestamp").str.to_datetime(time_zone=tz))
+        .filter(pl.col("timestamp").dt.date().is_between(first, last))
+        .unique("timestamp", keep="first")
+        .sort("timestamp"),
+        failed,
+    )
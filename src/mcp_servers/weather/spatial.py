@@ -0,0 +1,148 @@
+"""Grid based nearest neighbour search over weather stations."""
+
+from collections.abc import Sequence
+
+import polars as pl
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * 3.141592653589793 / 180
+
+
+def haversine_km(lat_a: pl.Expr, lon_a: pl.Expr, lat_b: pl.Expr, lon_b: pl.Expr) -> pl.Expr:
+    """Great-circle distance in km between two pairs of coordinate columns (in degrees)."""
+    lat_a, lon_a, lat_b, lon_b = (
+        column.radians() for column in (lat_a, lon_a, lat_b, lon_b)
+    )
+    a = ((lat_b - lat_a) / 2).sin() ** 2 + lat_a.cos() * lat_b.cos() * (
+        (lon_b - lon_a) / 2
+    ).sin() ** 2
+
+    return 2 * EARTH_RADIUS_KM * a.sqrt().arcsin()
+
+
+class NearestStationIndex:
+    """k-nearest station search on a regular latitude/longitude grid.
+
+    Stations are bucketed into cells of ``cell_size`` degrees. A query point is only compared
+    to the stations of its own and the 8 neighbouring cells, all query points at once in a
+    single Polars join. That result is exact whenever the k-th nearest candidate lies closer
+    than the border of the searched 3x3 block; the (rare) points where this does not hold,
+    e.g. far outside of Germany, are compared against all stations instead.
+    """
+
+    def __init__(self, stations: pl.DataFrame, cell_size: float = 0.5):
+        """
+        Args:
+            stations (pl.DataFrame): Stations with ``latitude_in_degrees`` and
+                                     ``longitude_in_degrees`` columns.
+            cell_size (float): Edge length of a grid cell in degrees.
+        """
+        self.cell_size = cell_size
+        self.stations = stations.with_row_index("_station")
+        self._cells = self.stations.select(
+            "_station",
+            "latitude_in_degrees",
+            "longitude_in_degrees",
+            *self._cell_of("latitude_in_degrees", "longitude_in_degrees"),
+        )
+
+    def nearest(self, points: Sequence[tuple[float, float]], k: int = 5) -> pl.DataFrame:
+        """Finds the k nearest stations for every point.
+
+        Args:
+            points (Sequence[tuple[float, float]]): (latitude, longitude) pairs in degrees.
+            k (int): Number of stations per point.
+
+        Returns:
+            pl.DataFrame: ``point`` (index into points), ``rank`` (0 = nearest),
+                          ``distance_in_km`` and all station columns, sorted by point and rank.
+        """
+        queries = pl.DataFrame(
+            {
+                "point": range(len(points)),
+                "lat": [point[0] for point in points],
+                "lon": [point[1] for point in points],
+            },
+            schema={"point": pl.UInt32, "lat": pl.Float64, "lon": pl.Float64},
+        ).with_columns(*self._cell_of("lat", "lon", suffix="_query"))
+
+        neighbours = pl.DataFrame(
+            {"d_lat": [d for d in (-1, 0, 1) for _ in range(3)], "d_lon": [-1, 0, 1] * 3},
+            schema={"d_lat": pl.Int64, "d_lon": pl.Int64},
+        )
+        candidates = (
+            queries.join(neighbours, how="cross")
+            .with_columns(
+                (pl.col("cell_lat_query") + pl.col("d_lat")).alias("cell_lat"),
+                (pl.col("cell_lon_query") + pl.col("d_lon")).alias("cell_lon"),
+            )
+            .join(self._cells, on=["cell_lat", "cell_lon"])
+        )
+        grid_result = self._top_k(candidates, k)
+
+        # Exact if the k-th neighbour is closer than the border of the searched 3x3 block
+        exact = (
+            grid_result.group_by("point")
+            .agg(pl.len().alias("found"), pl.col("distance_in_km").max().alias("kth"))
+            .join(queries, on="point")
+            .filter(
+                pl.col("found") >= min(k, self.stations.height),
+                pl.col("kth") <= self._block_radius_km(),
+            )
+            .select("point")
+        )
+        remaining = queries.join(exact, on="point", how="anti")
+
+        if remaining.height:
+            brute_force = self._top_k(remaining.join(self._cells, how="cross"), k)
+            grid_result = pl.concat(
+                [grid_result.join(exact, on="point", how="semi"), brute_force]
+            )
+
+        return (
+            grid_result.join(self.stations, on="_station")
+            .drop("_station")
+            .sort("point", "rank")
+        )
+
+    def _cell_of(self, lat: str, lon: str, suffix: str = "") -> list[pl.Expr]:
+        return [
+            (pl.col(lat) / self.cell_size).floor().cast(pl.Int64).alias(f"cell_lat{suffix}"),
+            (pl.col(lon) / self.cell_size).floor().cast(pl.Int64).alias(f"cell_lon{suffix}"),
+        ]
+
+    def _block_radius_km(self) -> pl.Expr:
+        """Distance from the query point to the closest border of its 3x3 cell block."""
+        south = (pl.col("cell_lat_query") - 1) * self.cell_size
+        north = (pl.col("cell_lat_query") + 2) * self.cell_size
+        west = (pl.col("cell_lon_query") - 1) * self.cell_size
+        east = (pl.col("cell_lon_query") + 2) * self.cell_size
+        # Meridians converge, use the latitude of the block closest to a pole
+        pole_lat = pl.max_horizontal(south.abs(), north.abs()).clip(upper_bound=90.0)
+
+        return pl.min_horizontal(
+            (pl.col("lat") - south) * KM_PER_DEGREE,
+            (north - pl.col("lat")) * KM_PER_DEGREE,
+            pl.min_horizontal(pl.col("lon") - west, east - pl.col("lon"))
+            * KM_PER_DEGREE
+            * pole_lat.radians().cos(),
+        )
+
+    @staticmethod
+    def _top_k(candidates: pl.DataFrame, k: int) -> pl.DataFrame:
+        return (
+            candidates.with_columns(
+                haversine_km(
+                    pl.col("lat"),
+                    pl.col("lon"),
+                    pl.col("latitude_in_degrees"),
+                    pl.col("longitude_in_degrees"),
+                ).alias("distance_in_km")
+            )
+            .group_by("point")
+            .agg(pl.col("_station", "distance_in_km").bottom_k_by("distance_in_km", k))
+            .explode("_station", "distance_in_km")
+            .sort("point", "distance_in_km")
+            .with_columns(pl.int_range(pl.len()).over("point").cast(pl.UInt32).alias("rank"))
+            .select("point", "rank", "_station", "distance_in_km")
+        )
@@ -0,0 +1,153 @@
+"""Streaming parser for the fixed-width DWD station list (``statlex_rich.txt``)."""
+
+import codecs
+import re
+
+import polars as pl
+
+# Source column of every output column
+COLUMNS = {
+    "station_name": "STAT_NAME",
+    "wmo_station_id": "STAT",
+    "latitude_in_degrees": "BR_HIGH",
+    "longitude_in_degrees": "LA_HIGH",
+    "state_location_abbreviation": "BL",
+    "last_weather_recording_date": "ENDE",
+}
+
+STATION_SCHEMA = {
+    "station_name": pl.String,
+    "wmo_station_id": pl.String,
+    "latitude_in_degrees": pl.Float64,
+    "longitude_in_degrees": pl.Float64,
+    "state_location_abbreviation": pl.String,
+    "last_weather_recording_date": pl.Date,
+}
+
+_HEADER_TOKEN = re.compile(r"\S+")
+
+
+class StationListParser:
+    """Parses the station list chunk by chunk, as it is downloaded.
+
+    The file is a fixed-width table: a title line, a header row, a line of dashes and one
+    line per station. Column boundaries are taken from the header row (every column starts
+    where its name starts), so station names with spaces and empty columns such as
+    ``HFG_NFG`` need no special treatment. The lines of each chunk are sliced into columns
+    by Polars, without any per-row Python work.
+
+    Usage::
+
+        parser = StationListParser()
+
+        for chunk in chunks:
+            parser.feed(chunk)
+
+        frame = parser.close()
+    """
+
+    def __init__(self, encoding: str = "latin-1"):
+        """
+        Args:
+            encoding (str): Encoding of the file, DWD serves it as latin-1 without a charset.
+        """
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._pending = ""
+        self._spans: dict[str, tuple[int, int | None]] | None = None
+        self._frames: list[pl.DataFrame] = []
+
+    def feed(self, chunk: bytes) -> None:
+        """Parses all complete lines of chunk, keeping a trailing partial line for later."""
+        text = self._pending + self._decoder.decode(chunk)
+        end = text.rfind("\n") + 1
+        self._pending = text[end:]
+
+        if end:
+            self._parse_lines(text[:end])
+
+    def close(self) -> pl.DataFrame:
+        """Parses the remaining input and returns all stations.
+
+        Returns:
+            pl.DataFrame: One row per station, following ``STATION_SCHEMA``.
+
+        Raises:
+            ValueError: If the input has no header row.
+        """
+        text = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+
+        if text:
+            self._parse_lines(text)
+
+        if self._spans is None:
+            raise ValueError("The station list has no STAT_NAME header row")
+
+        return pl.concat(self._frames) if self._frames else pl.DataFrame(schema=STATION_SCHEMA)
+
+    def _parse_lines(self, text: str) -> None:
+        while self._spans is None:
+            line, newline, text = text.partition("\n")
+
+            if line.startswith(COLUMNS["station_name"]):
+                self._spans = column_spans(line.rstrip("\r"))
+
+            if not newline:
+                return
+
+        if text:
+            self._frames.append(self._parse_rows(text))
+
+    def _parse_rows(self, text: str) -> pl.DataFrame:
+        def column(name: str) -> pl.Expr:
+            start, length = self._spans[COLUMNS[name]]
+
+            return pl.col("line").str.slice(start, length).str.strip_chars().alias(name)
+
+        return (
+            pl.Series("line", [text])
+            .str.split("\n")
+            .explode()
+            .to_frame()
+            .select(
+                column("station_name"),
+                column("wmo_station_id"),
+                column("latitude_in_degrees").cast(pl.Float64, strict=False),
+                column("longitude_in_degrees").cast(pl.Float64, strict=False),
+                column("state_location_abbreviation"),
+                column("last_weather_recording_date").str.to_date(format="%d.%m.%Y", strict=False),
+            )
+            # The line of dashes, empty lines and otherwise malformed rows
+            .drop_nulls(
+                ["latitude_in_degrees", "longitude_in_degrees", "last_weather_recording_date"]
+            )
+        )
+
+
+def column_spans(header: str) -> dict[str, tuple[int, int | None]]:
+    """Returns (offset, length) of every column of the header row; the last one is open-ended."""
+    starts = [(match.group(), match.start()) for match in _HEADER_TOKEN.finditer(header)]
+    missing = set(COLUMNS.values()) - {name for name, _ in starts}
+
+    if missing:
+        raise ValueError(f"The station list has no {', '.join(sorted(missing))} column")
+
+    return {
+        name: (start, next_start - start if next_start is not None else None)
+        for (name, start), (_, next_start) in zip(starts, starts[1:] + [(None, None)])
+    }
+
+
+def parse_station_list(content: str | bytes) -> pl.DataFrame:
+    """Parses the complete DWD station list into a typed Polars DataFrame.
+
+    Args:
+        content (str | bytes): The content of ``statlex_rich.txt``, raw or decoded.
+
+    Returns:
+        pl.DataFrame: One row per station, following ``STATION_SCHEMA``.
+    """
+    parser = StationListParser(encoding="latin-1" if isinstance(content, bytes) else "utf-8")
+    parser.feed(content if isinstance(content, bytes) else content.encode())
+
+    return parser.close()
@@ -0,0 +1,277 @@
+"""Ranked prefix and fuzzy search over weather station names."""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from collections.abc import Iterator, Sequence
+
+# German transliterations, applied before stripping the remaining diacritics
+_TRANSLITERATIONS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+# Score bands, so that better match kinds always rank above worse ones
+EXACT_SCORE = 1.0
+NAME_PREFIX_SCORE = 0.9
+TOKEN_PREFIX_SCORE = 0.7
+FUZZY_SCORE = 0.5
+
+
+def _strip_diacritics(text: str) -> str:
+    return "".join(
+        char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char)
+    )
+
+
+def fold(text: str, transliterate: bool = True) -> str:
+    """Case- and umlaut-folds a name, e.g. "München-Stadt" -> "muenchen stadt".
+
+    Args:
+        text (str): The text to fold.
+        transliterate (bool): Spell out German umlauts ("ü" -> "ue") instead of dropping the
+                              diacritic ("ü" -> "u").
+
+    Returns:
+        str: Lower case ASCII words separated by single spaces.
+    """
+    text = text.casefold()
+
+    if transliterate:
+        text = text.translate(_TRANSLITERATIONS)
+
+    return _NON_ALPHANUMERIC.sub(" ", _strip_diacritics(text)).strip()
+
+
+def fold_variants(text: str) -> set[str]:
+    """Returns both umlaut spellings of a folded name ("muenchen" and "munchen")."""
+    return {fold(text), fold(text, transliterate=False)}
+
+
+def trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance between two strings, giving up early once it exceeds max_distance.
+
+    Only the diagonal band of width ``2 * max_distance + 1`` of the DP matrix is computed.
+
+    Returns:
+        int: The edit distance, or ``max_distance + 1`` if it is larger than ``max_distance``.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    too_far = max_distance + 1
+    previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+
+    for i in range(1, len(a) + 1):
+        char_a = a[i - 1]
+        low, high = max(1, i - max_distance), min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= max_distance else too_far
+
+        for j in range(low, high + 1):
+            # Inlined min() of deletion, insertion and substitution, capped at too_far
+            cost = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            current[j] = cost if cost < too_far else too_far
+
+        if min(current[low - 1 : high + 1]) > max_distance:
+            return too_far
+
+        previous = current
+
+    return previous[-1]
+
+
+class _Trie:
+    """Character trie mapping folded keys to the positions of the records they belong to."""
+
+    _VALUES = "\0"
+
+    def __init__(self):
+        self._root: dict = {}
+
+    def insert(self, key: str, value: int) -> None:
+        node = self._root
+
+        for char in key:
+            node = node.setdefault(char, {})
+
+        node.setdefault(self._VALUES, set()).add(value)
+
+    def prefixed(self, prefix: str) -> Iterator[tuple[str, set[int]]]:
+        """Yields all (key, values) pairs whose key starts with prefix."""
+        node = self._find(prefix)
+
+        if node is None:
+            return
+
+        stack = [(prefix, node)]
+
+        while stack:
+            key, node = stack.pop()
+
+            for char, child in node.items():
+                if char == self._VALUES:
+                    yield key, child
+                else:
+                    stack.append((key + char, child))
+
+    def _find(self, key: str) -> dict | None:
+        node = self._root
+
+        for char in key:
+            node = node.get(char)
+
+            if node is None:
+                return None
+
+        return node
+
+
+class StationSearchIndex:
+    """Search index over station names with ranked exact, prefix and fuzzy matches.
+
+    Names are folded (see ``fold``) and indexed twice: as a whole, so that "hamburg fuhls"
+    finds "Hamburg-Fuhlsbüttel", and word by word, so that "pauli" finds
+    "Hamburg-Sankt Pauli". Words that do not match any prefix are looked up via trigram
+    overlap and ranked by their edit distance to the query.
+    """
+
+    def __init__(self, names: Sequence[str]):
+        self._names = _Trie()
+        self._tokens = _Trie()
+        self._token_positions: dict[str, set[int]] = defaultdict(set)
+        # Keyed by (trigram, token length), fuzzy candidates can only differ by a few characters
+        self._trigrams: dict[tuple[str, int], list[str]] = defaultdict(list)
+        self._trigram_counts: dict[str, int] = {}
+
+        for position, name in enumerate(names):
+            for variant in fold_variants(name):
+                self._names.insert(variant, position)
+
+                for token in variant.split():
+                    self._tokens.insert(token, position)
+                    self._token_positions[token].add(position)
+
+        for token in self._token_positions:
+            token_trigrams = trigrams(token)
+            self._trigram_counts[token] = len(token_trigrams)
+
+            for trigram in token_trigrams:
+                self._trigrams[trigram, len(token)].append(token)
+
+    def search(self, query: str, limit: int | None = 10) -> list[tuple[int, float]]:
+        """Finds the stations best matching the query.
+
+        Args:
+            query (str): (Part of) a station name, e.g. "hamburg", "Muenchen" or "Zugspitz".
+            limit (int | None): Maximum number of results, None for all matches.
+
+        Returns:
+            list[tuple[int, float]]: (position of the name, score in (0, 1]) pairs,
+                                     best match first.
+        """
+        variants = [variant for variant in fold_variants(query) if variant]
+        scores: dict[int, float] = {}
+
+        for variant in variants:
+            self._score_names(variant, scores)
+            self._score_tokens(variant.split(), scores, fuzzy=False)
+
+        # Fuzzy matches always rank below prefix matches, skip them if the latter suffice
+        if limit is None or len(scores) < limit:
+            for variant in variants:
+                self._score_tokens(variant.split(), scores, fuzzy=True)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+        return ranked if limit is None else ranked[:limit]
+
+    def _score_names(self, query: str, scores: dict[int, float]) -> None:
+        for key, positions in self._names.prefixed(query):
+            if key == query:
+                score = EXACT_SCORE
+            else:
+                score = NAME_PREFIX_SCORE + 0.09 * len(query) / len(key)
+
+            for position in positions:
+                if score > scores.get(position, 0.0):
+                    scores[position] = score
+
+    def _score_tokens(
+        self, query_tokens: list[str], scores: dict[int, float], fuzzy: bool
+    ) -> None:
+        # Every query word has to match a word of the name, the weakest match counts
+        token_scores: dict[int, float] | None = None
+
+        for query_token in query_tokens:
+            best = self._match_token(query_token, fuzzy)
+
+            if token_scores is None:
+                token_scores = best
+            else:
+                token_scores = {
+                    position: min(token_scores[position], score)
+                    for position, score in best.items()
+                    if position in token_scores
+                }
+
+        for position, score in (token_scores or {}).items():
+            if score > scores.get(position, 0.0):
+                scores[position] = score
+
+    def _match_token(self, query_token: str, fuzzy: bool) -> dict[int, float]:
+        best: dict[int, float] = {}
+
+        for token, positions in self._tokens.prefixed(query_token):
+            score = TOKEN_PREFIX_SCORE + 0.19 * len(query_token) / len(token)
+
+            for position in positions:
+                if score > best.get(position, 0.0):
+                    best[position] = score
+
+        if not fuzzy:
+            return best
+
+        for token, distance in self._fuzzy_tokens(query_token):
+            score = FUZZY_SCORE * (1 - distance / max(len(token), len(query_token)))
+
+            for position in self._token_positions[token]:
+                if score > best.get(position, 0.0):
+                    best[position] = score
+
+        return best
+
+    def _fuzzy_tokens(
+        self, query_token: str, candidates: int = 20
+    ) -> Iterator[tuple[str, int]]:
+        if len(query_token) < 3:
+            return
+
+        max_distance = 1 if len(query_token) < 6 else 2
+        query_trigrams = trigrams(query_token)
+        shared = Counter(
+            token
+            for length in range(
+                len(query_token) - max_distance, len(query_token) + max_distance + 1
+            )
+            for trigram in query_trigrams
+            for token in self._trigrams.get((trigram, length), ())
+        )
+
+        for token, count in shared.most_common(candidates):
+            # Dice coefficient, prunes candidates before the (costlier) edit distance
+            if 2 * count / (len(query_trigrams) + self._trigram_counts[token]) < 0.3:
+                continue
+
+            distance = levenshtein(query_token, token, max_distance)
+
+            if 0 < distance <= max_distance:
+                yield token, distance
@@ -0,0 +1,307 @@
+"""Persistent, pre-parsed index over the DWD station list (``statlex_rich.txt``)."""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import polars as pl
+
+from mcp_servers.files import temporary_path, write_atomic
+from mcp_servers.http_client import HttpClient, get_http_client
+from mcp_servers.scheduler import get_scheduler
+from mcp_servers.settings import cache_dir
+from spatial import NearestStationIndex
+from station_parser import StationListParser
+from station_search import StationSearchIndex
+
+logger = logging.getLogger(__name__)
+
+STATION_LIST_URL = os.environ.get(
+    "MCP_SERVERS_STATION_LIST_URL",
+    "https://www.dwd.de/DE/leistungen/klimadatendeutschland/statliste/statlex_rich.txt?view=nasPublication",
+)
+
+# Bytes parsed at once while the station list is downloading
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class _ActiveStations:
+    """The stations active since a given date and the (lazily built) indexes over them.
+
+    Used from the thread pool, the lock keeps concurrent lookups from building an index twice.
+    """
+
+    def __init__(self, frame: pl.DataFrame):
+        self.frame = frame
+        self._search_index: StationSearchIndex | None = None
+        self._nearest_index: NearestStationIndex | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def search_index(self) -> StationSearchIndex:
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = StationSearchIndex(self.frame["station_name"].to_list())
+
+        return self._search_index
+
+    @property
+    def nearest_index(self) -> NearestStationIndex:
+        with self._lock:
+            if self._nearest_index is None:
+                self._nearest_index = NearestStationIndex(self.frame)
+
+        return self._nearest_index
+
+    def lookup(self, location_name: str, limit: int) -> list[dict]:
+        positions = [position for position, _ in self.search_index.search(location_name, limit)]
+
+        return (
+            self.frame[positions]
+            # Needed re-cast to dump it as JSON
+            .with_columns(pl.col("last_weather_recording_date").cast(pl.String))
+            .to_dicts()
+        )
+
+    def nearest(self, points: list[tuple[float, float]], k: int) -> list[list[dict]]:
+        stations = (
+            self.nearest_index.nearest(points, k)
+            .with_columns(
+                pl.col("distance_in_km").round(2),
+                # Needed re-cast to dump it as JSON
+                pl.col("last_weather_recording_date").cast(pl.String),
+            )
+            .partition_by("point", as_dict=True, include_key=False)
+        )
+
+        return [
+            stations[(point,)].drop("rank").to_dicts() if (point,) in stations else []
+            for point in range(len(points))
+        ]
+
+
+class StationIndex:
+    """In-memory station table backed by a Parquet artifact on disk.
+
+    The station list is downloaded and parsed once, persisted as Parquet together with a small
+    JSON file holding the ``ETag``/``Last-Modified`` validators, and answered from memory from
+    then on. Once the data is older than ``max_age`` a conditional GET is started in the
+    background while lookups keep being served from the current table.
+
+    Parsing, searching and the disk I/O run in the thread pool of the scheduler (see
+    ``mcp_servers.scheduler``), so they don't block the event loop.
+    """
+
+    def __init__(
+        self,
+        directory: Path | None = None,
+        url: str = STATION_LIST_URL,
+        max_age: timedelta = timedelta(hours=24),
+        http_client: HttpClient | None = None,
+    ):
+        self._directory = directory
+        self.url = url
+        self.max_age = max_age
+        self._http_client = http_client
+
+        self._frame: pl.DataFrame | None = None
+        self._active: tuple[date, _ActiveStations] | None = None
+        self._meta: dict = {}
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    @property
+    def directory(self) -> Path:
+        if self._directory is None:
+            self._directory = cache_dir("weather")
+
+        return self._directory
+
+    @property
+    def artifact_path(self) -> Path:
+        return self.directory / "stations.parquet"
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / "stations.json"
+
+    def is_stale(self) -> bool:
+        fetched_at = self._meta.get("fetched_at", 0.0)
+
+        return time.time() - fetched_at > self.max_age.total_seconds()
+
+    async def frame(self) -> pl.DataFrame:
+        """Returns the station table, loading it from disk or the network on first use.
+
+        Returns:
+            pl.DataFrame: All stations, following ``station_parser.STATION_SCHEMA``.
+        """
+        if self._frame is None:
+            async with self._lock:
+                if self._frame is None:
+                    await get_scheduler().run_in_thread(self._load_artifact)
+
+                if self._frame is None:
+                    await self.refresh()
+
+        if self.is_stale() and (self._refresh_task is None or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+
+        return self._frame
+
+    async def refresh(self) -> bool:
+        """Re-downloads the station list if it changed upstream.
+
+        Returns:
+            bool: True if a new station list was parsed, False if upstream answered 304.
+        """
+        headers = {}
+
+        # Only revalidate if there is a table to fall back to
+        if self._frame is not None:
+            if etag := self._meta.get("etag"):
+                headers["If-None-Match"] = etag
+            if last_modified := self._meta.get("last_modified"):
+                headers["If-Modified-Since"] = last_modified
+
+        http_client = self._http_client or get_http_client()
+
+        async with http_client.stream("GET", self.url, headers=headers, timeout=30) as response:
+            if response.status_code == 304:
+                logger.debug("Station list not modified upstream")
+                self._meta["fetched_at"] = time.time()
+                self._write_meta()
+
+                return False
+
+            response.raise_for_status()
+
+            # The file is served without charset, which `requests` used to decode as latin-1
+            parser = StationListParser(response.charset_encoding or "latin-1")
+
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                await get_scheduler().run_in_thread(parser.feed, chunk)
+
+        frame = await get_scheduler().run_in_thread(parser.close)
+        logger.info(f"Parsed {frame.height} stations from {self.url}")
+
+        self._frame = frame
+        self._active = None
+        self._meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        await get_scheduler().run_in_thread(self._write_artifact)
+
+        return True
+
+    async def lookup(
+        self,
+        location_name: str,
+        limit: int = 10,
+        active_within: timedelta = timedelta(days=3),
+        today: date | None = None,
+    ) -> list[dict]:
+        """Finds the stations best matching ``location_name``, best match first.
+
+        Matching is case- and umlaut-insensitive and tolerates typos, see
+        ``StationSearchIndex``.
+
+        Args:
+            location_name (str): Location name to search for in the station list.
+            limit (int): Maximum number of stations to return.
+            active_within (timedelta): Only return stations updated within this period.
+            today (date | None): Reference date for ``active_within``, defaults to today.
+
+        Returns:
+            list[dict]: JSON serializable station records.
+        """
+        active = await self._active_stations(active_within, today)
+
+        return await get_scheduler().run_in_thread(active.lookup, location_name, limit)
+
+    async def nearest(
+        self,
+        points: list[tuple[float, float]],
+        k: int = 5,
+        active_within: timedelta = timedelta(days=3),
+        today: date | None = None,
+    ) -> list[list[dict]]:
+        """Finds the k nearest active stations for each (latitude, longitude) point.
+
+        Args:
+            points (list[tuple[float, float]]): Latitude/longitude pairs in decimal degrees.
+            k (int): Number of stations to return per point.
+            active_within (timedelta): Only return stations updated within this period.
+            today (date | None): Reference date for ``active_within``, defaults to today.
+
+        Returns:
+            list[list[dict]]: For every point, JSON serializable station records including
+                              their ``distance_in_km``, nearest first.
+        """
+        active = await self._active_stations(active_within, today)
+
+        return await get_scheduler().run_in_thread(active.nearest, points, k)
+
+    async def _active_stations(
+        self, active_within: timedelta, today: date | None
+    ) -> _ActiveStations:
+        frame = await self.frame()
+        since = (today or datetime.now().date()) - active_within
+
+        if self._active is not None and self._active[0] == since:
+            return self._active[1]
+
+        active = await get_scheduler().run_in_thread(
+            lambda: _ActiveStations(frame.filter(pl.col("last_weather_recording_date") >= since))
+        )
+
+        # Unless a refresh replaced the table meanwhile
+        if self._frame is frame:
+            self._active = (since, active)
+
+        return active
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+
+        except Exception as e:
+            logger.warning(f"Background refresh of the station list failed: {e}")
+
+    def _load_artifact(self) -> None:
+        try:
+            self._frame = pl.read_parquet(self.artifact_path)
+            self._active = None
+            self._meta = json.loads(self.meta_path.read_text())
+
+        except FileNotFoundError:
+            return
+
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable station artifact: {e}")
+            self._frame = None
+            self._meta = {}
+
+    def _write_artifact(self) -> None:
+        try:
+            tmp_path = temporary_path(self.artifact_path)
+            self._frame.write_parquet(tmp_path)
+            os.replace(tmp_path, self.artifact_path)
+            self._write_meta()
+
+        except OSError as e:
+            logger.warning(f"Could not persist station artifact: {e}")
+
+    def _write_meta(self) -> None:
+        try:
+            write_atomic(self.meta_path, json.dumps(self._meta).encode())
+
+        except OSError as e:
+            logger.warning(f"Could not persist station metadata: {e}")
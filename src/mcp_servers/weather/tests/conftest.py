@@ -0,0 +1,54 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+# The server is started as a script from its own directory (`uv run weather.py`),
+# so its modules import each other by their plain module names.
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+import brightsky  # noqa: E402
+from mcp_servers.cache import TTLCache  # noqa: E402
+from mcp_servers.http_client import HttpClient  # noqa: E402
+
+
+class BrightSkyStub:
+    """Stub of BrightSky, recording the parameters of every request.
+
+    Every request is answered with the (status, body) of ``respond(params)``, which by
+    default pops the next of the queued ``responses``. Requests take ``delay`` seconds,
+    the most of them in flight at once is kept in ``max_in_flight``.
+    """
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.responses: list[tuple[int, dict]] = []
+        self.respond = lambda params: self.responses.pop(0)
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        self.requests.append(params)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+        status_code, body = self.respond(params)
+
+        return httpx.Response(status_code, json=body)
+
+
+@pytest.fixture
+def upstream(monkeypatch) -> BrightSkyStub:
+    """Points the BrightSky client at a stub, with an empty response cache."""
+    stub = BrightSkyStub()
+    http_client = HttpClient(transport=httpx.MockTransport(stub.handle), retries=0)
+    monkeypatch.setattr(brightsky, "get_http_client", lambda: http_client)
+    monkeypatch.setattr(brightsky, "response_cache", TTLCache())
+
+    return stub
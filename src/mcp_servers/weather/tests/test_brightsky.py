@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import brightsky
+from brightsky import floor_to_hour, normalize_params, snap
+from mcp_servers.cache import TTLCache
+from mcp_servers.http_client import HttpClient
+
+
+def test_snap():
+    assert snap(53.5511) == 53.55
+    assert snap(9.9937) == 10.0
+    assert snap(-0.024) == -0.0
+
+
+def test_floor_to_hour():
+    assert floor_to_hour("2025-10-29T11:31+01:00") == "2025-10-29T11:00+01:00"
+    assert floor_to_hour("2025-10-29") == "2025-10-29T00:00"
+    assert floor_to_hour("tomorrow") == "tomorrow"
+
+
+def test_normalize_params():
+    assert normalize_params(
+        {"lat": 53.5511, "lon": 9.9937, "date": "2025-10-29T11:31+01:00", "last_date": None}
+    ) == {"lat": 53.55, "lon": 10.0, "date": "2025-10-29T11:00+01:00"}
+
+
+def test_nearby_queries_share_a_cache_entry(upstream):
+    upstream.respond = lambda params: (200, {"weather": {"temperature": 12.3}, "sources": []})
+
+    async def queries():
+        return [
+            await brightsky.get_json(
+                brightsky.CURRENT_WEATHER_URL, {"lat": lat, "lon": lon}, ttl=600
+            )
+            for lat, lon in [(53.5511, 9.9937), (53.5522, 9.9901), (48.1374, 11.5755)]
+        ]
+
+    hamburg, hamburg_nearby, munich = asyncio.run(queries())
+
+    assert hamburg == hamburg_nearby == munich
+    assert upstream.requests == [
+        {"lat": "53.55", "lon": "10.0"},
+        {"lat": "48.15", "lon": "11.6"},
+    ]
+    assert brightsky.response_cache.stats()["hits"] == 1
+
+
+def test_concurrent_identical_queries_share_one_upstream_request(monkeypatch, stub_server):
+    url = stub_server.route(
+        "/current_weather", {"weather": {"temperature": 12.3}, "sources": []}, delay=0.1
+    )
+    monkeypatch.setattr(brightsky, "response_cache", TTLCache())
+
+    async def burst():
+        return await asyncio.gather(
+            *(
+                brightsky.get_json(url, {"lat": 53.55 + i * 0.001, "lon": 9.99}, ttl=600)
+                for i in range(20)
+            )
+        )
+
+    responses = asyncio.run(burst())
+
+    assert len(set(responses)) == 1
+    assert len(stub_server.requests) == 1
@@ -0,0 +1,85 @@
+import json
+
+import polars as pl
+import pytest
+from pydantic import ValidationError
+
+from datamodels import WeatherForecastRecord, WeatherForecastResponse, WeatherResponse
+from decoding import adapter, decode, decode_weather_columns
+
+SCHEMA = {"timestamp": pl.String, "source_id": pl.Int64, "temperature": pl.Float64}
+
+
+def forecast(*records: dict) -> bytes:
+    return json.dumps(
+        {
+            "weather": list(records),
+            "sources": [{"id": 7, "station_name": "HAMBURG-FUHLSB.", "distance": 4200}],
+        }
+    ).encode()
+
+
+VALID = {"timestamp": "2026-10-17T12:00:00+02:00", "source_id": 7, "temperature": 12.5}
+
+
+def test_adapters_are_cached():
+    assert adapter(WeatherForecastRecord) is adapter(WeatherForecastRecord)
+
+
+def test_decode_validates_into_the_model():
+    response = decode(WeatherForecastResponse, forecast(VALID, {**VALID, "relative_humidity": 80}))
+
+    assert isinstance(response, WeatherForecastResponse)
+    assert response.weather[1].relative_humidity == 80
+    assert response.sources[0].station_name == "HAMBURG-FUHLSB."
+
+
+def test_lenient_mode_coerces_values_and_drops_invalid_records():
+    data = forecast(VALID, {**VALID, "relative_humidity": "80"}, {**VALID, "temperature": "warm"})
+
+    response = decode(WeatherForecastResponse, data, strict=False)
+
+    assert [record.relative_humidity for record in response.weather] == [None, 80]
+
+
+def test_strict_mode_rejects_the_response():
+    with pytest.raises(ValidationError):
+        decode(
+            WeatherForecastResponse,
+            forecast(VALID, {**VALID, "relative_humidity": "80"}),
+            strict=True,
+        )
+
+
+@pytest.mark.parametrize("strict", [True, False])
+def test_api_errors_raise_their_description(strict):
+    data = json.dumps({"title": "Not Found", "description": "No sources match your criteria"})
+
+    with pytest.raises(ValueError, match="No sources match your criteria"):
+        decode(WeatherResponse, data.encode(), strict=strict)
+
+    with pytest.raises(ValueError, match="No sources match your criteria"):
+        decode_weather_columns(data.encode(), SCHEMA, strict=strict)
+
+
+def test_columnar_decode_matches_validated_records():
+    data = forecast(VALID, {**VALID, "timestamp": "2026-10-17T13:00:00+02:00", "temperature": 11})
+
+    records, sources = decode_weather_columns(data, SCHEMA)
+
+    assert records.to_dicts() == [
+        record.model_dump(include=set(SCHEMA))
+        for record in decode(WeatherForecastResponse, data).weather
+    ]
+    assert sources["station_name"].to_list() == ["HAMBURG-FUHLSB."]
+
+
+def test_columnar_decode_falls_back_to_validation_in_lenient_mode():
+    data = forecast(VALID, {**VALID, "temperature": "warm"})
+
+    records, _ = decode_weather_columns(data, SCHEMA, strict=False)
+
+    assert records["temperature"].to_list() == [12.5]
+
+    with pytest.raises(ValueError):
+        decode_weather_columns(data, SCHEMA, strict=True)
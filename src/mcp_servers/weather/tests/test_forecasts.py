@@ -0,0 +1,198 @@
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+import weather
+from forecasts import aggregate, daily_summary, fetch_forecasts, forecast_frame, summarize
+
+HAMBURG = {"id": 1, "station_name": "HAMBURG-FUHLSB.", "distance": 4200}
+MUNICH = {"id": 2, "station_name": "MUENCHEN-STADT", "distance": 1500}
+
+
+def forecast(source: dict, temperatures: list[float], start_hour: int = 22) -> dict:
+    """BrightSky weather response with hourly records from 2026-10-17 start_hour:00 on."""
+    records = []
+
+    for i, temperature in enumerate(temperatures):
+        day, hour = divmod(start_hour + i, 24)
+        records.append(
+            {
+                "timestamp": f"2026-10-{17 + day}T{hour:02}:00:00+02:00",
+                "source_id": source["id"],
+                "temperature": temperature,
+                "precipitation": 0.5,
+                "precipitation_probability": 10 * i,
+                "wind_speed": 12.0,
+                "wind_gust_speed": 20.0,
+                "sunshine": 0,
+                "cloud_cover": 100,
+                "condition": "rain",
+            }
+        )
+
+    return {"weather": records, "sources": [{**source, "observation_type": "forecast"}]}
+
+
+def respond(params: dict) -> tuple[int, dict]:
+    """Answers as BrightSky, with Hamburg north and Munich south of 50° latitude."""
+    lat = float(params["lat"])
+
+    if lat > 60:
+        return 404, {"title": "Not Found", "description": "No sources match"}
+
+    if lat > 50:
+        return 200, forecast(HAMBURG, [10.0, 8.0, 6.0, 5.0, 7.0])
+
+    return 200, forecast(MUNICH, [3.0, 1.5, -1.0, -2.0, 4.0])
+
+
+@pytest.fixture
+def upstream(upstream):
+    upstream.respond = respond
+
+    return upstream
+
+
+def test_fetch_forecasts_dedupes_requests_and_sources(upstream):
+    points = [(53.5511, 9.9937), (53.5522, 9.9901), (53.63, 10.0), (48.1374, 11.5755)]
+
+    locations, hourly = asyncio.run(fetch_forecasts(points, "2026-10-17"))
+
+    # The first two points share a grid cell, the first three a MOSMIX station
+    assert len(upstream.requests) == 3
+    assert upstream.requests[0]["tz"] == "Europe/Berlin"
+    assert locations["source_id"].to_list() == [1, 1, 1, 2]
+    assert locations["distance_in_km"].to_list() == [4.2, 4.2, 4.2, 1.5]
+    assert hourly.height == 10
+    assert hourly.select("source_id", "timestamp").is_unique().all()
+
+
+def test_fetch_forecasts_leaves_out_unset_parameters(upstream):
+    asyncio.run(fetch_forecasts([(53.5511, 9.9937)], "2026-10-17"))
+
+    # Not sent as an empty last_date
+    assert set(upstream.requests[0]) == {"date", "tz", "lat", "lon"}
+
+
+def test_daily_summary_counts_local_days(upstream):
+    _, hourly = asyncio.run(fetch_forecasts([(48.1374, 11.5755)], "2026-10-17"))
+
+    daily = daily_summary(hourly)
+
+    assert daily.to_dicts() == [
+        {
+            "source_id": 2,
+            "date": date(2026, 10, 17),
+            "temperature_min": 1.5,
+            "temperature_max": 3.0,
+            "precipitation_total": 1.0,
+            "precipitation_probability_max": 10,
+        },
+        {
+            "source_id": 2,
+            "date": date(2026, 10, 18),
+            "temperature_min": -2.0,
+            "temperature_max": 4.0,
+            "precipitation_total": 1.5,
+            "precipitation_probability_max": 40,
+        },
+    ]
+
+
+def test_summarize_lists_errors_separately(upstream):
+    points = [(53.55, 10.0), (70.0, 20.0), (48.14, 11.58), (53.56, 9.99)]
+    locations, hourly = asyncio.run(fetch_forecasts(points, "2026-10-17"))
+
+    summary = summarize(locations, daily_summary(hourly))
+
+    assert [
+        (forecast["station_name"], forecast["locations"]) for forecast in summary["forecasts"]
+    ] == [("HAMBURG-FUHLSB.", [0, 3]), ("MUENCHEN-STADT", [2])]
+    assert summary["forecasts"][0]["daily"][0]["date"] == "2026-10-17"
+    assert summary["errors"] == [
+        {"location": 1, "lat": 70.0, "lon": 20.0, "error": "No sources match"}
+    ]
+
+
+def test_forecast_tool_returns_json(upstream):
+    locations = [
+        weather.WeatherQuery(lat=53.55, lon=10.0),
+        weather.WeatherQuery(lat=48.14, lon=11.58),
+    ]
+
+    result = json.loads(asyncio.run(weather.get_weather_forecast_many(locations, "2026-10-17")))
+
+    assert len(result["forecasts"]) == 2
+    assert result["errors"] == []
+
+
+@pytest.fixture
+def hourly():
+    """A day and a half of hourly records, starting at midnight."""
+    records = forecast(HAMBURG, [float(hour % 24) for hour in range(36)], start_hour=0)["weather"]
+
+    for i, record in enumerate(records):
+        record["wind_direction"] = 350 if i % 2 else 20
+
+    return forecast_frame(records, "Europe/Berlin", HAMBURG["id"])
+
+
+def test_aggregate_6_hours(hourly):
+    table = aggregate(hourly, every="6h", fields=["temperature", "precipitation", "wind_direction"])
+
+    assert table.columns == [
+        "timestamp", "temperature_min", "temperature_max", "precipitation_total",
+        "wind_direction_mean_direction",
+    ]
+    assert table.height == 6
+    assert table["temperature_max"].to_list()[:4] == [5.0, 11.0, 17.0, 23.0]
+    assert table["precipitation_total"].to_list()[0] == 3.0
+    # The mean of 350° and 20° is 5°, not 185°
+    assert table["wind_direction_mean_direction"].to_list()[0] == 5.0
+
+
+def test_aggregate_rolling_windows_drops_incomplete_ones(hourly):
+    table = aggregate(hourly, every="1h", period="24h", fields=["precipitation"])
+
+    assert table.height == 13
+    assert set(table["precipitation_total"]) == {12.0}
+
+
+def test_aggregate_without_step_only_selects_fields(hourly):
+    assert aggregate(hourly, every=None, fields=["temperature"]).columns == [
+        "timestamp", "temperature"
+    ]
+
+
+def test_aggregate_rejects_unknown_fields(hourly):
+    with pytest.raises(ValueError, match="Unknown fields humidity"):
+        aggregate(hourly, fields=["humidity"])
+
+
+def test_forecast_tool_summarizes_days(upstream):
+    query = weather.WeatherForecastQuery(date="2026-10-17", lat=53.55, lon=10.0)
+
+    raw = asyncio.run(weather.get_weather_forecast(query))
+    daily = json.loads(
+        asyncio.run(weather.get_weather_forecast(query, resolution="daily", fields=["temperature"]))
+    )
+
+    assert len(raw.weather) == 5
+    assert daily["station_name"] == "HAMBURG-FUHLSB."
+    assert daily["forecast"] == {
+        "date": ["2026-10-17", "2026-10-18"],
+        "temperature_min": [8.0, 5.0],
+        "temperature_max": [10.0, 7.0],
+    }
+
+
+def test_forecast_tool_defaults_to_hourly_table_for_fields(upstream):
+    query = weather.WeatherForecastQuery(date="2026-10-17", lat=53.55, lon=10.0)
+
+    result = json.loads(asyncio.run(weather.get_weather_forecast(query, fields=["temperature"])))
+
+    assert result["resolution"] == "hourly"
+    assert result["forecast"]["timestamp"][0] == "2026-10-17T22:00+02:00"
+    assert result["forecast"]["temperature"] == [10.0, 8.0, 6.0, 5.0, 7.0]
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import brightsky
+import history
+import weather
+from history import fetch_history, month_chunks
+from mcp_servers.cache import TTLCache
+
+TODAY = date(2026, 10, 17)
+
+
+def respond(params: dict) -> tuple[int, dict]:
+    """Answers as BrightSky, with one record per hour of the requested range."""
+    start = datetime.fromisoformat(params["date"])
+    end = datetime.fromisoformat(params["last_date"])
+    records = [
+        {
+            "timestamp": f"{start + timedelta(hours=hour):%Y-%m-%dT%H:%M}:00+01:00",
+            "source_id": 5,
+            "temperature": float(start.month),
+            "precipitation": 0.1,
+        }
+        for hour in range(int((end - start).total_seconds() // 3600))
+    ]
+
+    return 200, {"weather": records, "sources": [{"id": 5}]}
+
+
+@pytest.fixture
+def upstream(upstream, monkeypatch, tmp_path):
+    upstream.respond = respond
+    upstream.delay = 0.01
+    monkeypatch.setattr(history, "history_cache", TTLCache(directory=tmp_path))
+
+    return upstream
+
+
+def test_month_chunks():
+    assert month_chunks(date(2025, 11, 20), date(2026, 1, 1)) == [
+        (date(2025, 11, 1), date(2025, 12, 1)),
+        (date(2025, 12, 1), date(2026, 1, 1)),
+        (date(2026, 1, 1), date(2026, 2, 1)),
+    ]
+
+
+def test_fetch_history_fetches_months_with_bounded_concurrency(upstream):
+    hourly, failed = asyncio.run(
+        fetch_history(
+            53.55, 10.0, date(2025, 1, 15), date(2025, 12, 31), max_concurrency=3, today=TODAY
+        )
+    )
+
+    assert failed == []
+    assert len(upstream.requests) == 12
+    assert upstream.max_in_flight == 3
+    assert hourly["timestamp"].dt.date().min() == date(2025, 1, 15)
+    assert hourly["timestamp"].dt.date().max() == date(2025, 12, 31)
+    assert hourly["timestamp"].is_sorted()
+    assert hourly["timestamp"].is_unique().all()
+
+
+def test_final_months_are_cached_permanently(upstream):
+    def query():
+        return asyncio.run(
+            fetch_history(53.55, 10.0, date(2026, 8, 1), date(2026, 10, 16), today=TODAY)
+        )
+
+    first, _ = query()
+    # Only the running month is fetched again once the response cache expired
+    brightsky.response_cache.clear()
+    second, _ = query()
+
+    assert [request["date"][:7] for request in upstream.requests] == [
+        "2026-08", "2026-09", "2026-10", "2026-10"
+    ]
+    assert history.history_cache.stats()["hits"] == 2
+    assert first.equals(second)
+
+
+def test_history_tool_summarizes_months(upstream):
+    result = json.loads(
+        asyncio.run(
+            weather.get_weather_history(
+                53.55, 10.0, "2025-01-01", "2025-03-31", resolution="monthly",
+                fields=["temperature", "precipitation_probability"],
+            )
+        )
+    )
+
+    assert result["history"] == {
+        "date": ["2025-01-01", "2025-02-01", "2025-03-01"],
+        "temperature_min": [1.0, 2.0, 3.0],
+        "temperature_max": [1.0, 2.0, 3.0],
+    }
+    assert result["sources"] == [5]
+
+
+def test_history_tool_rejects_future_days():
+    assert "forecast" in asyncio.run(
+        weather.get_weather_history(
+            53.55, 10.0, "2025-01-01", (date.today() + timedelta(days=3)).isoformat()
+        )
+    )
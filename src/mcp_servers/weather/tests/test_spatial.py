@@ -0,0 +1,66 @@
+import random
+
+import polars as pl
+import pytest
+
+from spatial import NearestStationIndex, haversine_km
+
+
+@pytest.fixture(scope="module")
+def stations():
+    rng = random.Random(42)
+
+    return pl.DataFrame(
+        {
+            "station_name": [f"Station {i}" for i in range(500)],
+            "latitude_in_degrees": [rng.uniform(47.3, 55.0) for _ in range(500)],
+            "longitude_in_degrees": [rng.uniform(5.9, 15.0) for _ in range(500)],
+        }
+    )
+
+
+def brute_force(stations, lat, lon, k):
+    return (
+        stations.with_columns(
+            haversine_km(
+                pl.lit(lat),
+                pl.lit(lon),
+                pl.col("latitude_in_degrees"),
+                pl.col("longitude_in_degrees"),
+            ).alias("distance_in_km")
+        )
+        .sort("distance_in_km")
+        .head(k)["station_name"]
+        .to_list()
+    )
+
+
+def test_haversine_hamburg_munich():
+    distance = pl.select(
+        haversine_km(pl.lit(53.5511), pl.lit(9.9937), pl.lit(48.1351), pl.lit(11.5820))
+    ).item()
+
+    assert distance == pytest.approx(612, abs=2)
+
+
+def test_grid_search_matches_brute_force(stations):
+    rng = random.Random(7)
+    points = [(rng.uniform(47.0, 55.5), rng.uniform(5.5, 15.5)) for _ in range(200)]
+    # Far away from any station, needs the brute force fallback
+    points += [(40.4168, -3.7038), (-33.86, 151.21)]
+
+    result = NearestStationIndex(stations).nearest(points, k=4)
+
+    assert result.height == len(points) * 4
+
+    for point, (lat, lon) in enumerate(points):
+        found = result.filter(pl.col("point") == point)
+
+        assert found["rank"].to_list() == [0, 1, 2, 3]
+        assert found["station_name"].to_list() == brute_force(stations, lat, lon, 4)
+
+
+def test_k_larger_than_number_of_stations(stations):
+    result = NearestStationIndex(stations.head(3)).nearest([(50.0, 10.0)], k=5)
+
+    assert result.height == 3
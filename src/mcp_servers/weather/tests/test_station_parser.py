@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from station_parser import STATION_SCHEMA, StationListParser, column_spans, parse_station_list
+
+STATION_LIST = (Path(__file__).parent / "fixtures" / "statlex_rich.txt").read_bytes()
+
+
+def test_column_spans_follow_the_header_row():
+    header = STATION_LIST.decode("latin-1").splitlines()[1]
+    spans = column_spans(header)
+
+    assert spans["STAT_NAME"] == (0, 41)
+    assert spans["STAT_ID"] == (41, 8)
+    assert spans["ENDE"][1] is None
+
+
+def test_parse_station_list_keeps_names_with_spaces():
+    frame = parse_station_list(STATION_LIST)
+
+    assert frame.schema == STATION_SCHEMA
+    assert frame.height == 12
+
+    pauli = frame.filter(frame["station_name"] == "Hamburg-Sankt Pauli").row(0, named=True)
+    assert pauli["wmo_station_id"] == "-"
+    assert pauli["latitude_in_degrees"] == 53.5481
+    assert pauli["state_location_abbreviation"] == "HH"
+
+
+def test_parse_station_list_accepts_decoded_text():
+    assert parse_station_list(STATION_LIST.decode("latin-1")).equals(parse_station_list(STATION_LIST))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 4096])
+def test_feeding_chunks_gives_the_same_stations(chunk_size):
+    parser = StationListParser()
+
+    for start in range(0, len(STATION_LIST), chunk_size):
+        parser.feed(STATION_LIST[start:start + chunk_size])
+
+    assert parser.close().equals(parse_station_list(STATION_LIST))
+
+
+def test_utf8_characters_split_across_chunks():
+    text = STATION_LIST.decode("latin-1")
+    encoded = text.encode("utf-8")
+    parser = StationListParser(encoding="utf-8")
+
+    # Splits every two byte umlaut in half
+    for start in range(0, len(encoded), 3):
+        parser.feed(encoded[start:start + 3])
+
+    assert "Düsseldorf" in parser.close()["station_name"].to_list()
+
+
+def test_missing_header_row_raises():
+    parser = StationListParser()
+    parser.feed(b"no station list\r\n")
+
+    with pytest.raises(ValueError):
+        parser.close()
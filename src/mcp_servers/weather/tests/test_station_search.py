@@ -0,0 +1,69 @@
+import pytest
+
+from station_search import StationSearchIndex, fold, levenshtein
+
+NAMES = [
+    "Hamburg-Fuhlsbüttel",
+    "Hamburg-Neuwiedenthal",
+    "Hamburg-Sankt Pauli",
+    "München-Stadt",
+    "München-Flughafen",
+    "Zugspitze",
+    "Düsseldorf",
+    "Bad Homburg",
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return StationSearchIndex(NAMES)
+
+
+def names(index, query, limit=10):
+    return [NAMES[position] for position, _ in index.search(query, limit=limit)]
+
+
+def test_fold():
+    assert fold("München-Stadt") == "muenchen stadt"
+    assert fold("München-Stadt", transliterate=False) == "munchen stadt"
+    assert fold("Straße (FU)") == "strasse fu"
+
+
+def test_levenshtein_gives_up_beyond_max_distance():
+    assert levenshtein("zugspitze", "zugspitze", 2) == 0
+    assert levenshtein("zugspitz", "zugspitze", 2) == 1
+    assert levenshtein("hamburg", "homburg", 2) == 1
+    assert levenshtein("hamburg", "muenchen", 2) == 3
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("hamburg", "Hamburg-Fuhlsbüttel"),
+        ("HAMBURG fuhls", "Hamburg-Fuhlsbüttel"),
+        ("muenchen", "München-Stadt"),
+        ("Munchen flug", "München-Flughafen"),
+        ("pauli", "Hamburg-Sankt Pauli"),
+        ("Dusseldorf", "Düsseldorf"),
+        ("zugspize", "Zugspitze"),
+    ],
+)
+def test_best_match(index, query, expected):
+    assert names(index, query)[0] == expected
+
+
+def test_prefix_matches_rank_above_fuzzy_matches(index):
+    result = names(index, "hamburg")
+
+    assert result[:3] == [
+        "Hamburg-Fuhlsbüttel",
+        "Hamburg-Sankt Pauli",
+        "Hamburg-Neuwiedenthal",
+    ]
+    # "homburg" is one edit away
+    assert result[3] == "Bad Homburg"
+
+
+def test_unknown_and_empty_queries(index):
+    assert index.search("xyz") == []
+    assert index.search("  ") == []
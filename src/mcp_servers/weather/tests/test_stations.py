@@ -0,0 +1,134 @@
+import asyncio
+from datetime import date
+from pathlib import Path
+
+import httpx
+import pytest
+
+from mcp_servers.http_client import HttpClient
+from station_parser import STATION_SCHEMA, parse_station_list
+from stations import StationIndex
+
+STATION_LIST = (Path(__file__).parent / "fixtures" / "statlex_rich.txt").read_text(
+    encoding="latin-1"
+)
+TODAY = date(2026, 10, 17)
+
+
+@pytest.fixture
+def upstream():
+    """Stub of the DWD server, answering with the queued (status, body, headers) tuples."""
+    calls = []
+    responses = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(
+            {
+                key: value
+                for key, value in request.headers.items()
+                if key in ("if-none-match", "if-modified-since")
+            }
+        )
+        status_code, text, headers = responses.pop(0)
+
+        return httpx.Response(status_code, content=text.encode("latin-1"), headers=headers)
+
+    http_client = HttpClient(transport=httpx.MockTransport(handler), retries=0)
+
+    return http_client, calls, responses
+
+
+def test_parse_station_list():
+    frame = parse_station_list(STATION_LIST)
+
+    assert frame.height == 12
+    assert frame.schema == STATION_SCHEMA
+
+    zugspitze = frame.filter(frame["station_name"] == "Zugspitze").row(0, named=True)
+    assert zugspitze["wmo_station_id"] == "10961"
+    assert zugspitze["state_location_abbreviation"] == "BY"
+    assert zugspitze["last_weather_recording_date"] == TODAY
+
+
+def test_lookup_only_returns_active_stations(tmp_path, upstream):
+    http_client, _, responses = upstream
+    responses.append((200, STATION_LIST, {}))
+    index = StationIndex(directory=tmp_path, http_client=http_client)
+
+    result = asyncio.run(index.lookup("Hamburg", today=TODAY))
+
+    assert [station["station_name"] for station in result] == [
+        "Hamburg-Fuhlsbüttel",
+        "Hamburg-Neuwiedenthal",
+    ]
+    assert result[0]["last_weather_recording_date"] == "2026-10-17"
+
+
+def test_index_is_persisted_and_reloaded_without_download(tmp_path, upstream):
+    http_client, calls, responses = upstream
+    responses.append((200, STATION_LIST, {"ETag": '"abc"'}))
+
+    asyncio.run(StationIndex(directory=tmp_path, http_client=http_client).frame())
+    assert (tmp_path / "stations.parquet").exists()
+
+    reloaded = asyncio.run(StationIndex(directory=tmp_path, http_client=http_client).lookup("Berlin", today=TODAY))
+
+    assert len(calls) == 1
+    assert len(reloaded) == 2
+
+
+def test_refresh_revalidates_with_etag(tmp_path, upstream):
+    http_client, calls, responses = upstream
+    responses.extend(
+        [
+            (200, STATION_LIST, {"ETag": '"abc"'}),
+            (304, "", {}),
+        ]
+    )
+    index = StationIndex(directory=tmp_path, http_client=http_client)
+
+    async def load_then_refresh():
+        await index.frame()
+        return await index.refresh()
+
+    assert asyncio.run(load_then_refresh()) is False
+    assert calls[1] == {"if-none-match": '"abc"'}
+    assert not index.is_stale()
+
+
+def test_lookup_is_ranked_and_tolerates_typos(tmp_path, upstream):
+    http_client, _, responses = upstream
+    responses.append((200, STATION_LIST, {}))
+    index = StationIndex(directory=tmp_path, http_client=http_client)
+
+    async def lookups():
+        return (
+            await index.lookup("muenchen flughafen", today=TODAY),
+            await index.lookup("dusseldorf", today=TODAY),
+            await index.lookup("hamburg", limit=1, today=TODAY),
+        )
+
+    munich, duesseldorf, hamburg = asyncio.run(lookups())
+
+    assert munich[0]["station_name"] == "München-Flughafen"
+    assert duesseldorf[0]["station_name"] == "Düsseldorf"
+    assert len(hamburg) == 1
+
+
+def test_nearest_active_stations(tmp_path, upstream):
+    http_client, _, responses = upstream
+    responses.append((200, STATION_LIST, {}))
+    index = StationIndex(directory=tmp_path, http_client=http_client)
+
+    # Hamburg city centre and Marienplatz, Munich
+    hamburg, munich = asyncio.run(
+        index.nearest([(53.5511, 9.9937), (48.1374, 11.5755)], k=2, today=TODAY)
+    )
+
+    # Hamburg-Sankt Pauli is closest but inactive
+    assert [station["station_name"] for station in hamburg] == [
+        "Hamburg-Fuhlsbüttel",
+        "Hamburg-Neuwiedenthal",
+    ]
+    assert munich[0]["station_name"] == "München-Stadt"
+    assert 0 < munich[0]["distance_in_km"] < munich[1]["distance_in_km"]
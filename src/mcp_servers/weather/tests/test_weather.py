@@ -1,22 +1,139 @@
-import requests
-from pydantic import BaseModel, Field, field_validator, model_validator
+import asyncio
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+import httpx
 import pytest
-from ..src.weather.weather import (
+
+import weather
+from datamodels import (
+    CurrentWeatherRecord,
+    Source,
+    TimeResponse,
+    WeatherForecastQuery,
+    WeatherQuery,
+    WeatherResponse,
+)
+from mcp_servers.http_client import HttpClient
+from stations import StationIndex
+from weather import (
     get_current_datetime_week_weekday,
-    get_stations_names_and_ids,
     get_current_weather,
+    get_nearest_stations,
+    get_nearest_stations_batch,
+    get_stations_names_and_ids,
     get_weather_forecast,
 )
 
-from ..src.weather.datamodels import (
-    TimeResponse,
-    WeatherQuery,
-    WeatherForecastQuery,
-    WeatherResponse,
-    WeatherForecastResponse,
+# Dated today, so that the tools (which filter by the current date) find active stations
+STATION_LIST = (
+    (Path(__file__).parent / "fixtures" / "statlex_rich.txt")
+    .read_text(encoding="latin-1")
+    .replace("17.10.2026", date.today().strftime("%d.%m.%Y"))
 )
 
+SOURCE = {
+    **dict.fromkeys(Source.model_fields),
+    "id": 7,
+    "station_name": "HAMBURG-FUHLSB.",
+    "distance": 4200,
+}
+
+
+def current_weather() -> dict:
+    return {
+        "weather": {
+            **dict.fromkeys(CurrentWeatherRecord.model_fields),
+            "timestamp": "2026-10-17T12:00:00+02:00",
+            "temperature": 12.5,
+            "condition": "dry",
+        },
+        "sources": [{**SOURCE, "observation_type": "synop"}],
+    }
+
+
+def forecast(hours: int = 48) -> dict:
+    return {
+        "weather": [
+            {
+                "timestamp": f"2026-10-{17 + hour // 24}T{hour % 24:02}:00:00+02:00",
+                "source_id": 7,
+                "temperature": float(hour % 24),
+                "precipitation": 0.5,
+            }
+            for hour in range(hours)
+        ],
+        "sources": [{**SOURCE, "observation_type": "forecast"}],
+    }
+
 
-# TODO: Implement tests
 def test_get_current_datetime_week_weekday():
-    assert True
+    response = TimeResponse.model_validate_json(get_current_datetime_week_weekday())
+
+    assert response.current_weekday == datetime.now().strftime("%A")
+    assert response.current_calendar_week == int(datetime.now().strftime("%U"))
+
+
+def test_get_stations_names_and_ids(tmp_path, monkeypatch):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=STATION_LIST.encode("latin-1"))
+
+    http_client = HttpClient(transport=httpx.MockTransport(handler), retries=0)
+    monkeypatch.setattr(
+        weather, "_station_index", StationIndex(directory=tmp_path, http_client=http_client)
+    )
+
+    result = json.loads(asyncio.run(get_stations_names_and_ids("hamburg", max_results=1)))
+
+    assert [station["station_name"] for station in result] == ["Hamburg-Fuhlsbüttel"]
+    assert result[0]["wmo_station_id"] == "10147"
+
+
+@pytest.mark.parametrize("max_results", [0, -2])
+def test_get_stations_names_and_ids_rejects_invalid_max_results(max_results):
+    result = asyncio.run(get_stations_names_and_ids("hamburg", max_results=max_results))
+
+    assert result == "max_results must be at least 1."
+
+
+@pytest.mark.parametrize("k", [0, -1])
+def test_nearest_stations_reject_invalid_k(k):
+    location = WeatherQuery(lat=53.55, lon=10.0)
+
+    assert asyncio.run(get_nearest_stations(53.55, 10.0, k=k)) == "k must be at least 1."
+    assert asyncio.run(get_nearest_stations_batch([location], k=k)) == "k must be at least 1."
+
+
+def test_get_current_weather(upstream):
+    upstream.responses.append((200, current_weather()))
+
+    response = asyncio.run(get_current_weather(WeatherQuery(lat=53.55, lon=10.0)))
+
+    assert isinstance(response, WeatherResponse)
+    assert response.weather.temperature == 12.5
+    assert response.sources[0].station_name == "HAMBURG-FUHLSB."
+
+
+def test_get_current_weather_reports_upstream_errors(upstream):
+    upstream.responses.append((404, {"title": "Not Found", "description": "No sources match"}))
+
+    response = asyncio.run(get_current_weather(WeatherQuery(lat=80.0, lon=10.0)))
+
+    assert isinstance(response, str)
+    assert "Error: Unable to reach the weather API endpoint" in response
+
+
+def test_get_weather_forecast_daily(upstream):
+    upstream.responses.append((200, forecast()))
+    query = WeatherForecastQuery(date="2026-10-17", last_date="2026-10-19", lat=53.55, lon=10.0)
+
+    response = json.loads(
+        asyncio.run(
+            get_weather_forecast(query, resolution="daily", fields=["temperature", "precipitation"])
+        )
+    )
+
+    assert response["station_name"] == "HAMBURG-FUHLSB."
+    assert response["distance_in_km"] == 4.2
+    assert response["forecast"]["date"] == ["2026-10-17", "2026-10-18"]
@@ -1,10 +1,13 @@
-import requests
 import json
-from datetime import datetime, timedelta
+from datetime import date as Date, datetime
+from typing import Literal
 from mcp.server.fastmcp import FastMCP
 import logging
-import polars as pl
-import re
+from mcp_servers.http_client import http_lifespan
+from mcp_servers.metrics import log_payload
+from mcp_servers.scheduler import get_scheduler
+from mcp_servers.serve import run_server
+from mcp_servers.tool_registry import install_tool_registry
 from datamodels import (
     TimeResponse,
     WeatherQuery,
@@ -12,19 +15,50 @@ from datamodels import (
     WeatherResponse,
     WeatherForecastResponse,
 )
+from brightsky import (
+    CURRENT_WEATHER_TTL,
+    CURRENT_WEATHER_URL,
+    DEFAULT_TIMEZONE,
+    FORECAST_TTL,
+    WEATHER_URL,
+    get_json,
+)
+
+# Polars and the modules built on it (decoding, forecasts, history, stations) are imported
+# by the tools using them, so that the server answers ``initialize`` without loading them
 
 logger = logging.getLogger(__name__)
 
-mcp = FastMCP("weather")
+mcp = FastMCP("weather", lifespan=http_lifespan)
+install_tool_registry(mcp)
+
+# These fan out to many upstream requests (months, locations) and parse a lot of data
+get_scheduler().limit("Get historical weather", 2)
+get_scheduler().limit("Get weather forecast for many locations", 4)
+
+_station_index = None
+
+
+def get_station_index():
+    """Returns the station index of this process, created on first use."""
+    global _station_index
+
+    if _station_index is None:
+        from stations import StationIndex
+
+        _station_index = StationIndex()
+
+    return _station_index
 
 
 @mcp.tool(name="Fetch time information")
 def get_current_datetime_week_weekday() -> str:
-    f"""Tool to retrieve the current date and time as well as the weekday and calendar week.
+    """Tool to retrieve the current date and time as well as the weekday and calendar week.
 
     Returns:
-        TimeResponse: Returns a parsable JSON string following this schema: {TimeResponse}
-    """.strip()
+        str: A parsable JSON string with the current_datetime, current_weekday and
+             current_calendar_week.
+    """
 
     today = datetime.now()
 
@@ -38,147 +72,126 @@ def get_current_datetime_week_weekday() -> str:
 
 
 @mcp.tool(name="Get weather station information")
-async def get_stations_names_and_ids(location_name: str) -> str:
+async def get_stations_names_and_ids(location_name: str, max_results: int = 10) -> str:
     """
     Tool to get the latest station information of the German Weather Service (DWD).
     
     Most importantly, matches location names longitude and latitude, which can then be 
     used to query the BrightSky API for weather data, using longitude and latitude as inputs.
+    The search ignores case and umlauts and tolerates typos, best matches come first.
 
     Args:
         location_name (str): Location name to search for in the station list.
+        max_results (int): Maximum number of stations to return.
         
     Returns:
         str: A JSON parsable string containing the station location as longitude and latitude.
-    """.strip()
+    """
+    if max_results < 1:
+        return "max_results must be at least 1."
+
     try:
-        stations = requests.get(
-            url="https://www.dwd.de/DE/leistungen/klimadatendeutschland/statliste/statlex_rich.txt?view=nasPublication"
-        )
+        stations = await get_station_index().lookup(location_name, limit=max_results)
 
     except Exception as e:
         return f"""
         The GET request seems to fail with exception {e}.
         """.strip()
 
+    log_payload(logger, "Matching stations", stations)
+
+    return json.dumps(stations)
+
+
+@mcp.tool(name="Get nearest weather stations")
+async def get_nearest_stations(lat: float, lon: float, k: int = 5) -> str:
+    """
+    Tool to find the k weather stations of the German Weather Service (DWD) nearest to a
+    location. Only stations that reported within the last 3 days are considered.
+
+    Args:
+        lat (float): Latitude of the location in decimal degrees.
+        lon (float): Longitude of the location in decimal degrees.
+        k (int): Number of stations to return.
+
+    Returns:
+        str: A JSON parsable list of stations, nearest first, including their distance in km.
+    """
+    if k < 1:
+        return "k must be at least 1."
+
     try:
-        # Need to reconstruct the data bc the txt file is not in a standard format,
-        # which will confuse LLM trying to parse it.
-        station_dict = {
-            element: []
-            for element in stations.text.splitlines()[1].split()
-            if element != "HFG_NFG"  # Not needed and messes up alignment
-        }
+        stations = await get_station_index().nearest([(lat, lon)], k=k)
 
     except Exception as e:
         return f"""
-        Could not extract headers with exception {e}.
+        Could not look up the nearest stations with exception {e}.
         """.strip()
 
-    logger.debug(f"Empty station dict: \n\n{station_dict}")
-
-    # Reconstruct the station information by splitting on lines and then on spaces
-    reconstructed_stations = []
-
-    for relevant_station in [
-        station for station in stations.text.splitlines() if location_name in station
-    ]:
-        reconstructed_station = []
-
-        for i, element in enumerate(re.split("  +", relevant_station)):
-            # "If" needed as 1st col (station name) sometimes contains spaces
-            # and I don't want to split on those
-            if i == 0:
-                reconstructed_station.append(element)
-            else:
-                for i in element.split():
-                    reconstructed_station.append(i)
-
-        if len(reconstructed_station) == 11:
-            del reconstructed_station[7]
-
-        reconstructed_stations.append(reconstructed_station)
-
-    logger.debug(f"Reconstructed stations: \n\n{reconstructed_stations}")
-
-    # Populate the station_dict
-    for station in reconstructed_stations:
-        for i, element in enumerate(station):
-            key = list(station_dict)[i]
-            station_dict[key].append(element)
-
-    logger.debug(f"Filled station dict: \n\n{station_dict}")
-
-    # Using Polars df.to_dicts() to make it a nice JSON parsable for LLM
-    df = (
-        (
-            pl.LazyFrame(station_dict)
-            .with_columns(
-                pl.col("STAT_NAME").str.strip_chars(),
-                pl.col("STAT_ID").cast(pl.Int64),
-                pl.col("STAT").str.strip_chars(),
-                pl.col("BR_HIGH").cast(pl.Float64),
-                pl.col("LA_HIGH").cast(pl.Float64),
-                pl.col("HS").cast(pl.Int64),
-                pl.col("BL").str.strip_chars(),
-                pl.col("ENDE").str.to_date(format="%d.%m.%Y"),
-            )
-            .rename(
-                {
-                    "STAT": "wmo_station_id",
-                    "STAT_NAME": "station_name",
-                    "BR_HIGH": "latitude_in_degrees",
-                    "LA_HIGH": "longitude_in_degrees",
-                    "ENDE": "last_weather_recording_date",
-                    "BL": "state_location_abbreviation",
-                }
-            )
-            .drop(pl.col("KE", "STAT_ID", "HS", "BEGINN"))
-            .filter(
-                pl.col("last_weather_recording_date")
-                >= datetime.now().date() - timedelta(days=3)
-            )
-            # Needed re-cast to dump it as JSON
-            .with_columns(pl.col("last_weather_recording_date").cast(pl.String))
-        )
-        .collect()
-        .to_dicts()
-    )
+    return json.dumps(stations[0])
+
+
+@mcp.tool(name="Get nearest weather stations for many locations")
+async def get_nearest_stations_batch(locations: list[WeatherQuery], k: int = 5) -> str:
+    """
+    Tool to find the k nearest weather stations of the German Weather Service (DWD) for many
+    locations at once. Only stations that reported within the last 3 days are considered.
+
+    Args:
+        locations (list[WeatherQuery]): The locations, each with latitude and longitude.
+        k (int): Number of stations to return per location.
+
+    Returns:
+        str: A JSON parsable list with one entry per location, holding its coordinates and
+             its nearest stations (nearest first, including their distance in km).
+    """
+    if any(location.lat is None or location.lon is None for location in locations):
+        return "Every location needs both latitude and longitude."
+
+    if k < 1:
+        return "k must be at least 1."
+
+    points = [(location.lat, location.lon) for location in locations]
 
-    logger.info(json.dumps(df))
+    try:
+        stations = await get_station_index().nearest(points, k=k)
+
+    except Exception as e:
+        return f"""
+        Could not look up the nearest stations with exception {e}.
+        """.strip()
 
-    return json.dumps(df)
+    return json.dumps(
+        [
+            {"lat": lat, "lon": lon, "stations": nearest}
+            for (lat, lon), nearest in zip(points, stations)
+        ]
+    )
 
 
-# TODO: Enforce / Validate response schema
 @mcp.tool(name="Fetch current weather")
 async def get_current_weather(
     weather_query: WeatherQuery,
-    api_endpoint: str = "https://api.brightsky.dev/current_weather",
+    api_endpoint: str = CURRENT_WEATHER_URL,
 ) -> str | WeatherResponse:
-    f"""
+    """
     Tool to fetch the current weather data from the BrightSky API, which is a REST API
     for the German Weather Service (DWD).
     The weather_query can either contain latitude and longitude, or the wmo_station_id, but not both.
-    
-    The input should follow this schema (not enforced):
-    {WeatherQuery.model_json_schema()}
 
-    The response from the API follows this schema (not enforced):
-    {WeatherResponse.model_json_schema()}
+    The response from the API is validated against the WeatherResponse schema (see the
+    output schema of this tool).
     """
+    from decoding import decode
+
     try:
-        response = requests.get(
-            url=api_endpoint,
+        response = await get_json(
+            api_endpoint,
             params=weather_query.model_dump(exclude_none=True),
-            headers={"Accept": "application/json"},
+            ttl=CURRENT_WEATHER_TTL,
         )
 
-        logger.info(f"Weather API response status code: {response.status_code}")
-        logger.info(f"Weather API response content: {response.text}")
-
-        # TODO: Validate WeatherResponse and separate exception check from API call before dumping
-        return json.loads(response.text)
+        return decode(WeatherResponse, response)
 
     except Exception as e:
         logger.error(f"Error fetching weather data: {e}")
@@ -193,35 +206,189 @@ async def get_current_weather(
 @mcp.tool(name="Get weather forecast")
 async def get_weather_forecast(
     weather_query: WeatherForecastQuery | str,
-    api_endpoint: str = "https://api.brightsky.dev/weather",
+    api_endpoint: str = WEATHER_URL,
+    resolution: Literal["raw", "hourly", "6h", "daily"] = "raw",
+    fields: list[str] | None = None,
+    window_hours: int | None = None,
 ) -> WeatherForecastResponse | str:
     """Tool to retrieve an (hourly) weather forecast for a given location upto a specified
     forecast horizont.
 
+    Prefer a summarized resolution and only the fields needed, the raw forecast holds 20+
+    fields for every hour. Summaries give e.g. the min/max temperature and the precipitation
+    total of every 6 hours or day.
+
     Args:
         weather_query (WeatherForecastQuery | str): The weather query including the start and end dates as
                                               well as the longitude and latitude of the location. 
         api_endpoint (str): The brightsky API endpoint to call the weather forecast.
+        resolution (str): "raw" for the unchanged API response, "hourly" for a compact table
+                          of the hourly values, "6h" or "daily" for summaries.
+        fields (list[str] | None): Fields to return, defaults to all. Any of temperature,
+                                   dew_point, relative_humidity, pressure_msl, cloud_cover,
+                                   visibility, condition, icon, precipitation,
+                                   precipitation_probability, precipitation_probability_6h,
+                                   solar, sunshine, wind_speed, wind_direction,
+                                   wind_gust_speed, wind_gust_direction.
+        window_hours (int | None): Summarize rolling windows of this many hours instead, one
+                                   window starting every step of the resolution.
 
     Returns:
-        WeatherForecastResponse | str: The weather forecast for a given TimeFrame
-    """.strip()
+        WeatherForecastResponse | str: The weather forecast for a given TimeFrame. Summaries
+                                       are a JSON object of columns, one value per time step.
+    """
+
+    import polars as pl
+
+    from decoding import decode
+    from forecasts import RESOLUTIONS, aggregate, parse_forecast, to_columns
+
+    if resolution == "raw" and (fields or window_hours):
+        resolution = "hourly"
 
     try:
-        response = requests.get(
-            url=api_endpoint,
+        response = await get_json(
+            api_endpoint,
             params=weather_query.model_dump(exclude_none=True),
-            headers={"Accept": "application/json"},
+            ttl=FORECAST_TTL,
         )
 
-        logger.info(f"Weather API response status code: {response.status_code}")
-        logger.info(f"Weather API response content: {response.text}")
+        if resolution == "raw":
+            return decode(WeatherForecastResponse, response)
+
+        source, hourly = parse_forecast(response, DEFAULT_TIMEZONE)
+        every = RESOLUTIONS[resolution] if resolution != "hourly" or window_hours else None
+        period = f"{window_hours}h" if window_hours else None
+        table = aggregate(hourly, every=every, period=period, fields=fields)
+
+    except Exception as e:
+        return f"API request failed with error {e}"
+
+    if resolution == "daily" and not window_hours:
+        table = table.rename({"timestamp": "date"}).with_columns(pl.col("date").dt.date())
+
+    return json.dumps(
+        {
+            "station_name": source["station_name"],
+            "distance_in_km": source["distance_in_km"],
+            "resolution": resolution,
+            "window_hours": window_hours,
+            "forecast": to_columns(table),
+        }
+    )
+
 
-        return json.loads(response.text)
+@mcp.tool(name="Get weather forecast for many locations")
+async def get_weather_forecast_many(
+    locations: list[WeatherQuery],
+    date: str,
+    last_date: str | None = None,
+    tz: str = DEFAULT_TIMEZONE,
+) -> str:
+    """Tool to retrieve a daily weather forecast summary for many locations at once, e.g.
+    the stops of a route or the towns of a region.
+
+    Locations that are covered by the same forecast station share one forecast. For every
+    day, the minimum and maximum temperature (°C), the precipitation total (mm) and the
+    maximum precipitation probability (%) are returned.
+
+    Args:
+        locations (list[WeatherQuery]): The locations, each with latitude and longitude.
+        date (str): Timestamp of the first forecast record in ISO 8601 format, e.g. "2025-10-29".
+        last_date (str | None): Timestamp of the last forecast record, defaults to date + 1 day.
+        tz (str): Time zone the days are counted in.
+
+    Returns:
+        str: A JSON parsable object with one forecast per station, listing the positions of
+             the locations it covers, and the locations no forecast was found for.
+    """
+    from forecasts import daily_summary, fetch_forecasts, summarize
+
+    if any(location.lat is None or location.lon is None for location in locations):
+        return "Every location needs both latitude and longitude."
+
+    points = [(location.lat, location.lon) for location in locations]
+
+    try:
+        stations, hourly = await fetch_forecasts(points, date, last_date, tz=tz)
 
     except Exception as e:
         return f"API request failed with error {e}"
 
+    return json.dumps(summarize(stations, daily_summary(hourly)))
+
+
+@mcp.tool(name="Get historical weather")
+async def get_weather_history(
+    lat: float,
+    lon: float,
+    date: str,
+    last_date: str,
+    resolution: Literal["daily", "weekly", "monthly"] = "daily",
+    fields: list[str] | None = None,
+) -> str:
+    """Tool to retrieve summarized weather observations of a location over a long period,
+    e.g. to answer climate questions about the past months or years.
+
+    Args:
+        lat (float): Latitude of the location in decimal degrees.
+        lon (float): Longitude of the location in decimal degrees.
+        date (str): The first day, in ISO 8601 format, e.g. "2024-01-01".
+        last_date (str): The last day (inclusive), in ISO 8601 format, e.g. "2024-12-31".
+        resolution (str): Summarize every "daily", "weekly" or "monthly" period.
+        fields (list[str] | None): Fields to return, defaults to all. Any of temperature,
+                                   dew_point, relative_humidity, pressure_msl, cloud_cover,
+                                   visibility, condition, icon, precipitation, solar,
+                                   sunshine, wind_speed, wind_direction, wind_gust_speed,
+                                   wind_gust_direction.
+
+    Returns:
+        str: A JSON object of columns, one value per period, starting at its ``date``.
+             Months that could not be fetched are listed in ``failed``.
+    """
+    import polars as pl
+
+    from forecasts import RESOLUTIONS, aggregate, to_columns
+    from history import MAX_DAYS, fetch_history
+
+    try:
+        first = datetime.fromisoformat(date).date()
+        last = datetime.fromisoformat(last_date).date()
+
+    except ValueError as e:
+        return f"Invalid date: {e}"
+
+    if last < first:
+        return "last_date must not be before date."
+
+    if (last - first).days > MAX_DAYS:
+        return f"The period must not be longer than {MAX_DAYS} days."
+
+    if last > Date.today():
+        return "Use the forecast tool for future days."
+
+    try:
+        hourly, failed = await fetch_history(lat, lon, first, last)
+        table = aggregate(hourly, every=RESOLUTIONS[resolution], fields=fields)
+
+    except Exception as e:
+        return f"API request failed with error {e}"
+
+    table = table.rename({"timestamp": "date"}).with_columns(pl.col("date").dt.date())
+    # Observations lack some fields of forecasts (e.g. precipitation_probability)
+    table = table.select(
+        column.name for column in table.iter_columns() if column.null_count() < table.height
+    )
+
+    return json.dumps(
+        {
+            "resolution": resolution,
+            "sources": hourly["source_id"].unique().sort().to_list(),
+            "history": to_columns(table),
+            "failed": failed,
+        }
+    )
+
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
+    run_server(mcp, "weather")
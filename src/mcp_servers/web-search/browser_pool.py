@@ -0,0 +1,229 @@
+"""Pool of long-lived, warm crawl4ai browsers shared by the web-search tools."""
+
+import asyncio
+import logging
+import threading
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+# crawl4ai takes most of the server's startup, it is only imported once a browser launches
+if TYPE_CHECKING:
+    from crawl4ai import AsyncWebCrawler
+    from crawl4ai.async_configs import BrowserConfig
+
+logger = logging.getLogger(__name__)
+
+
+# Threads importing crawl4ai at the same time see each other's partially initialized modules
+# (and fail with circular import errors), so only one thread imports it
+_import_lock = threading.Lock()
+_crawler_class: type["AsyncWebCrawler"] | None = None
+
+
+def _import_crawler() -> type["AsyncWebCrawler"]:
+    global _crawler_class
+
+    with _import_lock:
+        if _crawler_class is None:
+            from crawl4ai import AsyncWebCrawler
+
+            _crawler_class = AsyncWebCrawler
+
+    return _crawler_class
+
+
+async def import_crawl4ai() -> None:
+    """Imports crawl4ai in a thread, or waits for the import the pool started.
+
+    The tools importing crawl4ai lazily await this first, instead of importing it on the
+    event loop while the pool imports it in the background.
+    """
+    if _crawler_class is None:
+        await asyncio.to_thread(_import_crawler)
+
+
+class _Slot:
+    """One pooled crawler (i.e. one headless browser) and how often it has been used."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.crawler: "AsyncWebCrawler | None" = None
+        self.uses = 0
+
+
+class BrowserPool:
+    """Keeps ``size`` started ``AsyncWebCrawler`` instances warm between tool calls.
+
+    A tool call borrows a crawler with ``async with pool.crawler() as crawler``, so it only
+    pays for the page navigation instead of a whole browser launch. Each browser is
+    recycled after ``max_uses`` crawls to bound its memory growth, and restarted when it
+    crashed (checked before it is handed out, after a failed crawl and periodically while
+    idle).
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        browser_config: "BrowserConfig | None" = None,
+        max_uses: int = 100,
+        health_check_interval: float = 60.0,
+        crawler_factory: "Callable[..., AsyncWebCrawler] | None" = None,
+    ):
+        """
+        Args:
+            size (int): Number of warm browsers.
+            browser_config (BrowserConfig | None): Browser settings, crawl4ai's default if None.
+            max_uses (int): Crawls after which a browser is restarted, 0 to never recycle.
+            health_check_interval (float): Seconds between checks of the idle browsers.
+            crawler_factory (Callable[..., AsyncWebCrawler] | None): Creates the crawlers,
+                ``AsyncWebCrawler`` if None.
+        """
+        self.size = max(1, size)
+        self.browser_config = browser_config
+        self.max_uses = max_uses
+        self.health_check_interval = health_check_interval
+        self.crawler_factory = crawler_factory
+
+        self._slots = [_Slot(index) for index in range(self.size)]
+        self._idle: asyncio.Queue[_Slot] | None = None
+        self._health_task: asyncio.Task | None = None
+        self._start_lock = asyncio.Lock()
+        self._counters = {"crawls": 0, "launches": 0, "crashes": 0}
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """Launches all browsers. Failing launches are retried when the browser is borrowed."""
+        async with self._start_lock:
+            if self.started:
+                return
+
+            if self.crawler_factory is None:
+                # In a thread, so that the server keeps answering while crawl4ai is imported
+                self.crawler_factory = await asyncio.to_thread(_import_crawler)
+
+            self._idle = asyncio.Queue()
+            await asyncio.gather(*(self._restart(slot) for slot in self._slots))
+
+            for slot in self._slots:
+                self._idle.put_nowait(slot)
+
+            if self.health_check_interval > 0:
+                self._health_task = asyncio.create_task(self._check_health_periodically())
+
+    async def close(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+
+        await asyncio.gather(*(self._close(slot) for slot in self._slots))
+        self._idle = None
+
+    @asynccontextmanager
+    async def crawler(self) -> AsyncIterator["AsyncWebCrawler"]:
+        """Borrows a healthy, started crawler for the duration of the context."""
+        if not self.started:
+            await self.start()
+
+        slot = await self._idle.get()
+
+        try:
+            if not self._is_healthy(slot):
+                await self._restart(slot)
+
+            if slot.crawler is None:
+                raise RuntimeError("The headless browser could not be started.")
+
+            try:
+                yield slot.crawler
+
+            except Exception:
+                if not self._is_healthy(slot):
+                    self._counters["crashes"] += 1
+                    logger.warning(f"Browser {slot.index} crashed, restarting it")
+                    await self._restart(slot)
+
+                raise
+
+            finally:
+                slot.uses += 1
+                self._counters["crawls"] += 1
+
+            if self.max_uses and slot.uses >= self.max_uses:
+                logger.info(f"Recycling browser {slot.index} after {slot.uses} crawls")
+                await self._restart(slot)
+
+        finally:
+            # The pool may have been closed meanwhile
+            if self._idle is not None:
+                self._idle.put_nowait(slot)
+
+    def stats(self) -> dict:
+        return {
+            **self._counters,
+            "size": self.size,
+            "idle": self._idle.qsize() if self.started else 0,
+        }
+
+    @staticmethod
+    def _is_healthy(slot: _Slot) -> bool:
+        crawler = slot.crawler
+
+        if crawler is None or not crawler.ready:
+            return False
+
+        browser_manager = getattr(crawler.crawler_strategy, "browser_manager", None)
+        browser = getattr(browser_manager, "browser", None)
+
+        # Persistent contexts have no separate browser object to ask
+        return browser is None or browser.is_connected()
+
+    async def _restart(self, slot: _Slot) -> None:
+        await self._close(slot)
+
+        crawler = self.crawler_factory(config=self.browser_config)
+
+        try:
+            await crawler.start()
+
+        except Exception as e:
+            logger.error(f"Could not start browser {slot.index}: {e}")
+            slot.crawler = crawler
+            await self._close(slot)
+
+            return
+
+        slot.crawler = crawler
+        slot.uses = 0
+        self._counters["launches"] += 1
+
+    async def _close(self, slot: _Slot) -> None:
+        crawler, slot.crawler = slot.crawler, None
+
+        if crawler is None:
+            return
+
+        try:
+            await crawler.close()
+
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing browser {slot.index}: {e}")
+
+    async def _check_health_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+
+            # Only idle browsers are checked, borrowed ones are checked when they are returned
+            for _ in range(self._idle.qsize()):
+                slot = self._idle.get_nowait()
+
+                try:
+                    if not self._is_healthy(slot):
+                        logger.warning(f"Browser {slot.index} failed its health check")
+                        await self._restart(slot)
+
+                finally:
+                    self._idle.put_nowait(slot)
@@ -0,0 +1,118 @@
+"""Concurrent crawling of many links with one pooled browser."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing
+
+from crawl4ai import AsyncWebCrawler, CrawlResult
+from crawl4ai.async_configs import CrawlerRunConfig
+from crawl4ai.async_dispatcher import MemoryAdaptiveDispatcher, RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class HostRateLimiter(RateLimiter):
+    """Starts at most one request per host every ``delay`` seconds.
+
+    crawl4ai's ``RateLimiter`` only spaces requests once a host has been seen, so the first
+    wave of a batch would hit a host all at once. Here requests to the same host queue up
+    behind a per-host lock instead; different hosts don't wait for each other. Rate limit
+    responses (429/503) still back the host off exponentially, as in the base class.
+    """
+
+    def __init__(self, delay: float = 1.0, max_delay: float = 60.0, max_retries: int = 3):
+        super().__init__(base_delay=(delay, delay), max_delay=max_delay, max_retries=max_retries)
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def wait_if_needed(self, url: str) -> None:
+        domain = self.get_domain(url)
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+
+        async with lock:
+            await super().wait_if_needed(url)
+
+
+async def crawl_many(
+    crawler: AsyncWebCrawler,
+    links: list[str],
+    config: CrawlerRunConfig,
+    max_concurrency: int = 5,
+    per_host_delay: float = 1.0,
+) -> AsyncIterator[CrawlResult]:
+    """Crawls links concurrently and yields the results in completion order.
+
+    Closing the iterator early cancels the crawls still running.
+
+    Args:
+        crawler (AsyncWebCrawler): A started crawler, all pages are opened in its browser.
+        links (list[str]): The links to crawl.
+        config (CrawlerRunConfig): Settings of every crawl (the per-page timeout, among others).
+        max_concurrency (int): Maximum number of pages loaded at the same time.
+        per_host_delay (float): Minimum seconds between two requests to the same host.
+
+    Yields:
+        CrawlResult: The result of each link, failed crawls included.
+    """
+    dispatcher = MemoryAdaptiveDispatcher(
+        max_session_permit=max(1, max_concurrency),
+        rate_limiter=HostRateLimiter(delay=per_host_delay),
+    )
+
+    results = await crawler.arun_many(
+        links,
+        config=config.clone(stream=True),
+        dispatcher=dispatcher,
+    )
+
+    async with aclosing(results):
+        async for result in results:
+            yield result
+
+
+async def crawl_within_budget(
+    crawler: AsyncWebCrawler,
+    links: list[str],
+    config: CrawlerRunConfig,
+    time_budget: float,
+    on_result: Callable[[CrawlResult], Awaitable[None]] | None = None,
+    **kwargs,
+) -> tuple[list[CrawlResult], list[str]]:
+    """Crawls links concurrently until all are done or the time budget is spent.
+
+    Args:
+        crawler (AsyncWebCrawler): A started crawler.
+        links (list[str]): The links to crawl.
+        config (CrawlerRunConfig): Settings of every crawl.
+        time_budget (float): Seconds after which the remaining crawls are cancelled.
+        on_result (Callable[[CrawlResult], Awaitable[None]] | None): Awaited with every
+            result as soon as it is available, e.g. to report progress.
+        **kwargs: Passed on to ``crawl_many``.
+
+    Returns:
+        tuple[list[CrawlResult], list[str]]: The results in completion order and the links
+            that were not finished within the budget.
+    """
+    started = time.monotonic()
+    results: list[CrawlResult] = []
+
+    try:
+        async with asyncio.timeout(time_budget):
+            async with aclosing(crawl_many(crawler, links, config, **kwargs)) as stream:
+                async for result in stream:
+                    results.append(result)
+
+                    if on_result is not None:
+                        await on_result(result)
+
+    except TimeoutError:
+        logger.info(
+            f"Time budget of {time_budget}s spent after {time.monotonic() - started:.1f}s, "
+            f"{len(links) - len(results)} of {len(links)} links unfinished"
+        )
+
+    finished = {result.url for result in results}
+    unfinished = [link for link in links if link not in finished]
+
+    return results, unfinished
@@ -0,0 +1,177 @@
+"""On-disk cache of crawled pages, keyed by their normalized URL."""
+
+import logging
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import pydantic_core
+
+from mcp_servers.cache import TTLCache
+from mcp_servers.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# Search results change quickly, articles rarely
+SERP_TTL = 60 * 60
+ARTICLE_TTL = 24 * 60 * 60
+
+# How long expired pages with an ETag or Last-Modified header are kept for revalidation
+REVALIDATE_FOR = 7 * 24 * 60 * 60
+
+# Bump when the format of the cached pages changes, older entries are ignored then
+FORMAT_VERSION = 2
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+TRACKING_PARAMS = frozenset({"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref_src"})
+
+
+def normalize_url(url: str) -> str:
+    """Normalizes a URL, so that different spellings of the same page share a cache entry.
+
+    Lower-cases scheme and host, drops default ports, fragments and tracking parameters
+    (``utm_*``, ``fbclid``, ...) and sorts the query parameters.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    if parts.port is not None and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMS
+    )
+
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class CrawlCache:
+    """Caches the extracted content of crawled pages (markdown, links and media).
+
+    Pages are stored zlib-compressed in a ``TTLCache`` whose disk tier names files by the
+    hash of the normalized URL, bounded in size and evicting the least recently used pages.
+    Search result pages (``kind="serp"``) and articles (``kind="article"``) have separate
+    TTLs. Expired pages that came with an ``ETag`` or ``Last-Modified`` header are kept a
+    while longer and revalidated with a conditional GET, which is much cheaper than
+    crawling them again.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        serp_ttl: float = SERP_TTL,
+        article_ttl: float = ARTICLE_TTL,
+        revalidate_for: float = REVALIDATE_FOR,
+    ):
+        """
+        Args:
+            cache (TTLCache): Stores the compressed pages.
+            serp_ttl (float): Seconds search result pages are fresh for.
+            article_ttl (float): Seconds all other pages are fresh for.
+            revalidate_for (float): Seconds expired pages are kept for revalidation.
+        """
+        self.cache = cache
+        self.ttls = {"serp": serp_ttl, "article": article_ttl}
+        self.revalidate_for = revalidate_for
+        self._counters = {"revalidated": 0, "not_modified": 0}
+
+    async def get(self, url: str, kind: str = "article") -> dict | None:
+        """Returns the cached page, or None if it has to be crawled (again).
+
+        Args:
+            url (str): The page's URL.
+            kind (str): ``"serp"`` or ``"article"``, selects the TTL.
+
+        Returns:
+            dict | None: The page's ``markdown``, ``links`` and ``media``.
+        """
+        key = normalize_url(url)
+        data = self.cache.get(key)
+
+        if data is None:
+            return None
+
+        entry = pydantic_core.from_json(zlib.decompress(data))
+
+        if entry.get("version") != FORMAT_VERSION:
+            return None
+
+        if self.cache.clock() < entry["fetched_at"] + self.ttls[kind]:
+            return entry["page"]
+
+        if await self._revalidate(url, entry):
+            self._store(key, kind, entry)
+
+            return entry["page"]
+
+        return None
+
+    def put(self, url: str, page: dict, kind: str = "article", headers: dict | None = None) -> None:
+        """Caches a crawled page.
+
+        Args:
+            url (str): The page's URL.
+            page (dict): The page's ``markdown``, ``links`` and ``media``.
+            kind (str): ``"serp"`` or ``"article"``, selects the TTL.
+            headers (dict | None): The page's response headers, to revalidate it later.
+        """
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+
+        entry = {
+            "version": FORMAT_VERSION,
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "page": page,
+        }
+
+        self._store(normalize_url(url), kind, entry)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), **self._counters}
+
+    def _store(self, key: str, kind: str, entry: dict) -> None:
+        entry["fetched_at"] = self.cache.clock()
+        ttl = self.ttls[kind]
+
+        if entry["etag"] or entry["last_modified"]:
+            ttl += self.revalidate_for
+
+        self.cache.set(key, zlib.compress(pydantic_core.to_json(entry)), ttl)
+
+    async def _revalidate(self, url: str, entry: dict) -> bool:
+        headers = {}
+
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        if not headers:
+            return False
+
+        self._counters["revalidated"] += 1
+
+        try:
+            response = await get_http_client().get(url, headers=headers, timeout=5)
+
+        except httpx.HTTPError as e:
+            logger.debug(f"Could not revalidate {url}: {e}")
+
+            return False
+
+        # Some servers ignore conditional requests, but still send the same ETag
+        not_modified = response.status_code == 304 or (
+            response.status_code == 200
+            and entry["etag"] is not None
+            and response.headers.get("etag") == entry["etag"]
+        )
+
+        if not_modified:
+            self._counters["not_modified"] += 1
+
+        return not_modified
@@ -0,0 +1,221 @@
+"""Browserless fetching of static pages over the shared HTTP client.
+
+The fetched HTML is processed (scraped and converted to markdown) in the process pool of the
+scheduler (see ``mcp_servers.scheduler``), as this is pure Python holding the GIL for as long
+as a few hundred milliseconds per page.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable
+
+import httpx
+from crawl4ai import AsyncWebCrawler, CrawlResult
+from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig
+
+from mcp_servers.http_client import get_http_client
+from mcp_servers.scheduler import get_scheduler
+from crawl_batch import HostRateLimiter
+
+logger = logging.getLogger(__name__)
+
+ACCEPT = "text/html,application/xhtml+xml;q=0.9,*/*;q=0.1"
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# Pages with less text than this are most likely rendered by JavaScript
+MIN_CONTENT_CHARS = 200
+
+# Only the start of a page is searched for these
+JS_CHALLENGE_PATTERN = re.compile(
+    "|".join(
+        [
+            r"<title>\s*just a moment",
+            r"cf-browser-verification",
+            r"challenge-platform",
+            r"_cf_chl_opt",
+            r"enable javascript and cookies to continue",
+            r"please enable js and disable any ad blocker",
+            r"<noscript>[^<]*(?:you need to|please) enable javascript",
+        ]
+    ),
+    re.IGNORECASE,
+)
+JS_CHALLENGE_SEARCH_CHARS = 32 * 1024
+
+# A browserless fetch: the link, its result (or None), why it needs a browser and its seconds
+Fetched = tuple[str, CrawlResult | None, str | None, float]
+
+_processor: AsyncWebCrawler | None = None
+
+
+def processor() -> AsyncWebCrawler:
+    """Returns a crawler that is never started, only used to process fetched HTML.
+
+    This runs crawl4ai's own scraping and markdown pipeline, so pages fetched over HTTP
+    come out exactly like pages crawled with the browser.
+    """
+    global _processor
+
+    if _processor is None:
+        _processor = AsyncWebCrawler(config=BrowserConfig(verbose=False))
+
+    return _processor
+
+
+def process_html(
+    url: str, html: str, config: CrawlerRunConfig, redirected_url: str, status_code: int
+) -> dict:
+    """Runs crawl4ai's scraping and markdown generation on a fetched page.
+
+    Run in a worker process, so the result is returned as dict (``CrawlResult`` can't be
+    pickled), see ``CrawlResult.model_validate``.
+    """
+    result = asyncio.run(
+        processor().aprocess_html(
+            url=url,
+            html=html,
+            extracted_content=None,
+            config=config,
+            screenshot_data=None,
+            pdf_data=None,
+            verbose=False,
+            redirected_url=redirected_url,
+            status_code=status_code,
+        )
+    )
+
+    return result.model_dump()
+
+
+def browser_reason(response: httpx.Response) -> str | None:
+    """Returns why the response can't be used without a browser, None if it can."""
+    if response.status_code != 200:
+        return f"status code {response.status_code}"
+
+    content_type = response.headers.get("content-type", "")
+
+    if not content_type.startswith(HTML_CONTENT_TYPES):
+        return f"content type {content_type or 'unknown'}"
+
+    if JS_CHALLENGE_PATTERN.search(response.text[:JS_CHALLENGE_SEARCH_CHARS]):
+        return "JavaScript challenge"
+
+    return None
+
+
+async def fetch_page(
+    url: str, config: CrawlerRunConfig, timeout: float = 15.0
+) -> tuple[CrawlResult | None, str | None]:
+    """Fetches a page without a browser and processes it like crawl4ai would.
+
+    Args:
+        url (str): The page to fetch.
+        config (CrawlerRunConfig): Settings of the scraping and markdown generation.
+        timeout (float): Seconds after which the request is given up.
+
+    Returns:
+        tuple[CrawlResult | None, str | None]: The crawl result, or None and the reason
+            why the page needs a browser (e.g. a JavaScript challenge or missing content).
+    """
+    try:
+        response = await get_http_client().get(
+            url, headers={"Accept": ACCEPT}, timeout=timeout, retries=0
+        )
+
+    except httpx.HTTPError as e:
+        return None, f"request failed ({e.__class__.__name__})"
+
+    if (reason := browser_reason(response)) is not None:
+        return None, reason
+
+    try:
+        result = CrawlResult.model_validate(
+            await get_scheduler().run_in_process(
+                process_html, url, response.text, config, str(response.url), response.status_code
+            )
+        )
+
+    except Exception as e:
+        return None, f"processing failed ({e})"
+
+    if len(result.markdown.raw_markdown.strip()) < MIN_CONTENT_CHARS:
+        return None, "too little content"
+
+    result.response_headers = dict(response.headers)
+    result.status_code = response.status_code
+
+    return result, None
+
+
+async def fetch_pages(
+    links: list[str],
+    config: CrawlerRunConfig,
+    time_budget: float,
+    max_concurrency: int = 5,
+    per_host_delay: float = 1.0,
+    timeout: float = 15.0,
+    on_result: Callable[[Fetched], Awaitable[None]] | None = None,
+) -> tuple[list[Fetched], list[str]]:
+    """Fetches pages concurrently without a browser (see ``fetch_page``).
+
+    Args:
+        links (list[str]): The pages to fetch.
+        config (CrawlerRunConfig): Settings of the scraping and markdown generation.
+        time_budget (float): Seconds after which the remaining fetches are cancelled.
+        max_concurrency (int): Maximum number of concurrent requests.
+        per_host_delay (float): Minimum seconds between two requests to the same host.
+        timeout (float): Seconds after which a single request is given up.
+        on_result (Callable[[Fetched], Awaitable[None]] | None): Awaited with every fetch
+            as soon as it finished, e.g. to hand pages needing a browser on right away.
+
+    Returns:
+        tuple[list[Fetched], list[str]]: The link, result, reason a browser is needed and
+            seconds spent of every finished fetch in completion order, and the links not
+            finished within the budget.
+    """
+    if not links:
+        return [], []
+
+    rate_limiter = HostRateLimiter(delay=per_host_delay)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(link: str) -> Fetched:
+        await rate_limiter.wait_if_needed(link)
+
+        async with semaphore:
+            started = time.perf_counter()
+            result, reason = await fetch_page(link, config, timeout)
+
+            return link, result, reason, time.perf_counter() - started
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + time_budget
+    pending = {asyncio.create_task(fetch(link)) for link in links}
+    fetched = []
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=deadline - loop.time(), return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                break
+
+            for task in done:
+                fetched.append(task.result())
+
+                if on_result is not None:
+                    await on_result(fetched[-1])
+
+    finally:
+        for task in pending:
+            task.cancel()
+
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    finished = {link for link, *_ in fetched}
+
+    return fetched, [link for link in links if link not in finished]
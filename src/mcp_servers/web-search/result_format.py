@@ -0,0 +1,193 @@
+"""Compact, size-bounded JSON output of the web-search tools."""
+
+import re
+from urllib.parse import urljoin, urlsplit
+
+import pydantic_core
+
+from crawl_cache import normalize_url
+
+# Rough average for English text, good enough to budget the model's context
+CHARS_PER_TOKEN = 4
+
+MAX_LINKS = 40
+MAX_MEDIA = 10
+
+SKIPPED_SCHEMES = ("javascript:", "mailto:", "tel:", "data:", "#")
+
+# Navigation, account and legal pages or share buttons, never worth a deep search
+BOILERPLATE_LINK_PATTERN = re.compile(
+    r"/(?:log-?in|sign-?(?:in|up)|register|account|cart|privacy|imprint|impressum|terms|"
+    r"cookies?|legal|disclaimer|contact|datenschutz|agb)(?:[/?.#]|$)"
+    r"|/(?:share|sharer|intent/tweet)\b",
+    re.IGNORECASE,
+)
+BOILERPLATE_LINK_TEXTS = frozenset(
+    {"", "home", "menu", "skip to content", "skip to main content", "back to top", "more", "next", "previous"}
+)
+BOILERPLATE_MEDIA_PATTERN = re.compile(
+    r"logo|icon|sprite|avatar|spacer|pixel|badge|banner|placeholder|tracking|\.svg(?:\?|$)",
+    re.IGNORECASE,
+)
+
+
+def compact_links(links: dict, limit: int = MAX_LINKS) -> list[dict]:
+    """Deduplicates and ranks the links of a crawl result, dropping boilerplate.
+
+    Links with a descriptive text rank first and external links before internal ones,
+    otherwise the page order is kept.
+
+    Args:
+        links (dict): crawl4ai's links, ``internal`` and ``external`` lists of dicts.
+        limit (int): Maximum number of links returned.
+
+    Returns:
+        list[dict]: The ``url`` and ``text`` of the best links.
+    """
+    seen = set()
+    ranked = []
+
+    for external, kind in ((True, "external"), (False, "internal")):
+        for position, link in enumerate(links.get(kind) or []):
+            url = (link.get("href") or "").strip()
+            text = " ".join((link.get("text") or link.get("title") or "").split())
+
+            if not url or url.lower().startswith(SKIPPED_SCHEMES):
+                continue
+
+            if BOILERPLATE_LINK_PATTERN.search(urlsplit(url).path) or text.lower() in BOILERPLATE_LINK_TEXTS:
+                continue
+
+            key = normalize_url(url)
+
+            if key in seen:
+                continue
+
+            seen.add(key)
+
+            # Short anchor texts ("here", "[1]") say little about the target
+            rank = (len(text.split()) < 3, not external, position)
+            ranked.append((rank, {"url": url, "text": text[:120]}))
+
+    ranked.sort(key=lambda item: item[0])
+
+    return [link for _, link in ranked[:limit]]
+
+
+def compact_media(media: dict, base_url: str, limit: int = MAX_MEDIA) -> list[dict]:
+    """Keeps the most relevant images and videos of a crawl result.
+
+    Logos, icons, tracking pixels and images without a description are dropped.
+
+    Args:
+        media (dict): crawl4ai's media, lists of dicts per media type.
+        base_url (str): URL of the page, to resolve relative sources.
+        limit (int): Maximum number of media returned.
+
+    Returns:
+        list[dict]: The ``type``, ``src`` and ``alt`` text of the best media.
+    """
+    seen = set()
+    ranked = []
+
+    for kind, items in media.items():
+        for item in items or []:
+            src = (item.get("src") or "").strip()
+            alt = " ".join((item.get("alt") or "").split())
+
+            if not src or src.startswith("data:") or BOILERPLATE_MEDIA_PATTERN.search(src):
+                continue
+
+            if kind == "images" and not alt:
+                continue
+
+            src = urljoin(base_url, src)
+
+            if src in seen:
+                continue
+
+            seen.add(src)
+            ranked.append((-(item.get("score") or 0), {"type": kind.rstrip("s"), "src": src, "alt": alt[:120]}))
+
+    ranked.sort(key=lambda item: item[0])
+
+    return [item for _, item in ranked[:limit]]
+
+
+def paginate(text: str, max_tokens: int, cursor: str | None = None) -> tuple[str, str | None]:
+    """Cuts the part of text starting at cursor that fits into the token budget.
+
+    Cuts at a paragraph (or else word) boundary where possible.
+
+    Args:
+        text (str): The full text.
+        max_tokens (int): Token budget of the returned part.
+        cursor (str | None): ``next_cursor`` of the previous part, None for the first.
+
+    Returns:
+        tuple[str, str | None]: The part and the cursor of the next part, None if it was
+            the last.
+
+    Raises:
+        ValueError: If the cursor is invalid.
+    """
+    start = int(cursor) if cursor else 0
+
+    if not 0 <= start <= len(text):
+        raise ValueError(f"Cursor {cursor} is out of range")
+
+    max_chars = max(1, max_tokens) * CHARS_PER_TOKEN
+    end = start + max_chars
+
+    if end >= len(text):
+        return text[start:], None
+
+    # Don't give away more than half the budget for a nicer cut
+    for separator in ("\n\n", "\n", " "):
+        cut = text.rfind(separator, start + max_chars // 2, end)
+
+        if cut != -1:
+            end = cut + len(separator)
+            break
+
+    return text[start:end], str(end)
+
+
+def format_page(
+    page: dict,
+    url: str,
+    max_tokens: int,
+    cursor: str | None = None,
+) -> dict:
+    """Turns a crawled page into the compact output of a tool.
+
+    Links and media are only included with the first part of a page.
+
+    Args:
+        page (dict): The page's ``markdown``, ``links`` and ``media`` (and ``fetch``).
+        url (str): The page's URL.
+        max_tokens (int): Token budget of the markdown.
+        cursor (str | None): Selects the part of the markdown, see ``paginate``.
+
+    Returns:
+        dict: The page's ``url``, the ``markdown`` part, ``links``, ``media`` and the
+            ``next_cursor`` for the following part.
+    """
+    markdown, next_cursor = paginate(page["markdown"] or "", max_tokens, cursor)
+    formatted = {"url": url, "markdown": markdown}
+
+    if not cursor:
+        formatted["links"] = page["links"]
+        formatted["media"] = page["media"]
+
+    if "fetch" in page:
+        formatted["fetch"] = page["fetch"]
+
+    formatted["next_cursor"] = next_cursor
+
+    return formatted
+
+
+def to_json(value) -> str:
+    """Serializes to compact JSON with pydantic's Rust encoder, much faster than ``json``."""
+    return pydantic_core.to_json(value).decode()
@@ -0,0 +1,140 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakeCrawler:
+    """Stands in for AsyncWebCrawler without launching a browser."""
+
+    launched: list["FakeCrawler"] = []
+
+    def __init__(self, config=None):
+        self.ready = False
+        self.closed = False
+        self.crawler_strategy = SimpleNamespace(
+            browser_manager=SimpleNamespace(browser=FakeBrowser())
+        )
+        FakeCrawler.launched.append(self)
+
+    @property
+    def browser(self) -> FakeBrowser:
+        return self.crawler_strategy.browser_manager.browser
+
+    async def start(self):
+        self.ready = True
+
+    async def close(self):
+        self.closed = True
+
+    async def arun(self, url, config=None):
+        await asyncio.sleep(0.01)
+
+        if url == "crash":
+            self.browser.connected = False
+            raise RuntimeError("Target page, context or browser has been closed")
+
+        return url
+
+
+@pytest.fixture(autouse=True)
+def reset_launched():
+    FakeCrawler.launched = []
+
+
+def make_pool(**kwargs) -> BrowserPool:
+    return BrowserPool(crawler_factory=FakeCrawler, health_check_interval=0, **kwargs)
+
+
+async def crawl(pool: BrowserPool, url: str):
+    async with pool.crawler() as crawler:
+        return await crawler.arun(url)
+
+
+def test_browsers_are_launched_once_and_reused():
+    pool = make_pool(size=2)
+
+    async def run():
+        await pool.start()
+        results = await asyncio.gather(*(crawl(pool, f"page-{i}") for i in range(10)))
+        await pool.close()
+        return results
+
+    assert asyncio.run(run()) == [f"page-{i}" for i in range(10)]
+    assert len(FakeCrawler.launched) == 2
+    assert all(crawler.closed for crawler in FakeCrawler.launched)
+    assert pool.stats()["crawls"] == 10
+
+
+def test_concurrency_is_bounded_by_pool_size():
+    pool = make_pool(size=2)
+    in_use = []
+    peak = 0
+
+    async def borrow():
+        nonlocal peak
+
+        async with pool.crawler() as crawler:
+            in_use.append(crawler)
+            peak = max(peak, len(in_use))
+            await asyncio.sleep(0.01)
+            in_use.remove(crawler)
+
+    async def run():
+        await asyncio.gather(*(borrow() for _ in range(6)))
+
+    asyncio.run(run())
+
+    assert peak == 2
+
+
+def test_browsers_are_recycled_after_max_uses():
+    pool = make_pool(size=1, max_uses=3)
+
+    async def run():
+        for i in range(7):
+            await crawl(pool, f"page-{i}")
+
+    asyncio.run(run())
+
+    assert len(FakeCrawler.launched) == 3
+    assert [crawler.closed for crawler in FakeCrawler.launched] == [True, True, False]
+
+
+def test_crashed_browser_is_restarted():
+    pool = make_pool(size=1)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await crawl(pool, "crash")
+
+        return await crawl(pool, "page")
+
+    assert asyncio.run(run()) == "page"
+    assert len(FakeCrawler.launched) == 2
+    assert pool.stats()["crashes"] == 1
+
+
+def test_idle_browsers_are_health_checked():
+    pool = BrowserPool(size=1, crawler_factory=FakeCrawler, health_check_interval=0.01)
+
+    async def run():
+        await pool.start()
+        FakeCrawler.launched[0].browser.connected = False
+        await asyncio.sleep(0.05)
+        await pool.close()
+
+    asyncio.run(run())
+
+    assert len(FakeCrawler.launched) == 2
+    assert FakeCrawler.launched[0].closed
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+from crawl4ai import AsyncWebCrawler, CrawlResult
+from crawl4ai.async_configs import CrawlerRunConfig
+
+from crawl_batch import HostRateLimiter, crawl_within_budget
+
+
+class FakeCrawler(AsyncWebCrawler):
+    """Runs crawl4ai's real arun_many, but with pages that load after a given delay."""
+
+    def __init__(self, delays: dict[str, float]):
+        super().__init__()
+        self.delays = delays
+        self.started_at: dict[str, float] = {}
+        self.cancelled: list[str] = []
+
+    async def arun(self, url, config=None, **kwargs):
+        self.started_at[url] = time.monotonic()
+
+        try:
+            await asyncio.sleep(self.delays[url])
+
+        except asyncio.CancelledError:
+            self.cancelled.append(url)
+            raise
+
+        return CrawlResult(url=url, html="", success=True, status_code=200)
+
+
+def crawl(crawler: FakeCrawler, time_budget: float = 5.0, **kwargs):
+    return asyncio.run(
+        crawl_within_budget(
+            crawler,
+            list(crawler.delays),
+            CrawlerRunConfig(),
+            time_budget=time_budget,
+            **{"per_host_delay": 0.0, **kwargs},
+        )
+    )
+
+
+def test_results_are_returned_in_completion_order():
+    crawler = FakeCrawler({"https://a.test/slow": 0.3, "https://b.test/fast": 0.01})
+
+    results, unfinished = crawl(crawler)
+
+    assert [result.url for result in results] == ["https://b.test/fast", "https://a.test/slow"]
+    assert unfinished == []
+
+
+def test_unfinished_links_are_cancelled_after_the_time_budget():
+    crawler = FakeCrawler({"https://a.test/hangs": 10.0, "https://b.test/fast": 0.01})
+
+    started = time.monotonic()
+    results, unfinished = crawl(crawler, time_budget=0.5)
+
+    assert time.monotonic() - started < 2
+    assert [result.url for result in results] == ["https://b.test/fast"]
+    assert unfinished == ["https://a.test/hangs"]
+    assert crawler.cancelled == ["https://a.test/hangs"]
+
+
+def test_concurrency_is_capped():
+    crawler = FakeCrawler({f"https://{i}.test/": 0.2 for i in range(4)})
+
+    results, _ = crawl(crawler, max_concurrency=2)
+    start_times = sorted(crawler.started_at.values())
+
+    assert len(results) == 4
+    assert start_times[2] - start_times[0] >= 0.15
+
+
+def test_requests_to_the_same_host_are_spaced():
+    limiter = HostRateLimiter(delay=0.1)
+    started_at = []
+
+    async def request(url):
+        await limiter.wait_if_needed(url)
+        started_at.append((url, time.monotonic()))
+
+    async def run():
+        await asyncio.gather(
+            *(request(f"https://same.test/{i}") for i in range(3)),
+            request("https://other.test/"),
+        )
+
+    asyncio.run(run())
+
+    same_host = [at for url, at in started_at if "same" in url]
+    other_host = [at for url, at in started_at if "other" in url]
+
+    assert same_host[2] - same_host[0] >= 0.18
+    assert other_host[0] - same_host[0] < 0.05
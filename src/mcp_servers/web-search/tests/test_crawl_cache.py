@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import crawl_cache
+from crawl_cache import CrawlCache, normalize_url
+from mcp_servers.cache import TTLCache
+from mcp_servers.http_client import HttpClient
+
+PAGE = {"markdown": "# Title\n\n" + "Some text. " * 200, "links": {"internal": []}, "media": {}}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(clock):
+    return CrawlCache(TTLCache(clock=clock), serp_ttl=60, article_ttl=3600, revalidate_for=86400)
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    requests = []
+    responses = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses.pop(0)
+
+    http_client = HttpClient(transport=httpx.MockTransport(handler), retries=0)
+    monkeypatch.setattr(crawl_cache, "get_http_client", lambda: http_client)
+
+    return requests, responses
+
+
+def test_normalize_url():
+    assert (
+        normalize_url("HTTPS://Example.COM:443/a?b=2&utm_source=x&a=1#section")
+        == "https://example.com/a?a=1&b=2"
+    )
+    assert normalize_url("http://example.com") == "http://example.com/"
+    assert normalize_url("http://example.com:8080/?fbclid=1") == "http://example.com:8080/"
+
+
+def test_spellings_of_a_url_share_an_entry(cache):
+    cache.put("https://example.com/article?utm_medium=social", PAGE)
+
+    assert asyncio.run(cache.get("https://EXAMPLE.com/article#comments")) == PAGE
+
+
+def test_pages_are_stored_compressed(cache):
+    cache.put("https://example.com/article", PAGE)
+
+    assert cache.stats()["bytes"] < len(json.dumps(PAGE)) / 5
+
+
+def test_serp_and_article_ttls(cache, clock):
+    cache.put("https://search.example/?q=x", PAGE, kind="serp")
+    cache.put("https://example.com/article", PAGE, kind="article")
+    clock.now += 120
+
+    assert asyncio.run(cache.get("https://search.example/?q=x", kind="serp")) is None
+    assert asyncio.run(cache.get("https://example.com/article", kind="article")) == PAGE
+
+
+def test_expired_page_is_revalidated(cache, clock, upstream):
+    requests, responses = upstream
+    cache.put("https://example.com/article", PAGE, headers={"ETag": '"v1"'})
+    clock.now += 7200
+    responses.append(httpx.Response(304))
+
+    assert asyncio.run(cache.get("https://example.com/article")) == PAGE
+    assert requests[0].headers["If-None-Match"] == '"v1"'
+
+    # Fresh again, so no further request
+    assert asyncio.run(cache.get("https://example.com/article")) == PAGE
+    assert len(requests) == 1
+
+
+def test_modified_page_is_crawled_again(cache, clock, upstream):
+    _, responses = upstream
+    cache.put("https://example.com/article", PAGE, headers={"Last-Modified": "Mon, 01 Jan 2024"})
+    clock.now += 7200
+    responses.append(httpx.Response(200, text="new content"))
+
+    assert asyncio.run(cache.get("https://example.com/article")) is None
+
+
+def test_expired_page_without_validators_is_dropped(cache, clock, upstream):
+    requests, _ = upstream
+    cache.put("https://example.com/article", PAGE)
+    clock.now += 7200
+
+    assert asyncio.run(cache.get("https://example.com/article")) is None
+    assert requests == []
@@ -0,0 +1,66 @@
+import asyncio
+
+from crawl4ai.async_configs import CrawlerRunConfig
+
+from http_fetch import fetch_page, fetch_pages
+
+HTML = {"Content-Type": "text/html; charset=utf-8"}
+
+ARTICLE = (
+    "<html><head><title>Article</title></head><body><header>Navigation</header><article>"
+    "<h1>Static article</h1>"
+    + "<p>Plenty of server rendered text with a <a href='/other'>link</a>.</p>" * 20
+    + "</article></body></html>"
+)
+SPA_SHELL = (
+    "<html><head><title>App</title><script src='/app.js'></script></head>"
+    "<body><div id='root'></div></body></html>"
+)
+CHALLENGE = (
+    "<html><head><title>Just a moment...</title></head><body>"
+    "<noscript>Enable JavaScript and cookies to continue</noscript></body></html>"
+)
+
+
+def fetch(url: str):
+    return asyncio.run(fetch_page(url, CrawlerRunConfig(excluded_tags=["header"])))
+
+
+def test_static_page_is_fetched_without_browser(stub_server):
+    result, reason = fetch(stub_server.route("/article", ARTICLE, headers={**HTML, "ETag": '"v1"'}))
+
+    assert reason is None
+    assert "Static article" in result.markdown.raw_markdown
+    assert "Navigation" not in result.markdown.raw_markdown
+    assert result.links["internal"][0]["href"].endswith("/other")
+    assert result.response_headers["etag"] == '"v1"'
+
+
+def test_pages_needing_javascript_fall_back(stub_server):
+    assert fetch(stub_server.route("/spa", SPA_SHELL, headers=HTML)) == (None, "too little content")
+    assert fetch(stub_server.route("/challenge", CHALLENGE, status=200, headers=HTML)) == (
+        None,
+        "JavaScript challenge",
+    )
+    assert fetch(stub_server.route("/blocked", CHALLENGE, status=403, headers=HTML)) == (
+        None,
+        "status code 403",
+    )
+    assert fetch(stub_server.route("/file", b"%PDF-1.4", headers={"Content-Type": "application/pdf"})) == (
+        None,
+        "content type application/pdf",
+    )
+
+
+def test_pages_are_fetched_in_completion_order_within_budget(stub_server):
+    slow = stub_server.route("/slow", ARTICLE, headers=HTML, delay=0.3)
+    fast = stub_server.route("/fast", ARTICLE, headers=HTML)
+    hangs = stub_server.route("/hangs", ARTICLE, headers=HTML, delay=3)
+
+    fetched, unfinished = asyncio.run(
+        fetch_pages([slow, hangs, fast], CrawlerRunConfig(), time_budget=1, per_host_delay=0)
+    )
+
+    assert [link for link, *_ in fetched] == [fast, slow]
+    assert all(result is not None for _, result, _, _ in fetched)
+    assert unfinished == [hangs]
@@ -0,0 +1,79 @@
+import json
+
+from result_format import compact_links, compact_media, format_page, paginate, to_json
+
+
+def link(href: str, text: str = "") -> dict:
+    return {"href": href, "text": text, "title": "", "base_domain": "", "intrinsic_score": 0.0}
+
+
+def test_compact_links():
+    links = {
+        "internal": [
+            link("https://example.com/login", "Log in"),
+            link("https://example.com/x", "x"),
+            link("https://example.com/guide", "A guide to MCP servers"),
+            link("https://example.com/guide#part-2", "A guide to MCP servers, part 2"),
+        ],
+        "external": [
+            link("https://other.org/article?utm_source=example", "An external article about it"),
+            link("https://other.org/article", "Same article"),
+            link("mailto:someone@example.com", "Mail us"),
+            link("javascript:void(0)", "Menu"),
+        ],
+    }
+
+    assert compact_links(links) == [
+        {"url": "https://other.org/article?utm_source=example", "text": "An external article about it"},
+        {"url": "https://example.com/guide", "text": "A guide to MCP servers"},
+        {"url": "https://example.com/x", "text": "x"},
+    ]
+    assert len(compact_links(links, limit=1)) == 1
+
+
+def test_compact_media():
+    media = {
+        "images": [
+            {"src": "/img/logo.png", "alt": "Company", "score": 5},
+            {"src": "/img/photo.jpg", "alt": "A photo of a cat", "score": 4},
+            {"src": "/img/chart.png", "alt": "Sales chart", "score": 6},
+            {"src": "/img/no-alt.jpg", "alt": "", "score": 6},
+            {"src": "data:image/gif;base64,R0lGOD", "alt": "pixel", "score": 1},
+        ],
+        "videos": [{"src": "https://videos.example/clip.mp4", "alt": "", "score": 3}],
+        "audios": [],
+    }
+
+    assert compact_media(media, "https://example.com/a/page") == [
+        {"type": "image", "src": "https://example.com/img/chart.png", "alt": "Sales chart"},
+        {"type": "image", "src": "https://example.com/img/photo.jpg", "alt": "A photo of a cat"},
+        {"type": "video", "src": "https://videos.example/clip.mp4", "alt": ""},
+    ]
+
+
+def test_paginate_covers_the_text_at_paragraph_boundaries():
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 30 for i in range(20))
+    parts, cursor = [], None
+
+    while True:
+        part, cursor = paginate(text, max_tokens=100, cursor=cursor)
+        parts.append(part)
+
+        if cursor is None:
+            break
+
+    assert "".join(parts) == text
+    assert all(len(part) <= 400 for part in parts)
+    assert all(part.endswith("\n\n") for part in parts[:-1])
+
+
+def test_format_page_and_json():
+    page = {"markdown": "word " * 100, "links": [], "media": [], "fetch": {"path": "http"}}
+
+    first = format_page(page, "https://example.com/", max_tokens=10)
+    second = format_page(page, "https://example.com/", max_tokens=10, cursor=first["next_cursor"])
+
+    assert list(first) == ["url", "markdown", "links", "media", "fetch", "next_cursor"]
+    assert "links" not in second
+    assert json.loads(to_json(first)) == first
+    assert to_json({"a": [1, "ä"]}) == '{"a":[1,"ä"]}'
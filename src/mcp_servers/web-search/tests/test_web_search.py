@@ -0,0 +1,183 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from crawl4ai import AsyncWebCrawler
+
+import web_search
+from browser_pool import BrowserPool
+from crawl_cache import CrawlCache
+from mcp_servers.cache import TTLCache
+
+ARTICLE = (
+    "<html><body><article><h1>Static article</h1>"
+    + "<p>Plenty of server rendered text.</p>" * 20
+    + "</article></body></html>"
+)
+SPA_SHELL = "<html><body><div id='root'></div><script src='/app.js'></script></body></html>"
+
+
+class FakeCrawler(AsyncWebCrawler):
+    """Runs crawl4ai's real arun_many without a browser, returning a static page for every URL."""
+
+    crawled: list[str] = []
+    batches: list[list[str]] = []
+    permits: list[int] = []
+    in_flight = {"now": 0, "max": 0}
+
+    def __init__(self, config=None):
+        super().__init__(config=config)
+        self.ready = False
+        self.crawler_strategy = None
+
+    async def start(self):
+        self.ready = True
+
+    async def close(self):
+        pass
+
+    async def arun_many(self, urls, config=None, dispatcher=None, **kwargs):
+        FakeCrawler.batches.append(list(urls))
+        FakeCrawler.permits.append(dispatcher.max_session_permit)
+        return await super().arun_many(urls, config=config, dispatcher=dispatcher, **kwargs)
+
+    async def arun(self, url, config=None, **kwargs):
+        FakeCrawler.crawled.append(url)
+        FakeCrawler.in_flight["now"] += 1
+        FakeCrawler.in_flight["max"] = max(FakeCrawler.in_flight["max"], FakeCrawler.in_flight["now"])
+        await asyncio.sleep(0.01)
+        FakeCrawler.in_flight["now"] -= 1
+
+        return SimpleNamespace(
+            url=url,
+            success=True,
+            status_code=200,
+            markdown=SimpleNamespace(fit_markdown=f"Content of {url}", raw_markdown=""),
+            links={"internal": [], "external": []},
+            media={"images": []},
+            response_headers={"etag": '"v1"'},
+        )
+
+
+@pytest.fixture(autouse=True)
+def fake_browser(monkeypatch):
+    FakeCrawler.crawled = []
+    FakeCrawler.batches = []
+    FakeCrawler.permits = []
+    FakeCrawler.in_flight = {"now": 0, "max": 0}
+    pool = BrowserPool(size=1, crawler_factory=FakeCrawler, health_check_interval=0)
+    monkeypatch.setattr(web_search, "browser_pool", pool)
+    monkeypatch.setattr(web_search, "crawl_cache", CrawlCache(TTLCache()))
+
+
+def deep_search(*links: str) -> list[dict]:
+    async def run():
+        return [json.loads(await web_search.deep_search(link)) for link in links]
+
+    return asyncio.run(run())
+
+
+def test_static_page_is_fetched_without_browser_and_cached(stub_server):
+    link = stub_server.route("/article", ARTICLE, headers={"Content-Type": "text/html"})
+
+    first, second = deep_search(link, link + "#top")
+
+    assert "# Static article" in first["markdown"]
+    assert first["fetch"]["path"] == "http"
+    assert second["fetch"]["path"] == "cache"
+    assert first["markdown"] == second["markdown"]
+    assert FakeCrawler.crawled == []
+    assert len(stub_server.requests) == 1
+
+
+def test_page_needing_javascript_is_crawled_with_browser(stub_server):
+    link = stub_server.route("/app", SPA_SHELL, headers={"Content-Type": "text/html"})
+
+    (page,) = deep_search(link)
+
+    assert page["markdown"] == f"Content of {link}"
+    assert page["fetch"]["path"] == "browser"
+    assert page["fetch"]["fallback_reason"] == "too little content"
+    assert FakeCrawler.crawled == [link]
+
+
+def test_concurrent_identical_searches_share_a_crawl():
+    async def run():
+        return await asyncio.gather(*(web_search.brave_web_search("mcp servers") for _ in range(3)))
+
+    results = [json.loads(result) for result in asyncio.run(run())]
+
+    assert len({result["markdown"] for result in results}) == 1
+    assert len(FakeCrawler.crawled) == 1
+
+
+def test_long_pages_are_paginated(stub_server):
+    link = stub_server.route("/article", ARTICLE, headers={"Content-Type": "text/html"})
+
+    async def read():
+        parts = [json.loads(await web_search.deep_search(link, max_tokens=30))]
+
+        while parts[-1]["next_cursor"] is not None:
+            parts.append(
+                json.loads(await web_search.deep_search(link, parts[-1]["next_cursor"], max_tokens=30))
+            )
+
+        return parts, await web_search.deep_search(link, cursor="99999")
+
+    parts, invalid = asyncio.run(read())
+
+    assert len(parts) > 2
+    assert "links" in parts[0] and "links" not in parts[1]
+    assert "".join(part["markdown"] for part in parts).count("Plenty of server rendered text.") == 20
+    assert invalid == "Invalid cursor 99999"
+
+
+class ProgressRecorder:
+    """Stands in for the tool's Context, recording the reported progress."""
+
+    def __init__(self):
+        self.progress = []
+
+    async def report_progress(self, progress, total, message=None):
+        self.progress.append((progress, total))
+
+
+def test_fallbacks_are_crawled_without_waiting_for_slow_pages(stub_server):
+    slow = stub_server.route("/slow", ARTICLE, headers={"Content-Type": "text/html"}, delay=1.0)
+    app = stub_server.route("/app", SPA_SHELL, headers={"Content-Type": "text/html"})
+    ctx = ProgressRecorder()
+    # Starts the worker processes, which would otherwise delay noticing the fallback
+    deep_search(stub_server.route("/article", ARTICLE, headers={"Content-Type": "text/html"}))
+
+    pages = json.loads(
+        asyncio.run(web_search.deep_search_many([slow, app], ctx, per_host_delay=0))
+    )
+
+    assert [(page["url"], page["fetch"]["path"]) for page in pages] == [
+        (app, "browser"),
+        (slow, "http"),
+    ]
+    assert pages[0]["fetch"]["seconds"] < 0.5
+    assert FakeCrawler.batches == [[app]]
+    assert ctx.progress == [(1, 2), (2, 2)]
+
+
+def test_max_concurrency_bounds_the_browser_crawls(stub_server):
+    apps = [
+        stub_server.route(f"/app/{number}", SPA_SHELL, headers={"Content-Type": "text/html"})
+        for number in range(5)
+    ]
+
+    pages = json.loads(
+        asyncio.run(
+            web_search.deep_search_many(apps, ProgressRecorder(), max_concurrency=2, per_host_delay=0)
+        )
+    )
+
+    assert sorted(page["url"] for page in pages) == sorted(apps)
+    assert {page["fetch"]["path"] for page in pages} == {"browser"}
+    # Every batch is one arun_many call, with max_concurrency as the dispatcher's session permit
+    assert sorted(url for batch in FakeCrawler.batches for url in batch) == sorted(apps)
+    assert set(FakeCrawler.permits) == {2}
+    assert FakeCrawler.in_flight["max"] == 2
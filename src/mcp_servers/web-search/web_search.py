@@ -1,18 +1,192 @@
 import asyncio
-from crawl4ai import AsyncWebCrawler
-from crawl4ai.async_configs import BrowserConfig, CrawlerRunConfig, CacheMode
-from mcp.server.fastmcp import FastMCP
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING
+from mcp.server.fastmcp import Context, FastMCP
 import json
 import logging
+import time
+from mcp_servers.cache import TTLCache
+from mcp_servers.http_client import http_lifespan
+from mcp_servers.metrics import register_stats
+from mcp_servers.scheduler import get_scheduler
+from mcp_servers.serve import run_server
+from mcp_servers.settings import cache_dir, env_int
+from mcp_servers.singleflight import SingleFlight
+from mcp_servers.tool_registry import install_tool_registry
+from browser_pool import BrowserPool, import_crawl4ai
+from crawl_cache import ARTICLE_TTL, SERP_TTL, CrawlCache, normalize_url
+from result_format import compact_links, compact_media, format_page, to_json
+
+# crawl4ai (and crawl_batch and http_fetch, which build on it) is imported by the tools
+# using it, so that the server answers ``initialize`` without loading it
+if TYPE_CHECKING:
+    from crawl4ai.async_configs import CrawlerRunConfig
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level = logging.INFO)
 
-mcp = FastMCP("web-search")
+browser_pool = BrowserPool(
+    size=env_int("MCP_SERVERS_BROWSER_POOL_SIZE", 2),
+    max_uses=env_int("MCP_SERVERS_BROWSER_MAX_USES", 100),
+)
+
+crawl_cache = CrawlCache(
+    TTLCache(
+        max_bytes=16 * 2**20,
+        directory=cache_dir("web-search", "crawls"),
+        max_disk_bytes=env_int("MCP_SERVERS_CRAWL_CACHE_MB", 256) * 2**20,
+    ),
+    serp_ttl=env_int("MCP_SERVERS_SERP_TTL", SERP_TTL),
+    article_ttl=env_int("MCP_SERVERS_ARTICLE_TTL", ARTICLE_TTL),
+)
+in_flight = SingleFlight()
+
+register_stats("cache", "crawls", crawl_cache.stats)
+register_stats("single_flight", "web-search", in_flight.stats)
+register_stats("browser_pool", "web-search", browser_pool.stats)
+
+# Token budget of the markdown in a single tool result
+MAX_TOKENS = env_int("MCP_SERVERS_WEB_MAX_TOKENS", 4000)
+
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """Launches the browser pool in the background, so the first search finds it warm.
+
+    The server doesn't wait for the browsers to answer ``initialize``, a search started
+    before they are up waits for them instead (see ``BrowserPool.crawler``).
+    """
+    warm_up = asyncio.create_task(browser_pool.start())
+
+    try:
+        async with http_lifespan(server):
+            yield
+
+    finally:
+        warm_up.cancel()
+
+        with suppress(asyncio.CancelledError):
+            await warm_up
+
+        await browser_pool.close()
+
+
+def page_from_result(result) -> dict:
+    """Extracts the parts of a crawl result handed to the model (and cached)."""
+    return {
+        # fit_markdown is only generated if the crawl config sets a content filter
+        'markdown': result.markdown.fit_markdown or result.markdown.raw_markdown,
+        'links': compact_links(result.links or {}),
+        'media': compact_media(result.media or {}, result.url)
+        }
+
+
+async def crawl_page(
+    url: str,
+    kind: str,
+    config: "CrawlerRunConfig | None" = None,
+    browserless: bool = False,
+    ) -> dict | str:
+    """Crawls a single page, answering repeated crawls from ``crawl_cache``.
+
+    Concurrent crawls of the same page share a single visit.
+
+    Args:
+        url (str): The page to crawl.
+        kind (str): ``"serp"`` or ``"article"``, selects the cache TTL.
+        config (CrawlerRunConfig | None): Settings of the crawl.
+        browserless (bool): Try a plain HTTP request first and only fall back to the
+            browser if the page needs JavaScript.
+
+    Returns:
+        dict | str: The page (see ``page_from_result``) and under ``fetch`` how it was
+            fetched (``cache``, ``http`` or ``browser``) in how many seconds, or an error
+            message.
+    """
+    await import_crawl4ai()
+
+    from crawl4ai.async_configs import CrawlerRunConfig
+
+    from http_fetch import fetch_page
+
+    started = time.perf_counter()
+
+    def with_fetch_info(page: dict, path: str, fallback_reason: str | None = None) -> dict:
+        fetch = {'path': path, 'seconds': round(time.perf_counter() - started, 3)}
+
+        if fallback_reason is not None:
+            fetch['fallback_reason'] = fallback_reason
+
+        logger.info(f'Fetched {url} via {path} in {fetch["seconds"]}s')
+
+        return {**page, 'fetch': fetch}
+
+    if (page := await crawl_cache.get(url, kind)) is not None:
+        return with_fetch_info(page, 'cache')
+
+    async def crawl() -> tuple[dict | str, str, str | None]:
+        reason = None
+
+        if browserless:
+            result, reason = await fetch_page(url, config or CrawlerRunConfig())
+
+            if result is not None:
+                page = page_from_result(result)
+                crawl_cache.put(url, page, kind, result.response_headers)
+
+                return page, 'http', None
+
+            logger.info(f'Falling back to the browser for {url}: {reason}')
+
+        async with browser_pool.crawler() as crawler:
+            result = await crawler.arun(url=url, config=config)
+
+        if not result.success:
+            logger.info('ERROR')
+            logger.info(f'{result.error_message}')
+
+            return f'Web scraping failed with error {result.error_message}', 'browser', reason
+
+        page = page_from_result(result)
+        crawl_cache.put(url, page, kind, result.response_headers)
+
+        logger.info('SUCCESS')
+        logger.debug(f'Crawled {len(page["markdown"])} characters of markdown from {url}')
+
+        return page, 'browser', reason
+
+    page, path, fallback_reason = await in_flight.do(normalize_url(url), crawl)
+
+    if isinstance(page, str):
+        return page
+
+    return with_fetch_info(page, path, fallback_reason)
+
+
+def page_to_json(page: dict | str, url: str, max_tokens: int, cursor: str | None) -> str:
+    """Serializes a crawled page (see ``format_page``), passing error messages through."""
+    if isinstance(page, str):
+        return page
+
+    try:
+        return to_json(format_page(page, url, max_tokens, cursor))
+
+    except ValueError:
+        return f'Invalid cursor {cursor}'
+
+
+mcp = FastMCP("web-search", lifespan=lifespan)
+install_tool_registry(mcp)
+
+# Every call fans out to many pages, two at a time leave room for the single page tools
+get_scheduler().limit("Deep Search Many", 2)
 
 @mcp.tool(name = "Web Search")
 async def brave_web_search(
-    search_term: str
+    search_term: str,
+    cursor: str | None = None,
+    max_tokens: int = MAX_TOKENS,
     ) -> str:
     """Tool to search the brave web search and scrape it's results. 
     This can be used whenever there is not sufficient information on the topic or no
@@ -22,12 +196,19 @@ async def brave_web_search(
 
     Args:
         search_term (str): A search query to send to the Brave search engine.
+        cursor (str | None): The next_cursor of a previous result, to continue reading it.
+        max_tokens (int): Maximum length of the returned markdown in tokens.
 
     Returns:
-        dict: A dictionary of the cleaned, scraped webpage as markdown, 
-              including external links and media sources to deep search if necessary.
+        str: JSON of the cleaned, scraped webpage as markdown, including the most relevant
+             links and media sources to deep search if necessary, and a next_cursor if
+             there is more markdown.
     """
-    
+
+    await import_crawl4ai()
+
+    from crawl4ai.async_configs import CrawlerRunConfig
+
     search_term_parsed: str = search_term.replace(" ", "+")
     
     crawl_config = CrawlerRunConfig(
@@ -36,50 +217,38 @@ async def brave_web_search(
         exclude_external_links=False,
         process_iframes=True,
         remove_overlay_elements=True,
-        # cache_mode=CacheMode.ENABLED
     )
     
-    async with AsyncWebCrawler() as crawler:
-        result = await crawler.arun(
-            
-            # TODO: Find way to circumvent new bot detection on brave SE
-            url = f"https://search.brave.com/search?q={search_term_parsed}",
-            # url=f"https://duckduckgo.com/?q={search_term_parsed}",
-            config=crawl_config
-        )
-        
-        if result.success:
-        
-            crawl_dict = {
-                'markdown':result.markdown.fit_markdown, 
-                'links': result.links,
-                'media': result.media
-                }
-            
-            logger.info('SUCCESS')
-            logger.info(f'{crawl_dict}')
-            
-            return str(crawl_dict)
-        
-        else:
-            
-            logger.info('ERROR')
-            logger.info(f'{result.error_message}')
-            
-            return f'Web scraping failed with error {result.error_message}'
+    # TODO: Find way to circumvent new bot detection on brave SE
+    url = f"https://search.brave.com/search?q={search_term_parsed}"
+    # url = f"https://duckduckgo.com/?q={search_term_parsed}"
+
+    page = await crawl_page(url, kind='serp', config=crawl_config)
+
+    return page_to_json(page, url, max_tokens, cursor)
 
 
 @mcp.tool(name = "Deep Search")
-async def deep_search(link: str) -> str:
+async def deep_search(
+    link: str,
+    cursor: str | None = None,
+    max_tokens: int = MAX_TOKENS,
+    ) -> str:
     """Tool to further search links found in the initial search engine search.
     This is useful whenever the initial search did not provide enough information.
 
     Args:
         link (str): Link from the initial search engine results.
+        cursor (str | None): The next_cursor of a previous result, to continue reading it.
+        max_tokens (int): Maximum length of the returned markdown in tokens.
 
     Returns:
-        str: The accessed webpage.
+        str: JSON of the accessed webpage, how it was fetched and a next_cursor if there
+             is more markdown.
     """
+    await import_crawl4ai()
+
+    from crawl4ai.async_configs import CrawlerRunConfig
     
     crawl_config = CrawlerRunConfig(
         excluded_tags=['form', 'header'],
@@ -88,34 +257,210 @@ async def deep_search(link: str) -> str:
         remove_overlay_elements=True,
     )
 
-    async with AsyncWebCrawler() as crawler:
-        result = await crawler.arun(
-            url=link,
-            # config=crawl_config
-        )
-        
+    page = await crawl_page(
+        link,
+        kind='article',
+        # config=crawl_config
+        browserless=True,
+    )
+
+    return page_to_json(page, link, max_tokens, cursor)
+
+
+@mcp.tool(name = "Deep Search Many")
+async def deep_search_many(
+    links: list[str],
+    ctx: Context,
+    max_concurrency: int = 5,
+    per_host_delay: float = 1.0,
+    page_timeout: float = 30.0,
+    time_budget: float = 60.0,
+    max_tokens: int = 2 * MAX_TOKENS,
+    ) -> str:
+    """Tool to search several links found in the initial search engine search at once.
+    Prefer this over calling the deep_search tool once per link. The pages are loaded
+    concurrently and returned in the order they finished, so slow pages don't hold up
+    fast ones. Static pages are fetched without a browser, the others share one browser.
+
+    Args:
+        links (list[str]): Links from the initial search engine results.
+        max_concurrency (int): Maximum number of pages loaded at the same time.
+        per_host_delay (float): Minimum seconds between two requests to the same website.
+        page_timeout (float): Seconds after which loading a single page is given up.
+        time_budget (float): Seconds after which all unfinished pages are given up.
+        max_tokens (int): Maximum length of the returned markdown in tokens, split evenly
+            between the pages. Use the deep_search tool with a page's next_cursor to read on.
+
+    Returns:
+        str: JSON of the accessed webpages and how each was fetched, or the error for each
+             page that could not be accessed.
+    """
+    await import_crawl4ai()
+
+    from crawl4ai.async_configs import CrawlerRunConfig
+
+    from crawl_batch import crawl_within_budget
+    from http_fetch import Fetched, fetch_pages
+
+    # Preserves the order, so unfinished links are reported as given
+    links = list(dict.fromkeys(links))
+
+    if not links:
+        return 'No links given'
+
+    crawl_config = CrawlerRunConfig(
+        excluded_tags=['form', 'header'],
+        exclude_external_links=False,
+        process_iframes=True,
+        remove_overlay_elements=True,
+        page_timeout=int(page_timeout * 1000),
+    )
+
+    started = time.perf_counter()
+    crawl_dicts = []
+    cached = await asyncio.gather(*(crawl_cache.get(link, 'article') for link in links))
+
+    for link, page in zip(links, cached):
+        if page is not None:
+            crawl_dicts.append({
+                'url': link,
+                **page,
+                'fetch': {'path': 'cache', 'seconds': round(time.perf_counter() - started, 3)}
+                })
+
+    misses = [link for link, page in zip(links, cached) if page is None]
+    finished = len(crawl_dicts)
+    fallback_reasons: dict[str, str] = {}
+    queued: list[str] = []
+    browser_runs: list[asyncio.Task] = []
+    crawling = False
+    via = {'http': 0, 'browser': 0}
+
+    async def report_progress(link: str) -> None:
+        nonlocal finished
+        finished += 1
+        await ctx.report_progress(finished, len(links), f'Finished {link}')
+
+    async def on_crawled(result) -> None:
         if result.success:
-        
-            crawl_dict = {
-                'markdown':result.markdown.fit_markdown, 
-                'links': result.links,
-                'media': result.media
-                }
-            
-            logger.info('SUCCESS')
-            logger.info(f'{crawl_dict}')
-            
-            return str(crawl_dict)
-        
+            page = page_from_result(result)
+            crawl_cache.put(result.url, page, 'article', result.response_headers)
+            via['browser'] += 1
+            crawl_dicts.append({
+                'url': result.url,
+                **page,
+                'fetch': {
+                    'path': 'browser',
+                    'seconds': round(result.dispatch_result.end_time - result.dispatch_result.start_time, 3),
+                    'fallback_reason': fallback_reasons[result.url],
+                    }
+                })
         else:
-            
-            logger.info('ERROR')
-            logger.info(f'{result.error_message}')
-            
-            return f'Web scraping failed with error {result.error_message}'
+            crawl_dicts.append({
+                'url': result.url,
+                'error': f'Web scraping failed with error {result.error_message}'
+                })
+
+        await report_progress(result.url)
+
+    async def crawl_fallbacks() -> None:
+        nonlocal crawling
+        batch = []
+
+        try:
+            async with browser_pool.crawler() as crawler:
+                while queued:
+                    batch = queued.copy()
+                    queued.clear()
+                    await crawl_within_budget(
+                        crawler,
+                        batch,
+                        crawl_config,
+                        time_budget=max(0.0, time_budget - (time.perf_counter() - started)),
+                        on_result=on_crawled,
+                        max_concurrency=max_concurrency,
+                        per_host_delay=per_host_delay,
+                    )
+
+        # A broken browser fails the pages of its batch, not the whole tool call
+        except Exception as e:
+            crawled = {page['url'] for page in crawl_dicts}
+
+            for link in batch + queued:
+                if link not in crawled:
+                    crawl_dicts.append({'url': link, 'error': f'Web scraping failed with error {e}'})
+                    await report_progress(link)
+
+            queued.clear()
+
+        finally:
+            crawling = False
+
+    async def on_fetched(fetched: Fetched) -> None:
+        nonlocal crawling
+        link, result, reason, seconds = fetched
+
+        # Pages needing the browser are crawled right away, not after the slowest static page.
+        # Those found while a batch is loading are crawled together once it is done.
+        if result is None:
+            logger.info(f'Falling back to the browser for {link}: {reason}')
+            fallback_reasons[link] = reason
+            queued.append(link)
+
+            if not crawling:
+                crawling = True
+                browser_runs.append(asyncio.create_task(crawl_fallbacks()))
+
+            return
+
+        page = page_from_result(result)
+        crawl_cache.put(link, page, 'article', result.response_headers)
+        via['http'] += 1
+        crawl_dicts.append({'url': link, **page, 'fetch': {'path': 'http', 'seconds': round(seconds, 3)}})
+        await report_progress(link)
+
+    _, unfinished = await fetch_pages(
+        misses,
+        crawl_config,
+        time_budget=time_budget,
+        max_concurrency=max_concurrency,
+        per_host_delay=per_host_delay,
+        timeout=page_timeout,
+        on_result=on_fetched,
+    )
+
+    if browser_runs:
+        remaining_budget = max(0.0, time_budget - (time.perf_counter() - started))
+        _, not_done = await asyncio.wait(browser_runs, timeout=remaining_budget)
+
+        for task in not_done:
+            task.cancel()
+
+        await asyncio.gather(*browser_runs, return_exceptions=True)
+        crawled = {page['url'] for page in crawl_dicts}
+        unfinished += [link for link in fallback_reasons if link not in crawled]
+
+    for link in unfinished:
+        crawl_dicts.append({
+            'url': link,
+            'error': f'Not finished within the time budget of {time_budget} seconds'
+            })
+
+    logger.info(
+        f'Deep searched {len(links)} links in {time.perf_counter() - started:.2f}s: '
+        f'{len(links) - len(misses)} from cache, {via["http"]} via http, '
+        f'{via["browser"]} via browser, {len(unfinished)} unfinished'
+    )
+
+    page_tokens = max(1, max_tokens // len(links))
+
+    return to_json([
+        format_page(page, page['url'], page_tokens) if 'markdown' in page else page
+        for page in crawl_dicts
+        ])
 
 
 if __name__ == "__main__":
     # TODO: move testing to tests
     # asyncio.run(brave_web_search("Daniel Noboa"))
-    mcp.run(transport='stdio')
+    run_server(mcp, 'web-search')
@@ -0,0 +1,209 @@
+"""Local full-text index of Wikipedia abstracts, for lookups without the network.
+
+The index is built from a Wikipedia abstracts dump (e.g.
+https://dumps.wikimedia.org/enwiki/latest/enwiki-latest-abstract.xml.gz):
+
+    uv run abstracts_index.py path/to/enwiki-latest-abstract.xml.gz [--index path/to/abstracts.sqlite]
+"""
+
+import argparse
+import bz2
+import gzip
+import logging
+import os
+import sqlite3
+import xml.etree.ElementTree as ElementTree
+from collections.abc import Iterator
+from pathlib import Path
+
+from mcp_servers.settings import cache_dir
+
+logger = logging.getLogger(__name__)
+
+TITLE_PREFIX = 'Wikipedia: '
+
+SCHEMA = '''
+CREATE TABLE abstracts (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    url TEXT,
+    abstract TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE abstracts_fts USING fts5(
+    title, abstract, content='abstracts', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+);
+'''
+
+
+def default_index_path() -> Path:
+    return cache_dir('wikipedia') / 'abstracts.sqlite'
+
+
+def open_dump(path: Path):
+    """Opens a dump for reading, decompressing .gz and .bz2 files on the fly."""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rb')
+
+    if path.suffix == '.bz2':
+        return bz2.open(path, 'rb')
+
+    return open(path, 'rb')
+
+
+def iter_abstracts(path: Path) -> Iterator[tuple[str, str, str]]:
+    """
+    Streams the (title, url, abstract) of every article in an abstracts dump.
+
+    Parsed elements are discarded right away, so memory use doesn't grow with the dump.
+    """
+    with open_dump(path) as dump:
+        events = ElementTree.iterparse(dump, events=('start', 'end'))
+        _, root = next(events)
+
+        for event, element in events:
+            if event != 'end' or element.tag != 'doc':
+                continue
+
+            title = (element.findtext('title') or '').removeprefix(TITLE_PREFIX).strip()
+            abstract = ' '.join((element.findtext('abstract') or '').split())
+
+            if title and abstract:
+                yield title, element.findtext('url') or '', abstract
+
+            root.clear()
+
+
+def build_index(dump_path: Path, index_path: Path, batch_size: int = 10_000) -> int:
+    """
+    Builds the index from a dump, replacing an existing index only once the new one is complete.
+
+    Args:
+        dump_path (Path): The abstracts dump, optionally compressed.
+        index_path (Path): Where the SQLite database is written to.
+        batch_size (int): Articles inserted per transaction.
+
+    Returns:
+        int: The number of indexed articles.
+    """
+    tmp_path = index_path.with_suffix('.tmp')
+    tmp_path.unlink(missing_ok=True)
+
+    connection = sqlite3.connect(tmp_path)
+
+    try:
+        connection.executescript(SCHEMA)
+        batch = []
+        count = 0
+
+        for abstract in iter_abstracts(dump_path):
+            batch.append(abstract)
+
+            if len(batch) >= batch_size:
+                count += _insert(connection, batch)
+                batch = []
+                logger.info(f'Imported {count} abstracts')
+
+        count += _insert(connection, batch)
+
+        # Building the full-text index in one go is much faster than row by row
+        connection.execute("INSERT INTO abstracts_fts(abstracts_fts) VALUES ('rebuild')")
+        connection.execute("INSERT INTO abstracts_fts(abstracts_fts) VALUES ('optimize')")
+        connection.commit()
+
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, index_path)
+
+    return count
+
+
+def _insert(connection: sqlite3.Connection, batch: list[tuple[str, str, str]]) -> int:
+    with connection:
+        before = connection.total_changes
+        connection.executemany(
+            'INSERT OR IGNORE INTO abstracts (title, url, abstract) VALUES (?, ?, ?)', batch
+        )
+
+        return connection.total_changes - before
+
+
+def truncate(text: str, max_chars: int) -> str:
+    """Cuts text to max_chars at a word boundary, the way TextExtracts' exchars does."""
+    if len(text) <= max_chars:
+        return text
+
+    cut = text.rfind(' ', 0, max_chars)
+
+    return text[:cut if cut > 0 else max_chars].rstrip(' ,;:') + '...'
+
+
+class AbstractIndex:
+    """Read-only access to an index built with ``build_index``."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._connection = sqlite3.connect(
+            f'file:{path}?mode=ro', uri=True, check_same_thread=False
+        )
+
+    @classmethod
+    def open(cls, path: Path | None) -> 'AbstractIndex | None':
+        """Opens the index at path, or returns None if there is none."""
+        if path is None or not path.is_file():
+            return None
+
+        return cls(path)
+
+    def lookup(self, title: str) -> dict | None:
+        """Returns the article with exactly this (normalized) title, None if it isn't indexed."""
+        row = self._connection.execute(
+            'SELECT id, title, abstract FROM abstracts WHERE title = ?', (title,)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        return {'id': row[0], 'title': row[1], 'extract': row[2]}
+
+    def search(self, query: str, limit: int = 3, max_chars: int = 1200) -> list[dict]:
+        """
+        Finds the articles best matching all words of query, title matches ranked first.
+
+        Returns:
+            list[dict]: The ``title`` and ``extract`` (cut to max_chars) of at most limit articles.
+        """
+        words = query.split()
+
+        if not words:
+            return []
+
+        # Quoting makes every word a plain term instead of FTS5 query syntax
+        match = ' '.join('"' + word.replace('"', '""') + '"' for word in words)
+
+        rows = self._connection.execute(
+            'SELECT a.title, a.abstract FROM abstracts_fts f JOIN abstracts a ON a.id = f.rowid '
+            'WHERE abstracts_fts MATCH ? ORDER BY bm25(abstracts_fts, 10.0, 1.0) LIMIT ?',
+            (match, limit),
+        ).fetchall()
+
+        return [{'title': title, 'extract': truncate(abstract, max_chars)} for title, abstract in rows]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Builds the local Wikipedia abstracts index.')
+    parser.add_argument('dump', type=Path, help='Wikipedia abstracts dump (.xml, .xml.gz or .xml.bz2)')
+    parser.add_argument('--index', type=Path, default=None, help='Path of the index to write')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    index_path = args.index or default_index_path()
+    count = build_index(args.dump, index_path)
+    logger.info(f'Indexed {count} abstracts in {index_path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,94 @@
+import asyncio
 from mcp.server.fastmcp import FastMCP
-import requests
+import httpx
 import json
 import logging
+import os
+from pathlib import Path
+from typing import Literal
+from mcp_servers.http_client import get_http_client, http_lifespan
+from mcp_servers.metrics import log_payload, register_stats
+from mcp_servers.scheduler import get_scheduler
+from mcp_servers.serve import run_server
+from mcp_servers.singleflight import SingleFlight
+from mcp_servers.tool_registry import install_tool_registry
+from abstracts_index import AbstractIndex
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level = logging.INFO)
 
+WIKIPEDIA_API_URL = os.environ.get('MCP_SERVERS_WIKIPEDIA_API_URL', 'https://en.wikipedia.org/w/api.php')
+
+# Upper bound of the MediaWiki API for titles per request (for clients without apihighlimits)
+MAX_TITLES_PER_REQUEST = 50
+
+# TextExtracts returns at most 20 intro extracts and 1200 characters per extract
+MAX_SEARCH_RESULTS = 20
+MAX_EXTRACT_CHARS = 1200
+
+mcp = FastMCP('wikipedia-search', lifespan=http_lifespan)
+install_tool_registry(mcp)
+
+# Concurrent lookups of the same article share one upstream request
+in_flight = SingleFlight()
+register_stats('single_flight', 'wikipedia', in_flight.stats)
+
+# Optional local index of the Wikipedia abstracts, answering lookups without the network
+abstract_index = AbstractIndex.open(
+    Path(os.environ['MCP_SERVERS_WIKIPEDIA_INDEX']) if os.environ.get('MCP_SERVERS_WIKIPEDIA_INDEX') else None
+)
+
+
+def normalize_subject(subject: str) -> str:
+    """
+    Normalizes a subject the way MediaWiki normalizes titles (collapsed whitespace and
+    underscores, upper case first letter), so that equivalent lookups can be coalesced.
+    """
+    subject = ' '.join(subject.replace('_', ' ').split())
+
+    return subject[:1].upper() + subject[1:]
 
-mcp = FastMCP('wikipedia-search')
 
 @mcp.tool()
-def search_wikipedia(subject: str) -> str:
+async def search_wikipedia(
+    subject: str,
+    mode: Literal['title', 'search'] = 'title',
+    limit: int = 3,
+    max_chars: int = MAX_EXTRACT_CHARS,
+    ) -> str:
     """
     Tool to query the wikipedia API to search for articles (subject) related to a given query. 
     The subject query must be provided as input and must be short and consise. It should not be a full sentence.
     The tool should return the extract of the article(s) found in the search as a parsable JSON object.
+
+    The default "title" mode looks up the article with exactly this title and returns the MediaWiki query
+    response. In the "search" mode, the subject doesn't need to be the exact article title: the best matching
+    articles (at most limit, each extract cut to max_chars characters) are returned as {"query", "results"}.
     
     You will need to tidy the information before passing it to the user.
     """
-    
-    url = 'https://en.wikipedia.org/w/api.php'
+
+    if mode == 'search':
+        return await search_extracts(subject, limit, max_chars)
+
+    url = WIKIPEDIA_API_URL
+    subject = normalize_subject(subject)
+
+    if abstract_index is not None and (
+        article := await get_scheduler().run_in_thread(abstract_index.lookup, subject)
+    ) is not None:
+        logging.info(f"Found {subject} in the local abstracts index")
+
+        # The shape of the API response. Abstracts dumps have no page ids, so the page is keyed
+        # like the pages MediaWiki makes up itself, not by the rowid of the index.
+        return json.dumps({
+            'batchcomplete': '',
+            'query': {
+                'pages': {
+                    '-1': {'pageid': None, 'ns': 0, 'title': article['title'], 'extract': article['extract']}
+                }
+            }
+        })
 
     headers = {
         'User-Agent': 'MCPPythonBot-personal-use'
@@ -34,21 +103,227 @@ def search_wikipedia(subject: str) -> str:
             'explaintext': True,
         }
 
-    logging.info(f"Parameters: {json.dumps(params)}")
-    logging.info(f"URL: {url}")
-    logging.info(f"Headers: {json.dumps(headers)}")
+    log_payload(logger, f"Request to {url}", lambda: json.dumps({'params': params, 'headers': headers}))
     logging.info(f"Searching Wikipedia for subject: {subject}")
     
-    response = requests.get(
-        url, 
-        params = params, 
-        headers = headers
-        )
-
-    return response.text
- 
+    async def fetch() -> str:
+        response = await get_http_client().get(
+            url, 
+            params = params, 
+            headers = headers
+            )
+
+        return response.text
+
+    return await in_flight.do((url, subject), fetch)
+
+
+async def search_extracts(query: str, limit: int = 3, max_chars: int = MAX_EXTRACT_CHARS) -> str:
+    """
+    Finds the articles best matching a query and fetches their intro extracts in one API query,
+    using the search results as generator for the extracts.
+
+    Args:
+        query (str): The search terms.
+        limit (int): Maximum number of articles, capped at MAX_SEARCH_RESULTS.
+        max_chars (int): Maximum length of each extract, capped at MAX_EXTRACT_CHARS.
+
+    Returns:
+        str: JSON with the ``query`` and its ``results`` (``title``, ``pageid`` and ``extract``)
+             ranked by relevance, or an error message.
+    """
+    query = ' '.join(query.split())
+    limit = min(max(1, limit), MAX_SEARCH_RESULTS)
+    max_chars = min(max(1, max_chars), MAX_EXTRACT_CHARS)
+
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'formatversion': 2,
+        'generator': 'search',
+        'gsrsearch': query,
+        'gsrlimit': limit,
+        'gsrnamespace': 0,
+        'prop': 'extracts',
+        'exintro': True,
+        'explaintext': True,
+        'exlimit': limit,
+        'exchars': max_chars,
+        'redirects': True,
+    }
+
+    if abstract_index is not None and (
+        results := await get_scheduler().run_in_thread(abstract_index.search, query, limit, max_chars)
+    ):
+        logging.info(f"Found {query} in the local abstracts index")
+
+        return json.dumps({
+            'query': query,
+            'results': [{'title': result['title'], 'pageid': None, 'extract': result['extract']} for result in results],
+        })
+
+    logging.info(f"Searching Wikipedia for: {query}")
+
+    async def fetch() -> str:
+        try:
+            response = await get_http_client().get(
+                WIKIPEDIA_API_URL,
+                params = params,
+                headers = {'User-Agent': 'MCPPythonBot-personal-use'},
+                )
+
+        except httpx.HTTPError as e:
+            return f'Wikipedia search failed: {e.__class__.__name__}'
+
+        if response.status_code != 200:
+            return f'Wikipedia search failed with status code {response.status_code}'
+
+        data = response.json()
+
+        if 'error' in data:
+            return f"Wikipedia search failed: {data['error'].get('info', 'unknown error')}"
+
+        pages = sorted(data.get('query', {}).get('pages', []), key=lambda page: page.get('index', 0))
+        results = [
+            {
+                'title': page['title'],
+                'pageid': page['pageid'],
+                'extract': page.get('extract', '').strip(),
+            }
+            for page in pages
+        ]
+
+        return json.dumps({'query': query, 'results': results})
+
+    return await in_flight.do((WIKIPEDIA_API_URL, 'search', query, limit, max_chars), fetch)
+
+
+async def query_extracts(titles: list[str]) -> dict:
+    """
+    Fetches the intro extracts of up to MAX_TITLES_PER_REQUEST articles in one API query.
+
+    Redirects and title normalization are resolved by the API in the same request. The
+    API returns at most 20 intro extracts per response, the rest is fetched by following
+    its continuation.
+
+    Args:
+        titles (list[str]): The (normalized) titles to look up.
+
+    Returns:
+        dict: The ``pages`` by title and the ``normalized`` and ``redirects`` title
+              mappings, or an ``error`` message.
+    """
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'formatversion': 2,
+        'titles': '|'.join(titles),
+        'prop': 'extracts',
+        'exintro': True,
+        'explaintext': True,
+        'exlimit': 'max',
+        'redirects': True,
+    }
+
+    pages, normalized, redirects = {}, {}, {}
+    continuation = {}
+
+    while True:
+        try:
+            response = await get_http_client().get(
+                WIKIPEDIA_API_URL,
+                params = {**params, **continuation},
+                headers = {'User-Agent': 'MCPPythonBot-personal-use'},
+                )
+
+        except httpx.HTTPError as e:
+            return {'error': f'Wikipedia API request failed: {e.__class__.__name__}'}
+
+        if response.status_code != 200:
+            return {'error': f'Wikipedia API responded with status code {response.status_code}'}
+
+        data = response.json()
+
+        if 'error' in data:
+            return {'error': data['error'].get('info', 'Unknown Wikipedia API error')}
+
+        query = data.get('query', {})
+        normalized.update((item['from'], item['to']) for item in query.get('normalized', []))
+        redirects.update((item['from'], item['to']) for item in query.get('redirects', []))
+
+        for page in query.get('pages', []):
+            # Continued responses repeat all pages, but only carry the next extracts
+            known = pages.setdefault(page['title'], page)
+
+            if 'extract' in page:
+                known['extract'] = page['extract']
+
+        if 'continue' not in data:
+            break
+
+        continuation = data['continue']
+
+    return {'pages': pages, 'normalized': normalized, 'redirects': redirects}
+
+
+def resolve_subject(subject: str, result: dict) -> dict:
+    """Picks the article of a subject out of a ``query_extracts`` result."""
+    if 'error' in result:
+        return {'subject': subject, 'error': result['error']}
+
+    title = normalize_subject(subject)
+    title = result['normalized'].get(title, title)
+    redirected_from = None
+
+    if title in result['redirects']:
+        redirected_from, title = title, result['redirects'][title]
+
+    page = result['pages'].get(title, {'title': title, 'missing': True})
+    resolved = {'subject': subject, 'title': page['title']}
+
+    if redirected_from is not None:
+        resolved['redirected_from'] = redirected_from
+
+    if page.get('missing') or page.get('invalid'):
+        resolved['missing'] = True
+    else:
+        resolved['pageid'] = page['pageid']
+        resolved['extract'] = page.get('extract', '')
+
+    return resolved
+
+
+@mcp.tool()
+async def search_wikipedia_many(subjects: list[str]) -> str:
+    """
+    Tool to look up many wikipedia articles (subjects) at once, e.g. all entities mentioned in a text.
+    Prefer this over calling search_wikipedia once per subject. Each subject must be short and consise,
+    ideally the exact article title. Redirects (e.g. abbreviations) are followed.
+    The tool returns a JSON list with the extract of the article found for each subject,
+    or "missing": true if there is no article with that title.
+    """
+    titles = list(dict.fromkeys(normalize_subject(subject) for subject in subjects))
+    chunks = [
+        titles[start:start + MAX_TITLES_PER_REQUEST]
+        for start in range(0, len(titles), MAX_TITLES_PER_REQUEST)
+    ]
+
+    logging.info(f"Looking up {len(titles)} Wikipedia articles in {len(chunks)} requests")
+
+    results = await asyncio.gather(*(query_extracts(chunk) for chunk in chunks))
+    result_by_title = {
+        title: result
+        for chunk, result in zip(chunks, results)
+        for title in chunk
+    }
+
+    return json.dumps(
+        [resolve_subject(subject, result_by_title[normalize_subject(subject)]) for subject in subjects]
+    )
+
+
 def main():
-    mcp.run(transport='stdio')
+    run_server(mcp, 'wikipedia')
 
 if __name__ ==  "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The server is started as a script from its own directory (`uv run search.py`),
+# so its modules import each other by their plain module names.
+sys.path.insert(0, str(Path(__file__).parents[1]))
@@ -0,0 +1,97 @@
+import asyncio
+import gzip
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+import search
+from abstracts_index import AbstractIndex, build_index, iter_abstracts, truncate
+
+FIXTURE_DUMP = Path(__file__).parent / "fixtures" / "abstracts.xml"
+
+
+@pytest.fixture
+def index(tmp_path) -> AbstractIndex:
+    dump = tmp_path / "abstracts.xml.gz"
+
+    with open(FIXTURE_DUMP, "rb") as source, gzip.open(dump, "wb") as target:
+        shutil.copyfileobj(source, target)
+
+    assert build_index(dump, tmp_path / "abstracts.sqlite", batch_size=2) == 4
+
+    return AbstractIndex(tmp_path / "abstracts.sqlite")
+
+
+def test_iter_abstracts_skips_empty_abstracts():
+    titles = [title for title, _, _ in iter_abstracts(FIXTURE_DUMP)]
+
+    assert titles == [
+        "Python (programming language)",
+        "Pythonidae",
+        "Monty Python",
+        "München",
+        "Pythonidae",
+    ]
+
+
+def test_lookup(index):
+    assert index.lookup("Pythonidae")["extract"].startswith("The Pythonidae, commonly known")
+    assert index.lookup("Python") is None
+
+
+def test_search_ranks_title_matches_first(index):
+    # Only the abstract of Pythonidae mentions "pythons"
+    assert [result["title"] for result in index.search("python")] == [
+        "Monty Python",
+        "Python (programming language)",
+        "Pythonidae",
+    ]
+    assert [result["title"] for result in index.search("python programing")] == ["Python (programming language)"]
+    assert [result["title"] for result in index.search("munchen")] == ["München"]
+    assert index.search('"unbalanced quote') == []
+
+
+def test_truncate():
+    assert truncate("short", 10) == "short"
+    assert truncate("Python is a high-level, general-purpose language.", 25) == "Python is a high-level..."
+
+
+def test_tool_answers_from_index_with_remote_fallback(monkeypatch, index, stub_server):
+    monkeypatch.setattr(search, "abstract_index", index)
+    monkeypatch.setattr(
+        search, "WIKIPEDIA_API_URL", stub_server.route("/w/api.php", {"batchcomplete": True})
+    )
+
+    async def run():
+        return (
+            await search.search_wikipedia("python language", mode="search", limit=3),
+            await search.search_wikipedia("pythonidae"),
+            await search.search_wikipedia("not indexed", mode="search"),
+        )
+
+    found, by_title, not_found = (json.loads(result) for result in asyncio.run(run()))
+
+    assert found["results"][0]["title"] == "Python (programming language)"
+    assert set(found["results"][0]) == {"title", "pageid", "extract"}
+    (page,) = by_title["query"]["pages"].values()
+    assert page["title"] == "Pythonidae"
+    assert not_found == {"query": "not indexed", "results": []}
+    assert len(stub_server.requests) == 1
+
+
+def test_title_lookup_from_index_has_the_api_shape_without_page_ids(monkeypatch, index):
+    monkeypatch.setattr(search, "abstract_index", index)
+
+    result = json.loads(asyncio.run(search.search_wikipedia("pythonidae", mode="title")))
+
+    assert result["batchcomplete"] == ""
+    # Not keyed by the rowid of the index, which could be taken for another article's page id
+    assert list(result["query"]["pages"]) == ["-1"]
+    assert result["query"]["pages"]["-1"] == {
+        "pageid": None,
+        "ns": 0,
+        "title": "Pythonidae",
+        "extract": index.lookup("Pythonidae")["extract"],
+    }
@@ -0,0 +1,207 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import search
+from mcp_servers.http_client import HttpClient
+from search import normalize_subject, search_wikipedia, search_wikipedia_many
+
+PYTHON_ARTICLE = {
+    "batchcomplete": "",
+    "query": {
+        "pages": {
+            "23862": {
+                "pageid": 23862,
+                "ns": 0,
+                "title": "Python (programming language)",
+                "extract": "Python is a high-level, general-purpose programming language.",
+            }
+        }
+    },
+}
+
+
+@pytest.fixture
+def wikipedia(monkeypatch, stub_server):
+    monkeypatch.setattr(
+        search, "WIKIPEDIA_API_URL", stub_server.route("/w/api.php", PYTHON_ARTICLE, delay=0.1)
+    )
+
+    return stub_server
+
+
+def test_normalize_subject():
+    assert normalize_subject("  python_(programming   language) ") == "Python (programming language)"
+
+
+def test_title_lookup_is_the_default(wikipedia):
+    result = json.loads(asyncio.run(search_wikipedia("python_(programming language)")))
+
+    assert result == PYTHON_ARTICLE
+    (request,) = wikipedia.requests
+    assert request["params"]["titles"] == "Python (programming language)"
+
+
+def test_concurrent_equivalent_lookups_share_one_request(wikipedia):
+    subjects = ["Python (programming language)", "python_(programming language)"] * 5
+
+    async def burst():
+        return await asyncio.gather(*(search_wikipedia(subject, mode="title") for subject in subjects))
+
+    results = asyncio.run(burst())
+
+    assert all(json.loads(result) == PYTHON_ARTICLE for result in results)
+    assert len(wikipedia.requests) == 1
+    assert wikipedia.requests[0]["params"]["titles"] == "Python (programming language)"
+
+
+SEARCH_RESULTS = {
+    "batchcomplete": True,
+    "query": {
+        "pages": [
+            {"pageid": 2, "ns": 0, "title": "Pythonidae", "index": 2, "extract": "The Pythonidae are snakes...\n"},
+            {
+                "pageid": 23862,
+                "ns": 0,
+                "title": "Python (programming language)",
+                "index": 1,
+                "extract": "Python is a high-level, general-purpose programming language...",
+            },
+        ]
+    },
+}
+
+
+def test_search_mode_returns_trimmed_extracts_of_best_matches(monkeypatch, stub_server):
+    monkeypatch.setattr(search, "WIKIPEDIA_API_URL", stub_server.route("/w/api.php", SEARCH_RESULTS))
+
+    result = json.loads(asyncio.run(search_wikipedia("python  programing", mode="search", limit=50, max_chars=300)))
+
+    assert result == {
+        "query": "python programing",
+        "results": [
+            {
+                "title": "Python (programming language)",
+                "pageid": 23862,
+                "extract": "Python is a high-level, general-purpose programming language...",
+            },
+            {"title": "Pythonidae", "pageid": 2, "extract": "The Pythonidae are snakes..."},
+        ],
+    }
+
+    (request,) = stub_server.requests
+    assert request["params"]["generator"] == "search"
+    assert request["params"]["gsrsearch"] == "python programing"
+    assert request["params"]["gsrlimit"] == request["params"]["exlimit"] == "20"
+    assert request["params"]["exchars"] == "300"
+
+
+def test_search_mode_without_results(monkeypatch, stub_server):
+    monkeypatch.setattr(search, "WIKIPEDIA_API_URL", stub_server.route("/w/api.php", {"batchcomplete": True}))
+
+    assert json.loads(asyncio.run(search_wikipedia("xyzzy", mode="search"))) == {"query": "xyzzy", "results": []}
+
+
+class FakeMediaWiki:
+    """Answers title queries like the MediaWiki API, 20 intro extracts per response."""
+
+    REDIRECTS = {"NYC": "New York City", "Big Apple": "New York City"}
+
+    def __init__(self, known: set[str]):
+        self.known = known
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(dict(request.url.params))
+        params = request.url.params
+        titles = params["titles"].split("|")
+        offset = int(params.get("excontinue", 0))
+
+        normalized = [
+            {"from": title, "to": title[:1].upper() + title[1:]}
+            for title in titles
+            if title[:1].islower()
+        ]
+        titles = [title[:1].upper() + title[1:] for title in titles]
+        redirects = [{"from": title, "to": self.REDIRECTS[title]} for title in titles if title in self.REDIRECTS]
+        titles = list(dict.fromkeys(self.REDIRECTS.get(title, title) for title in titles))
+
+        pages = []
+
+        for index, title in enumerate(titles):
+            if title not in self.known:
+                pages.append({"ns": 0, "title": title, "missing": True})
+                continue
+
+            page = {"pageid": index + 1, "ns": 0, "title": title}
+
+            if offset <= index < offset + 20:
+                page["extract"] = f"{title} is an article."
+
+            pages.append(page)
+
+        data = {"batchcomplete": True, "query": {"normalized": normalized, "redirects": redirects, "pages": pages}}
+
+        if offset + 20 < len([title for title in titles if title in self.known]):
+            data["continue"] = {"excontinue": offset + 20, "continue": "||"}
+
+        return httpx.Response(200, json=data)
+
+
+@pytest.fixture
+def mediawiki(monkeypatch):
+    def install(known: set[str]) -> FakeMediaWiki:
+        fake = FakeMediaWiki(known)
+        http_client = HttpClient(transport=httpx.MockTransport(fake))
+        monkeypatch.setattr(search, "get_http_client", lambda: http_client)
+
+        return fake
+
+    return install
+
+
+def test_batch_lookup_follows_normalization_and_redirects(mediawiki):
+    fake = mediawiki({"New York City", "Python (programming language)"})
+
+    results = json.loads(
+        asyncio.run(search_wikipedia_many(["NYC", "python (programming language)", "Big Apple", "Nowhere"]))
+    )
+
+    assert results == [
+        {
+            "subject": "NYC",
+            "title": "New York City",
+            "redirected_from": "NYC",
+            "pageid": 1,
+            "extract": "New York City is an article.",
+        },
+        {
+            "subject": "python (programming language)",
+            "title": "Python (programming language)",
+            "pageid": 2,
+            "extract": "Python (programming language) is an article.",
+        },
+        {
+            "subject": "Big Apple",
+            "title": "New York City",
+            "redirected_from": "Big Apple",
+            "pageid": 1,
+            "extract": "New York City is an article.",
+        },
+        {"subject": "Nowhere", "title": "Nowhere", "missing": True},
+    ]
+    assert len(fake.requests) == 1
+
+
+def test_batch_lookup_is_chunked_and_continued(mediawiki):
+    subjects = [f"Article {i}" for i in range(120)]
+    fake = mediawiki(set(subjects))
+
+    results = json.loads(asyncio.run(search_wikipedia_many(subjects)))
+
+    assert [result["extract"] for result in results] == [f"{subject} is an article." for subject in subjects]
+    # 3 chunks of at most 50 titles, each continued for every 20 extracts
+    assert sorted(len(request["titles"].split("|")) for request in fake.requests if "excontinue" not in request) == [20, 50, 50]
+    assert len(fake.requests) == 3 + 2 + 2